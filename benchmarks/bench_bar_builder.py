@@ -0,0 +1,66 @@
+"""
+BarBuilder throughput on a market-open burst: thousands of instruments, 512-frame
+batches of Ticker/Quote/Full packets, 1/3/5/15-minute bars built at once, with a
+bar boundary crossed every few batches.
+
+Run: python -m benchmarks.bench_bar_builder [instruments]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from brokers.bar_builder import BarBuilder
+from brokers.feed_decoder import FeedDecoder, TICKER_STRUCT, QUOTE_STRUCT, FULL_STRUCT, DEPTH_LEVEL_STRUCT
+
+OPEN = 1717386300  # 09:15 IST
+
+
+def make_batches(instruments, batches=400, per_batch=512, seconds_per_batch=5, seed=11):
+    rng = np.random.default_rng(seed)
+    depth = b''.join(DEPTH_LEVEL_STRUCT.pack(100, 120, 3, 4, 101.5, 101.6) for _ in range(5))
+    volume = np.zeros(instruments, dtype=np.int64)
+    out = []
+    for b in range(batches):
+        ltt = OPEN + b * seconds_per_batch
+        frames = []
+        for sid, kind, ltp in zip(rng.integers(0, instruments, per_batch), rng.random(per_batch),
+                                  rng.uniform(10, 50000, per_batch)):
+            volume[sid] += 25
+            if kind < 0.5:
+                frames.append(TICKER_STRUCT.pack(2, 16, 2, 1000 + sid, ltp, ltt))
+            elif kind < 0.9:
+                frames.append(QUOTE_STRUCT.pack(4, 50, 2, 1000 + sid, ltp, 25, ltt, ltp, volume[sid],
+                                                5000, 6000, ltp, ltp, ltp, ltp))
+            else:
+                frames.append(FULL_STRUCT.pack(8, 162, 2, 1000 + sid, ltp, 25, ltt, ltp, volume[sid], 5000, 6000,
+                                               250000, 260000, 240000, ltp, ltp, ltp, ltp, depth))
+        out.append(frames)
+    return out
+
+
+def main():
+    instruments = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batches = make_batches(instruments)
+    decoder = FeedDecoder()
+    decoded = [decoder.decode(frames) for frames in batches[:1]]  # warm the decoder buffers
+    builder = BarBuilder([(2, 1000 + i) for i in range(instruments)], intervals=(1, 3, 5, 15), keep_history=False)
+
+    samples = []
+    for frames in batches:
+        decoded = decoder.decode(frames)
+        start = time.perf_counter()
+        builder.apply(decoded)
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1e6
+    ticks = sum(len(frames) for frames in batches)
+    print(f"{instruments} instruments, {len(batches)} batches, {ticks} ticks, 4 intervals, "
+          f"{builder.stats['bars']} bars emitted")
+    print(f"{'apply() p50':<24} {np.percentile(samples, 50):9.1f} us")
+    print(f"{'apply() p99':<24} {np.percentile(samples, 99):9.1f} us")
+    print(f"{'throughput':<24} {ticks / samples.sum() * 1e6 / 1e6:9.2f} M ticks/s")
+
+
+if __name__ == "__main__":
+    main()
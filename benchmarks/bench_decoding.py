@@ -0,0 +1,87 @@
+"""
+Response decoding: the previous stdlib json.loads envelope vs DhanHTTP's
+current decoder (orjson when installed) vs lazy DhanResponse access.
+
+Reports best-of-N latency and tracemalloc peak allocation per case over a
+~3 month 1-minute candle history, a wide option chain and a large holdings list.
+
+    python -m benchmarks.bench_decoding
+"""
+
+import json
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+
+from brokers.decoding import DhanResponse, orjson
+from brokers.dhan_http import DhanHTTP
+from simulator.market import SimMarket
+
+
+def _payloads():
+    market = SimMarket()
+    candles = market.intraday("1333", date(2024, 1, 1), date(2024, 3, 29), 1)
+    chain = {"data": market.option_chain("13", date.today().isoformat(), strikes=401), "status": "success"}
+    holdings = [{"exchange": "ALL", "tradingSymbol": f"SYM{i}", "securityId": str(1000 + i), "isin": f"INE{i:09d}",
+                 "totalQty": 10 + i, "dpQty": 10 + i, "t1Qty": 0, "availableQty": 10 + i, "collateralQty": 0,
+                 "avgCostPrice": 100.0 + i / 7} for i in range(2000)]
+    return {name: json.dumps(body).encode() for name, body in
+            (("candles", candles), ("option_chain", chain), ("holdings", holdings))}
+
+
+def _old(content):
+    return {"status": "success", "remarks": "", "data": json.loads(content)}
+
+
+CASES = {
+    "candles": {
+        "stdlib_envelope": lambda raw: _old(raw)["data"]["close"],
+        "fast_envelope": lambda raw: DhanHTTP._parse_content(True, raw)["data"]["close"],
+        "lazy_close_timestamp": lambda raw: (DhanResponse(True, raw).array("close"),
+                                             DhanResponse(True, raw).array("timestamp")),
+        "stdlib_to_numpy": lambda raw: {k: np.asarray(v, dtype=np.float64) for k, v in _old(raw)["data"].items()},
+        "lazy_candles_numpy": lambda raw: DhanResponse(True, raw).candles(),
+    },
+    "option_chain": {
+        "stdlib_envelope": lambda raw: _old(raw)["data"]["data"]["last_price"],
+        "fast_envelope": lambda raw: DhanHTTP._parse_content(True, raw)["data"]["data"]["last_price"],
+        "lazy_status_validated": lambda raw: DhanResponse(True, raw)["status"],
+    },
+    "holdings": {
+        "stdlib_envelope": lambda raw: len(_old(raw)["data"]),
+        "fast_envelope": lambda raw: len(DhanHTTP._parse_content(True, raw)["data"]),
+        "lazy_status_validated": lambda raw: DhanResponse(True, raw)["status"],
+    },
+}
+
+
+def measure(func, raw, repeat=7):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(raw)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1e3, peak / 1e6
+
+
+def bench():
+    results = {}
+    for payload, raw in _payloads().items():
+        for case, func in CASES[payload].items():
+            ms, mb = measure(func, raw)
+            results[f"{payload}_{case}_ms"] = ms
+            results[f"{payload}_{case}_peak_mb"] = mb
+        results[f"{payload}_body_mb"] = len(raw) / 1e6
+    return results
+
+
+if __name__ == "__main__":
+    print(f"decoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+    for name, value in bench().items():
+        print(f"{name:<44} {value:10.3f}")
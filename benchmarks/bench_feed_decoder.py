@@ -0,0 +1,67 @@
+"""
+Decode-throughput comparison: per-packet dict parsers vs. the columnar FeedDecoder.
+
+Run: python -m benchmarks.bench_feed_decoder [frames]
+"""
+
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from brokers.feed_decoder import (
+    FeedDecoder, TICKER_STRUCT, QUOTE_STRUCT, OI_STRUCT, FULL_STRUCT, DEPTH_LEVEL_STRUCT
+)
+from brokers.market_feed import MarketFeed
+
+
+def make_frames(count, instruments=2500, seed=7):
+    """Synthetic market-open mix: mostly Ticker/Quote with some OI and Full."""
+    rng = random.Random(seed)
+    depth = b''.join(DEPTH_LEVEL_STRUCT.pack(100, 120, 3, 4, 101.5, 101.6) for _ in range(5))
+    frames = []
+    for _ in range(count):
+        sid = rng.randrange(1000, 1000 + instruments)
+        ltp = rng.uniform(10, 50000)
+        ltt = 1718000000 + rng.randrange(0, 22500)
+        kind = rng.random()
+        if kind < 0.5:
+            frames.append(TICKER_STRUCT.pack(2, 16, 2, sid, ltp, ltt))
+        elif kind < 0.8:
+            frames.append(QUOTE_STRUCT.pack(4, 50, 2, sid, ltp, 25, ltt, ltp, 100000,
+                                            5000, 6000, ltp, ltp, ltp, ltp))
+        elif kind < 0.9:
+            frames.append(OI_STRUCT.pack(5, 12, 2, sid, 250000))
+        else:
+            frames.append(FULL_STRUCT.pack(8, 162, 2, sid, ltp, 25, ltt, ltp, 100000, 5000, 6000,
+                                           250000, 260000, 240000, ltp, ltp, ltp, ltp, depth))
+    return frames
+
+
+def bench(label, fn, frames, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(frames)
+        best = min(best, time.perf_counter() - start)
+    rate = len(frames) / best
+    print(f"{label:<32} {best * 1e3:9.2f} ms  {rate / 1e6:7.2f} M frames/s")
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    frames = make_frames(count)
+    feed = MarketFeed(SimpleNamespace(dhan_client_id="bench", dhan_access_token="bench"))
+    decoder = FeedDecoder(capacity=count)
+
+    print(f"{count} frames")
+    legacy = bench("dict parsers (_parse_response)", lambda fs: [feed._parse_response(f) for f in fs], frames)
+    columnar = bench("FeedDecoder.decode", decoder.decode, frames)
+    batched = bench("FeedDecoder.decode (512/batch)",
+                    lambda fs: [decoder.decode(fs[i:i + 512]) for i in range(0, len(fs), 512)], frames)
+    print(f"speedup: {columnar / legacy:.1f}x (one batch), {batched / legacy:.1f}x (512-frame batches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Full-chain IV + Greeks refresh through GreeksEngine.update.
+
+A SnapshotTable holding thousands of option contracts (several underlyings x
+expiries x strikes, CE and PE) is nudged as a tick would, then the whole chain
+is re-solved. The first refresh solves from scratch; later ones start from
+the previous IVs. A scalar per-contract loop is timed for comparison.
+
+    python -m benchmarks.bench_greeks
+"""
+
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from brokers.greeks import GreeksEngine, greeks, implied_vol, year_fraction
+from brokers.snapshot_table import SnapshotTable
+
+
+def _chain(underlyings=4, expiries=6, strikes=125):
+    """Contracts, per-underlying spot instrument and a consistent set of option prices."""
+    today = date.today()
+    contracts, spot = [], {}
+    sid = 50000
+    for u in range(underlyings):
+        spot[u] = (0, 13 + u)
+        centre = 20000.0 + 5000 * u
+        for e in range(expiries):
+            expiry = (today + timedelta(days=7 * (e + 1))).isoformat()
+            for k in range(strikes):
+                strike = centre + (k - strikes // 2) * 50
+                for side in ("CE", "PE"):
+                    contracts.append((2, sid, strike, expiry, side, spot[u]))
+                    sid += 1
+    return contracts, spot
+
+
+def _centre(instrument):
+    return 20000.0 + 5000 * (instrument[1] - 13)
+
+
+def _set_prices(table, engine, contracts, spot, shift=0.0):
+    spots = np.array([_centre(c[5]) for c in contracts]) * (1.0 + shift)
+    t = year_fraction(engine.expiries)
+    sigma = 0.12 + 0.1 * np.abs(np.log(engine.strikes / spots))
+    prices = greeks(spots, engine.strikes, t, sigma, engine.is_call, engine.rate, engine.carry)["price"]
+    rows = table.rows
+    rows['LTP'][[table.row_of(c[0], c[1]) for c in contracts]] = np.maximum(np.round(prices / 0.05) * 0.05, 0.05)
+    for segment, sid in spot.values():
+        rows['LTP'][table.row_of(segment, sid)] = _centre((segment, sid)) * (1.0 + shift)
+
+
+def bench(updates=50, scalar_sample=500):
+    contracts, spot = _chain()
+    engine = GreeksEngine(contracts)
+    table = SnapshotTable(engine.instruments())
+
+    _set_prices(table, engine, contracts, spot)
+    start = time.perf_counter()
+    result = engine.update(table)
+    cold = time.perf_counter() - start
+
+    timings = []
+    for i in range(updates):
+        _set_prices(table, engine, contracts, spot, shift=0.0005 * math.sin(i))
+        start = time.perf_counter()
+        result = engine.update(table)
+        timings.append(time.perf_counter() - start)
+    warm = float(np.median(timings))
+
+    # scalar baseline: the same solver one contract at a time
+    t = year_fraction(engine.expiries)
+    sample = range(0, len(contracts), max(len(contracts) // scalar_sample, 1))
+    start = time.perf_counter()
+    for i in sample:
+        sigma = implied_vol(np.array([result.price[i]]), result.underlying[i], engine.strikes[i], t[i],
+                            engine.is_call[i], engine.rate, engine.carry)
+        greeks(result.underlying[i], engine.strikes[i], t[i], sigma, engine.is_call[i], engine.rate, engine.carry)
+    scalar = (time.perf_counter() - start) / len(sample)
+
+    return {
+        "contracts": len(contracts),
+        "solved": int(np.count_nonzero(~np.isnan(result.iv))),
+        "cold_update_ms": cold * 1e3,
+        "warm_update_ms": warm * 1e3,
+        "contracts_per_s": len(contracts) / warm,
+        "scalar_loop_ms_estimate": scalar * len(contracts) * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    for name, value in bench().items():
+        print(f"{name:<28} {value:12.2f}")
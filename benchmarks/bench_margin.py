@@ -0,0 +1,60 @@
+"""
+Pre-trade margin check of a basket: one calculate_margin() per leg vs
+Funds.calculate_margins() vs MarginEstimator.check() with a warm cache and a
+FundsLedger.
+
+Runs against the local simulator with a fixed per-request latency; the rate
+limiter is opened up so the numbers show the round trips, not the 20/s
+non-trading budget.
+
+    python -m benchmarks.bench_margin
+"""
+
+import random
+import time
+
+from brokers.funds import Funds
+from brokers.margin_estimator import FundsLedger, MarginEstimator
+from brokers.rate_limiter import RequestScheduler, DEFAULT_LIMITS
+from simulator import DhanSimulator
+
+
+def _basket(legs, seed):
+    rng = random.Random(seed)
+    return [{"security_id": str(1000 + i), "exchange_segment": "NSE_EQ", "transaction_type": "BUY",
+             "quantity": 50 + rng.randrange(5), "product_type": "INTRADAY", "price": 500.0 + i + rng.random() * 0.5}
+            for i in range(legs)]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return (time.perf_counter() - start) * 1e3, out
+
+
+def bench(legs=20, latency=0.02, rounds=5):
+    limits = {name: [(10 ** 9, 1)] for name in DEFAULT_LIMITS}
+    with DhanSimulator(latency=latency) as sim:
+        funds = Funds(sim.http(scheduler=RequestScheduler(limits)))
+        ledger = FundsLedger(funds)
+        estimator = MarginEstimator(funds, ledger=ledger, ttl=60.0)
+        sequential, batched, checks, calls = [], [], [], 0
+        for seed in range(rounds):
+            basket = _basket(legs, seed)  # same legs, quantities and prices drift slightly
+            sequential.append(_timed(lambda: [funds.calculate_margin(**leg) for leg in basket])[0])
+            batched.append(_timed(funds.calculate_margins, basket)[0])
+            ms, result = _timed(estimator.check, basket)
+            checks.append(ms)
+            calls += result["network_calls"] if seed else 0
+    mean = lambda xs: sum(xs) / len(xs)
+    return {"legs": legs, "latency_ms": latency * 1e3,
+            "sequential_ms": mean(sequential), "calculate_margins_ms": mean(batched),
+            "estimator_cold_ms": checks[0], "estimator_warm_ms": mean(checks[1:]),
+            "warm_network_calls_per_check": calls / (rounds - 1),
+            "speedup_batched": mean(sequential) / mean(batched),
+            "speedup_warm": mean(sequential) / mean(checks[1:]),
+            "estimator": estimator.describe()["stats"]}
+
+
+if __name__ == "__main__":
+    print(bench())
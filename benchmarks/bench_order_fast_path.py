@@ -0,0 +1,47 @@
+"""
+Pre-wire cost of Order.place vs OrderTemplate.send.
+
+Both paths run against a stubbed session, so the numbers cover payload build,
+serialisation and request preparation only (no network).
+
+    python -m benchmarks.bench_order_fast_path
+"""
+
+import time
+
+from brokers.dhan_http import DhanHTTP
+from brokers.order import Order
+from brokers.rate_limiter import RequestScheduler, DEFAULT_LIMITS
+
+
+class _Response:
+    ok = True
+    status_code = 200
+    content = b'{"orderId": "1"}'
+
+
+def _order():
+    limits = {name: [(10 ** 9, 1)] for name in DEFAULT_LIMITS}  # measure the path, not the limiter
+    dhan = DhanHTTP("cid", "token", scheduler=RequestScheduler(limits))
+    dhan.session.send = lambda request, **kwargs: _Response()
+    return Order(dhan)
+
+
+def bench(n=20000):
+    order = _order()
+    start = time.perf_counter()
+    for i in range(n):
+        order.place("1333", "NSE_EQ", "BUY", 1 + i % 10, "LIMIT", "INTRADAY", 1600.05 + i % 7)
+    slow = (time.perf_counter() - start) / n * 1e6
+
+    template = order.template("1333", "NSE_EQ", "BUY", "LIMIT", "INTRADAY")
+    start = time.perf_counter()
+    for i in range(n):
+        template.send(1 + i % 10, 1600.05 + i % 7)
+    fast = (time.perf_counter() - start) / n * 1e6
+    return {"place_us": slow, "template_us": fast, "speedup": slow / fast,
+            "tick_to_wire": order.tick_to_wire.summary()}
+
+
+if __name__ == "__main__":
+    print(bench())
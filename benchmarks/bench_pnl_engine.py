@@ -0,0 +1,61 @@
+"""
+PnLEngine repricing from feed batches: incremental running sums (only rows of
+instruments in the batch) vs the same engine recomputing the whole book per batch.
+
+Books of a few thousand to tens of thousands of positions are repriced from
+Ticker/Quote/Full batches drawn from a universe 3x the book size (so most
+packets are for instruments not held). Reads of the portfolio and
+per-underlying totals are timed as well.
+
+Run: python -m benchmarks.bench_pnl_engine
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.bench_feed_decoder import make_frames
+from brokers.feed_decoder import FeedDecoder
+from brokers.pnl_engine import PnLEngine
+
+
+class FullRecompute(PnLEngine):
+    def _refresh(self, rows):
+        self._recompute()
+
+
+def _book(positions, engine=PnLEngine, seed=1):
+    rng = np.random.default_rng(seed)
+    held = rng.choice(np.arange(1000, 1000 + positions * 3), positions, replace=False)
+    pnl = engine(underlyings={(2, int(sid)): f"U{sid % 50}" for sid in held})
+    pnl._reset([(2, int(sid), "MARGIN", int(rng.integers(-500, 500)), float(rng.uniform(10, 5000)), 0.0, 0.0)
+                for sid in held])
+    return pnl
+
+
+def bench(positions, batch_size, batches=200):
+    pnl, baseline, decoder = _book(positions), _book(positions, FullRecompute), FeedDecoder()
+    incremental, full = [], []
+    for seed in range(batches):
+        batch = decoder.decode(make_frames(batch_size, instruments=positions * 3, seed=seed))
+        start = time.perf_counter()
+        pnl.update_prices(batch)
+        incremental.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        baseline.update_prices(batch)
+        full.append(time.perf_counter() - start)
+    assert np.allclose(list(pnl.totals().values()), list(baseline.totals().values()))
+    start = time.perf_counter()
+    for _ in range(10000):
+        pnl.totals()
+        pnl.underlying("U7")
+    read = (time.perf_counter() - start) / 10000
+    return np.median(incremental) * 1e6, np.median(full) * 1e6, read * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'positions':>10} {'batch':>6} {'incremental us':>15} {'full recompute us':>18} {'reads us':>9}")
+    for positions in (3000, 30000):
+        for batch_size in (16, 512):
+            incremental, full, read = bench(positions, batch_size)
+            print(f"{positions:>10} {batch_size:>6} {incremental:>15.1f} {full:>18.1f} {read:>9.2f}")
@@ -0,0 +1,82 @@
+"""
+Local resampling of multi-year 1-minute history into every bar size we use.
+
+Synthetic 1-minute sessions (375 bars, 09:15-15:30 IST, weekdays) for several
+symbols over several years are resampled to 3/5/10/15/25/60-minute and daily
+bars with brokers.resample. A pure-Python dict-bucket loop over one symbol is
+timed for comparison.
+
+    python -m benchmarks.bench_resample
+"""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from brokers.candle_store import CANDLE_FIELDS, IST_OFFSET
+from brokers.resample import SESSION_OPEN, bucket_starts, resample
+
+INTERVALS = (3, 5, 10, 15, 25, 60, "D")
+
+
+def _history(years=3, seed=0):
+    """(field, row) 1-minute candles for every weekday in `years` years."""
+    rng = np.random.default_rng(seed)
+    start = date(2021, 1, 1)
+    days = [start + timedelta(days=i) for i in range(365 * years)]
+    midnights = np.array([(d - date(1970, 1, 1)).days * 86400 - IST_OFFSET for d in days if d.weekday() < 5])
+    timestamps = (midnights[:, None] + SESSION_OPEN + np.arange(375) * 60).ravel()
+    close = 1000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.0008, len(timestamps))))
+    columns = np.empty((len(CANDLE_FIELDS), len(timestamps)))
+    columns[0] = timestamps
+    columns[1] = np.r_[close[0], close[:-1]]
+    columns[2] = np.maximum(columns[1], close) * 1.0002
+    columns[3] = np.minimum(columns[1], close) * 0.9998
+    columns[4] = close
+    columns[5] = rng.integers(1000, 50000, len(timestamps))
+    columns[6] = 0.0
+    return columns
+
+
+def python_resample(columns, interval):
+    """Row-by-row reference: one dict bucket per bar."""
+    bars = {}
+    for ts, o, h, l, c, v, oi, b in zip(*columns.tolist(), bucket_starts(columns[0], interval).tolist()):
+        bar = bars.get(b)
+        if bar is None:
+            bars[b] = [b, o, h, l, c, v, oi]
+        else:
+            bar[2], bar[3], bar[4], bar[5], bar[6] = max(bar[2], h), min(bar[3], l), c, bar[5] + v, oi
+    return np.array(list(bars.values())).T
+
+
+def bench(symbols=10, years=3, repeat=3):
+    histories = [_history(years, seed) for seed in range(symbols)]
+    rows = sum(h.shape[1] for h in histories)
+    results = {"symbols": symbols, "years": years, "minute_rows": rows}
+    total = 0.0
+    for interval in INTERVALS:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for history in histories:
+                resample(history, interval)
+            best = min(best, time.perf_counter() - start)
+        results[f"resample_{interval}_ms"] = best * 1e3
+        total += best
+    results["all_intervals_ms"] = total * 1e3
+    results["rows_per_s_m"] = rows * len(INTERVALS) / total / 1e6
+
+    start = time.perf_counter()
+    reference = python_resample(histories[0], 5)
+    python_s = time.perf_counter() - start
+    assert np.allclose(reference, resample(histories[0], 5))
+    results["python_loop_5_one_symbol_ms"] = python_s * 1e3
+    results["speedup_5"] = python_s / (results["resample_5_ms"] / 1e3 / symbols)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench().items():
+        print(f"{name:<32} {value:12.2f}")
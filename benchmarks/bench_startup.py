@@ -0,0 +1,51 @@
+"""
+Import and construction cost of brokers / DhanClient, each case in a fresh interpreter.
+
+"eager" cases import every submodule and build every DhanClient attribute,
+which is what `import brokers` and DhanClient.__init__ used to do.
+
+    python -m benchmarks.bench_startup
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+SETUP = "import time; start = time.perf_counter()\n"
+CONTEXT = "from core.context import Context; ctx = Context('k', '1000000001', 'token')\n"
+
+CASES = {
+    "import_brokers_ms": SETUP + "import brokers\n",
+    "import_funds_ms": SETUP + "from brokers import Funds\n",
+    "import_all_eager_ms": SETUP + "import brokers\nbrokers.ALL_DHAN_MODULES; [getattr(brokers, n) for n in brokers.__all__]\n",
+    "client_funds_only_ms": SETUP + CONTEXT + "from brokers.dhan_client import DhanClient\n"
+                            "DhanClient(ctx).funds\n",
+    "client_all_eager_ms": SETUP + CONTEXT + "from brokers.dhan_client import DhanClient\n"
+                           "from brokers.dhan_client import REST_MODULES, STREAM_MODULES\n"
+                           "client = DhanClient(ctx)\n[getattr(client, n) for n in REST_MODULES + STREAM_MODULES]\n",
+}
+REPORT = "print(json.dumps({'ms': (time.perf_counter() - start) * 1e3, 'modules': len(sys.modules)}))\n"
+
+
+def measure(code, runs=7):
+    samples, modules = [], 0
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", "import json, sys\n" + code + REPORT],
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        modules = result["modules"]
+    return statistics.median(samples), modules
+
+
+def bench(runs=7):
+    results = {}
+    for name, code in CASES.items():
+        results[name], results[name.replace("_ms", "_modules")] = measure(code, runs)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in bench().items():
+        print(f"{name:<28} {value:10.1f}")
@@ -0,0 +1,156 @@
+"""
+Offline performance suite run against the Dhan simulator.
+
+    python -m benchmarks.bench_suite                          # everything
+    python -m benchmarks.bench_suite --only decode,orders
+    python -m benchmarks.bench_suite --save baseline.json
+    python -m benchmarks.bench_suite --baseline baseline.json --tolerance 0.25
+
+With --baseline the run exits non-zero if any metric regressed by more than
+the tolerance: *_per_s metrics must not drop, *_us / *_s metrics must not rise.
+REST benches use an unthrottled RequestScheduler unless --dhan-limits is given,
+so they measure this code rather than Dhan's rate limits. The simulator runs in
+a child process so it does not compete with the client for the GIL.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_feed_decoder import make_frames
+from brokers.backfill import Backfill
+from brokers.feed_decoder import FeedDecoder
+from brokers.historical import Historical
+from core.latency import LatencyRecorder
+from brokers.order import Order
+from brokers.rate_limiter import RequestScheduler
+from simulator import SimulatorProcess
+
+
+def bench_decode(frames=200_000, batch=512, repeat=5):
+    """Columnar decode rate over a synthetic market-open packet mix."""
+    data = make_frames(frames)
+    decoder = FeedDecoder(capacity=batch)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(0, len(data), batch):
+            decoder.decode(data[i:i + batch])
+        best = min(best, time.perf_counter() - start)
+    return {"decode_frames_per_s": frames / best}
+
+
+def bench_feed(sim, sizes=(100, 1000, 5000), duration=2.0):
+    """Frames/s received and decoded by MarketFeed.get_instrument_batch at N subscribed instruments."""
+    async def run(count):
+        instruments = [(2, 40000 + i, (15, 15, 17, 21)[i % 4]) for i in range(count)]
+        feed = sim.market_feed(instruments)
+        await feed.connect()
+        frames, start = 0, time.perf_counter()
+        while time.perf_counter() - start < duration:
+            frames += (await feed.get_instrument_batch(2048, 0.002)).count
+        elapsed = time.perf_counter() - start
+        # a graceful close would first drain the frames still queued behind the close frame
+        feed.ws.transport.abort()
+        return frames / elapsed
+
+    return {f"feed_{count}_frames_per_s": asyncio.run(run(count)) for count in sizes}
+
+
+def bench_orders(sim, count=300, scheduler=None):
+    """Order.place vs OrderTemplate.send round trips (MARKET orders, filled immediately)."""
+    order = Order(sim.http(scheduler=scheduler))
+    place = LatencyRecorder(count)
+    for i in range(count):
+        start = time.perf_counter_ns()
+        order.place("1333", "NSE_EQ", "BUY" if i % 2 else "SELL", 1, "MARKET", "INTRADAY", 0)
+        place.record(time.perf_counter_ns() - start)
+    template = order.template("1333", "NSE_EQ", "BUY", "MARKET", "INTRADAY")
+    for _ in range(count):
+        template.send(1, 0.0)
+    place, fast = place.summary(), order.round_trip.summary()
+    return {
+        "order_place_p50_us": place["p50_us"],
+        "order_place_p99_us": place["p99_us"],
+        "order_template_p50_us": fast["p50_us"],
+        "order_template_p99_us": fast["p99_us"],
+        "order_tick_to_wire_p50_us": order.tick_to_wire.summary()["p50_us"],
+    }
+
+
+def bench_backfill(sim, securities=20, days=30, workers=5, scheduler=None):
+    """Parallel 1-minute intraday backfill of `securities` instruments over `days` calendar days."""
+    historical = Historical(sim.http(scheduler=scheduler))
+    to_date = date(2024, 6, 28)
+    from_date = to_date - timedelta(days=days - 1)
+    targets = [(str(1000 + i), "NSE_EQ", "EQUITY") for i in range(securities)]
+    start = time.perf_counter()
+    candles = sum(len(result) for result in Backfill(historical, max_workers=workers).intraday(
+        targets, from_date.isoformat(), to_date.isoformat(), 1))
+    elapsed = time.perf_counter() - start
+    return {"backfill_s": elapsed, "backfill_candles_per_s": candles / elapsed}
+
+
+BENCHES = ("decode", "feed", "orders", "backfill")
+
+
+def run(only=BENCHES, dhan_limits=False, latency=0.0):
+    results = {}
+    if "decode" in only:
+        results.update(bench_decode())
+    if set(only) - {"decode"}:
+        scheduler = None if dhan_limits else RequestScheduler(limits={})
+        with SimulatorProcess(latency=latency) as sim:
+            if "feed" in only:
+                results.update(bench_feed(sim))
+            if "orders" in only:
+                results.update(bench_orders(sim, scheduler=scheduler))
+            if "backfill" in only:
+                results.update(bench_backfill(sim, scheduler=scheduler))
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Metrics worse than baseline by more than tolerance: [(name, baseline, current)]."""
+    worse = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None or not base:
+            continue
+        if name.endswith("_per_s") and current < base * (1 - tolerance):
+            worse.append((name, base, current))
+        elif name.endswith(("_us", "_s")) and not name.endswith("_per_s") and current > base * (1 + tolerance):
+            worse.append((name, base, current))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite")
+    parser.add_argument("--only", default=",".join(BENCHES), help=f"comma-separated subset of {BENCHES}")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare against a saved JSON run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated REST latency in seconds")
+    parser.add_argument("--dhan-limits", action="store_true", help="keep Dhan's real rate limits")
+    args = parser.parse_args(argv)
+
+    results = run(tuple(args.only.split(",")), args.dhan_limits, args.latency)
+    for name, value in results.items():
+        print(f"{name:<32} {value:14.2f}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            worse = regressions(results, json.load(f), args.tolerance)
+        for name, base, current in worse:
+            print(f"REGRESSION {name}: {base:.2f} -> {current:.2f}")
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
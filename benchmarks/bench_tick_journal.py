@@ -0,0 +1,50 @@
+"""
+Tick journal cost: TickRecorder.record() on the receive path, background write
+throughput, and as-fast-as-possible replay through the dict parsers and the
+columnar FeedDecoder, over a synthetic market-open burst.
+
+Run: python -m benchmarks.bench_tick_journal [frames]
+"""
+
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_feed_decoder import make_frames
+from brokers.tick_journal import TickRecorder, TickReplayer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    frames = make_frames(count)
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = TickRecorder(directory, max_bytes=8 << 20)
+        start = time.perf_counter()
+        for frame in frames:
+            recorder.record(frame)
+        record_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recorder.start().stop()
+        write_s = time.perf_counter() - start
+        stats = recorder.stats
+
+        replayer = TickReplayer(directory)
+        start = time.perf_counter()
+        read = sum(1 for _ in replayer.frames())
+        read_s = time.perf_counter() - start
+        as_dicts = replayer.replay_sync()
+        batched = replayer.replay_sync(batch=True)
+
+    assert read == count
+    print(f"{count} frames, {stats['bytes'] / 1e6:.1f} MB in {len(recorder.files)} files")
+    print(f"{'record() per frame':<32} {record_s / count * 1e9:9.0f} ns")
+    print(f"{'background write':<32} {write_s * 1e3:9.2f} ms  {count / write_s / 1e6:7.2f} M frames/s")
+    print(f"{'mmap read':<32} {read_s * 1e3:9.2f} ms  {count / read_s / 1e6:7.2f} M frames/s")
+    for label, report in (("replay, dict parsers", as_dicts), ("replay, FeedDecoder batches", batched)):
+        print(f"{label:<32} {report['seconds'] * 1e3:9.2f} ms  "
+              f"{count / report['seconds'] / 1e6:7.2f} M frames/s  ({report['batches']} batches)")
+
+
+if __name__ == "__main__":
+    main()
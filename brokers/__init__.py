@@ -1,23 +1,65 @@
-from .dhan_http import DhanHTTP
-from .dhan_context import DhanContext
-from .funds import Funds
-from .order import Order
-from .super_order import SuperOrder
-from .portfolio import Portfolio
-from .option_chain import OptionChain
-from .historical import Historical
-from .market_feed import MarketFeed
-from .order_update import OrderUpdate
-from .trader_control import TraderControl
-
-ALL_DHAN_MODULES = [
-    Funds,
-    Order,
-    SuperOrder,
-    Portfolio,
-    OptionChain,
-    Historical,
-    MarketFeed,
-    OrderUpdate,
-    TraderControl
-]
+"""
+Dhan broker modules.
+
+Submodules are imported on first attribute access (PEP 562), so
+`from brokers import Funds` loads requests but not aiohttp, websockets or
+numpy; short-lived scripts only pay for what they touch.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "DhanHTTP": "dhan_http",
+    "AsyncDhanHTTP": "async_dhan_http",
+    "DhanResponse": "decoding",
+    "RequestScheduler": "rate_limiter",
+    "Priority": "rate_limiter",
+    "HttpMetrics": "http_metrics",
+    "ConnectionPool": "connection_pool",
+    "PreMarketWarmup": "warmup",
+    "CandleStore": "candle_store",
+    "Backfill": "backfill",
+    "DhanContext": "dhan_context",
+    "Funds": "funds",
+    "MarginEstimator": "margin_estimator",
+    "FundsLedger": "margin_estimator",
+    "Order": "order",
+    "OrderTemplate": "order_fast_path",
+    "SuperOrder": "super_order",
+    "Portfolio": "portfolio",
+    "PnLEngine": "pnl_engine",
+    "OptionChain": "option_chain",
+    "OptionChainCache": "option_chain_cache",
+    "GreeksEngine": "greeks",
+    "Historical": "historical",
+    "MarketFeed": "market_feed",
+    "FeedDecoder": "feed_decoder",
+    "SnapshotTable": "snapshot_table",
+    "BarBuilder": "bar_builder",
+    "TickRecorder": "tick_journal",
+    "TickReplayer": "tick_journal",
+    "ShardedMarketFeed": "sharded_feed",
+    "OrderIndex": "order_index",
+    "OrderUpdate": "order_update",
+    "TraderControl": "trader_control",
+}
+
+_DHAN_MODULES = ("Funds", "Order", "SuperOrder", "Portfolio", "OptionChain",
+                 "Historical", "MarketFeed", "OrderUpdate", "TraderControl")
+
+__all__ = list(_EXPORTS) + ["ALL_DHAN_MODULES"]
+
+
+def __getattr__(name):
+    if name == "ALL_DHAN_MODULES":
+        value = [__getattr__(cls) for cls in _DHAN_MODULES]
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,163 @@
+"""
+asyncio-native counterpart of DhanHTTP.
+
+Same get/post/put/delete surface and response envelope as DhanHTTP, backed by
+a pooled keep-alive aiohttp connector so independent calls can run concurrently.
+"""
+
+import asyncio
+import logging
+from json import dumps as json_dumps
+from time import monotonic, perf_counter_ns
+
+import aiohttp
+
+from brokers.dhan_http import DhanHTTP
+from brokers.decoding import DhanResponse
+from brokers.rate_limiter import RequestScheduler
+from brokers.http_metrics import HttpMetrics
+
+
+def _connect_trace():
+    """aiohttp trace that stores new-connection setup time in the request's trace ctx."""
+    async def on_start(session, ctx, params):
+        ctx.trace_request_ctx["_connect_start"] = perf_counter_ns()
+
+    async def on_end(session, ctx, params):
+        started = ctx.trace_request_ctx.pop("_connect_start", None)
+        if started is not None:
+            ctx.trace_request_ctx["connect"] = perf_counter_ns() - started
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_start.append(on_start)
+    trace.on_connection_create_end.append(on_end)
+    return trace
+
+
+class AsyncDhanHTTP:
+    HttpResponseStatus = DhanHTTP.HttpResponseStatus
+    HttpMethods = DhanHTTP.HttpMethods
+
+    API_BASE_URL = DhanHTTP.API_BASE_URL
+    HTTP_DEFAULT_TIMEOUT = DhanHTTP.HTTP_DEFAULT_TIMEOUT
+    DEFAULT_POOL_SIZE = 20
+    DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+    def __init__(self, client_id: str, access_token: str,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                 scheduler: RequestScheduler = None, metrics: HttpMetrics = None,
+                 decode: str = "dict"):
+        self.client_id = client_id
+        self.access_token = access_token
+        self.base_url = self.API_BASE_URL
+        self.timeout = self.HTTP_DEFAULT_TIMEOUT
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self.metrics = metrics if metrics is not None else HttpMetrics()
+        if decode not in ("dict", "lazy"):
+            raise ValueError("decode must be 'dict' or 'lazy'")
+        self.decode = decode  # see DhanHTTP
+
+        self.headers = {
+            'access-token': self.access_token,
+            'client-id': self.client_id,
+            'Content-type': 'application/json',
+            'Accept': 'application/json'
+        }
+
+        self.last_used = None  # monotonic time of the last request or warm-up
+        self.session = None
+        self._session_loop = None
+
+    async def _get_session(self):
+        # aiohttp sessions are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[_connect_trace()]
+            )
+            self._session_loop = loop
+        return self.session
+
+    async def _send_request(self, method: HttpMethods, endpoint: str, payload=None):
+        url = self.base_url + endpoint
+        info = self.metrics.before(method.value, endpoint, payload)
+        timings = {}
+        result = None
+        try:
+            await self.scheduler.acquire_async(method.value, endpoint)
+            session = await self._get_session()
+            data = json_dumps(payload) if payload else None
+            trace = {}
+            start = perf_counter_ns()
+            async with session.request(method.value, url, data=data, trace_request_ctx=trace) as response:
+                headers_at = perf_counter_ns()
+                content = await response.read()
+                read_at = perf_counter_ns()
+                if self.decode == "lazy":
+                    result = DhanResponse(response.ok, content, response.status)
+                else:
+                    result = DhanHTTP._parse_content(response.ok, content)
+                timings = {
+                    "connect": trace.get("connect"),
+                    "ttfb": headers_at - start,
+                    "total": read_at - start,
+                    "parse": perf_counter_ns() - read_at
+                }
+                self.metrics.observe(info, response.status, timings)
+                return result
+        except Exception as e:
+            logging.error(f"[AsyncDhanHTTP:{method.value}] ❌ Exception: {e}")
+            self.metrics.error(info, e)
+            result = DhanHTTP._failure(str(e))
+            return result
+        finally:
+            self.last_used = monotonic()
+            self.metrics.after(info, result, timings)
+
+    async def warm(self):
+        """Open (or refresh) a pooled keep-alive connection to the API host without an API call."""
+        try:
+            session = await self._get_session()
+            async with session.head(self.base_url, trace_request_ctx={}) as response:
+                await response.read()
+            self.last_used = monotonic()
+            return True
+        except Exception as e:
+            logging.warning(f"[AsyncDhanHTTP] ⚠️ Warm-up failed: {e}")
+            return False
+
+    async def get(self, endpoint: str):
+        return await self._send_request(self.HttpMethods.GET, endpoint)
+
+    async def post(self, endpoint: str, payload: dict = None):
+        return await self._send_request(self.HttpMethods.POST, endpoint, payload)
+
+    async def put(self, endpoint: str, payload: dict):
+        return await self._send_request(self.HttpMethods.PUT, endpoint, payload)
+
+    async def delete(self, endpoint: str):
+        return await self._send_request(self.HttpMethods.DELETE, endpoint)
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.last_used = None  # nothing pooled any more, so nothing to keep warm
+        self.session = None
+        self._session_loop = None
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
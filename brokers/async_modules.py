@@ -0,0 +1,125 @@
+"""
+Awaitable variants of the REST broker modules, for use with AsyncDhanHTTP.
+
+Each AsyncX keeps X's payload building and validation and only changes the
+calling convention: every REST method is a coroutine, including the
+validation-failure paths that return an envelope without touching the network.
+Local helpers (describe(), Order.template(), latency_report(), ...) stay synchronous.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+
+from brokers.dhan_http import DhanHTTP
+from brokers.funds import Funds
+from brokers.order import Order
+from brokers.super_order import SuperOrder
+from brokers.portfolio import Portfolio
+from brokers.option_chain import OptionChain
+from brokers.historical import Historical
+from brokers.resample import parse_interval
+from brokers.trader_control import TraderControl
+
+
+def _awaitable(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    return wrapper
+
+
+def awaitable_variant(cls, also=()):
+    """
+    Subclass cls so that its REST methods (the TOOLS keys, plus the names in
+    `also`) become coroutine functions. Local helpers such as describe(),
+    template() or latency_report() stay synchronous.
+    """
+    io_methods = set(getattr(cls, "TOOLS", ())) | set(also)
+    namespace = {
+        name: _awaitable(attr)
+        for name, attr in vars(cls).items()
+        if inspect.isfunction(attr) and name in io_methods
+    }
+    namespace["__doc__"] = f"Awaitable variant of {cls.__name__}; pass an AsyncDhanHTTP."
+    return type(f"Async{cls.__name__}", (cls,), namespace)
+
+
+class AsyncFunds(awaitable_variant(Funds)):
+    async def calculate_margins(self, legs, max_workers: int = 8):
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def leg_margin(leg):
+            async with semaphore:
+                try:
+                    return await self.calculate_margin(**leg)
+                except Exception as e:
+                    return DhanHTTP._failure(str(e))
+
+        return list(await asyncio.gather(*(leg_margin(leg) for leg in legs)))
+
+AsyncOrder = awaitable_variant(Order, also=("place_slice",))
+AsyncSuperOrder = awaitable_variant(SuperOrder)
+AsyncPortfolio = awaitable_variant(Portfolio)
+AsyncOptionChain = awaitable_variant(OptionChain)
+
+
+class AsyncHistorical(awaitable_variant(Historical, also=("intraday_columns",))):
+    async def resample(self, security_id: str, exchange_segment: str,
+                       instrument_type: str, from_date: str, to_date: str, interval=5):
+        try:
+            interval = parse_interval(interval)
+        except ValueError as e:
+            logging.error(f"[Historical] ❌ {e}")
+            return {"status": "failure", "remarks": str(e), "data": ""}
+
+        response = await self.intraday_columns(security_id, exchange_segment, instrument_type, from_date, to_date, 1)
+        return self._resampled(response, interval)
+
+    async def _intraday(self, security_id, exchange_segment, instrument_type, from_date, to_date, interval,
+                        arrays=False):
+        payload, error = self._intraday_payload(security_id, exchange_segment, instrument_type,
+                                                from_date, to_date, interval)
+        if error:
+            return error
+        if self.store:
+            return await self._read_through("/charts/intraday", payload, str(interval), arrays,
+                                            self.INTRADAY_WINDOW_DAYS)
+        return self._as_columns(await self.dhan.post("/charts/intraday", payload), arrays)
+
+    async def _read_through(self, endpoint, payload, interval, arrays=False, window_days=None):
+        key, first, last = self._plan(payload, interval)
+        live = []
+        for start, end, fetch in self._fetches(key, first, last, window_days):
+            data = None
+            if fetch:
+                response = await self.dhan.post(endpoint, self._window(payload, start, end))
+                if response.get("status") != DhanHTTP.HttpResponseStatus.SUCCESS.value:
+                    return response
+                data = response.get("data")
+            live.append(self.store.write_range(key, start, end, data))
+        return self._from_store(key, first, last, arrays, live)
+
+
+AsyncTraderControl = awaitable_variant(TraderControl)
+
+
+class AsyncDhanModules:
+    """All awaitable REST modules sharing one AsyncDhanHTTP connection pool."""
+
+    def __init__(self, http, order_index=None):
+        self.http = http
+        self.super_order = AsyncSuperOrder(http)
+        self.order = AsyncOrder(http, index=order_index)
+        self.portfolio = AsyncPortfolio(http)
+        self.funds = AsyncFunds(http)
+        self.option_chain = AsyncOptionChain(http)
+        self.historical = AsyncHistorical(http)
+        self.trader_control = AsyncTraderControl(http)
+
+    async def close(self):
+        await self.http.close()
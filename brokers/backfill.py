@@ -0,0 +1,139 @@
+"""
+Parallel chunked backfill of intraday candles for many securities.
+
+Long ranges are split into windows of at most `window_days` trading days (the
+intraday endpoint limit), fetched concurrently through Historical (rate limits
+are enforced by the DhanHTTP scheduler), then de-duplicated and stitched in
+time order per security.
+
+Progress is resumable when Historical has a CandleStore attached: every
+completed window is persisted, so a rerun only fetches what is still missing.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import numpy as np
+
+from brokers.candle_store import CANDLE_FIELDS, candle_columns, trading_windows
+from brokers.historical import Historical
+from core.backoff import Backoff
+
+
+def stitch(parts):
+    """Concatenate (field, row) candle arrays, sort by timestamp and drop duplicate bars."""
+    parts = [p for p in parts if p.shape[1]]
+    if not parts:
+        columns = np.zeros((len(CANDLE_FIELDS), 0), dtype=np.float64)
+    else:
+        columns = np.concatenate(parts, axis=1)
+        _, first_seen = np.unique(columns[0], return_index=True)
+        columns = columns[:, first_seen]  # np.unique sorts by timestamp
+    return {field: columns[i] for i, field in enumerate(CANDLE_FIELDS)}
+
+
+class BackfillResult:
+    __slots__ = ("security", "candles", "failed_windows")
+
+    def __init__(self, security, candles, failed_windows):
+        self.security = security
+        self.candles = candles
+        self.failed_windows = failed_windows
+
+    @property
+    def ok(self):
+        return not self.failed_windows
+
+    def __len__(self):
+        return len(self.candles["timestamp"])
+
+
+class Backfill:
+    def __init__(self, historical: Historical, max_workers: int = 5,
+                 window_days: int = 5, retries: int = 2, retry_base: float = 0.5, retry_cap: float = 5.0):
+        """
+        Args:
+            retries (int): Extra attempts per failed window, spaced by jittered exponential backoff
+            retry_base / retry_cap (float): Backoff base and maximum delay in seconds
+        """
+        self.historical = historical
+        self.max_workers = max_workers
+        self.window_days = window_days
+        self.retries = retries
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+
+    def _fetch_window(self, security, start, end, interval):
+        security_id, exchange_segment, instrument = security
+        # With a store, Historical takes whole inclusive days; the raw API's toDate is exclusive
+        to_date = end if self.historical.store else end + timedelta(days=1)
+        response, backoff = None, Backoff(self.retry_base, self.retry_cap)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(backoff.next_delay())
+            response = self.historical.get_intraday(
+                security_id, exchange_segment, instrument,
+                start.isoformat(), to_date.isoformat(), interval
+            )
+            if response.get("status") == "success":
+                return candle_columns(response.get("data"))
+        logging.warning(f"[Backfill] ⚠️ {security_id} {start}..{end} failed: {response.get('remarks')}")
+        return None
+
+    def intraday(self, securities, from_date, to_date, interval: int = 1, on_progress=None):
+        """
+        Backfill intraday candles for many securities.
+
+        Args:
+            securities (list): (security_id, exchange_segment, instrument) tuples
+            from_date, to_date (str): 'YYYY-MM-DD', inclusive
+            interval (int): 1, 5, 15, 25 or 60
+            on_progress (callable): Optional, called as on_progress(done, total) per window
+
+        Yields:
+            BackfillResult: one per security, as soon as all its windows are in;
+            candles is a dict of numpy columns sorted by timestamp
+        """
+        securities = [tuple(s) for s in securities]
+        windows = trading_windows(from_date, to_date, self.window_days)
+        total = len(securities) * len(windows)
+        pending = {s: len(windows) for s in securities}
+        parts = {s: [] for s in securities}
+        failed = {s: [] for s in securities}
+        done = 0
+
+        for security in securities:
+            if not windows:
+                yield BackfillResult(security, stitch([]), [])
+        if not windows:
+            return
+
+        # closing the generator early (break, consumer error) drops the windows not yet started
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {
+                pool.submit(self._fetch_window, security, start, end, interval): (security, start, end)
+                for security in securities
+                for start, end in windows
+            }
+            for future in as_completed(futures):
+                security, start, end = futures[future]
+                try:
+                    columns = future.result()
+                except Exception as e:
+                    logging.error(f"[Backfill] ❌ {security[0]} {start}..{end}: {e}")
+                    columns = None
+                if columns is None:
+                    failed[security].append((start, end))
+                else:
+                    parts[security].append(columns)
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+                pending[security] -= 1
+                if not pending[security]:
+                    yield BackfillResult(security, stitch(parts.pop(security)), failed.pop(security))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
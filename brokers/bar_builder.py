@@ -0,0 +1,394 @@
+"""
+Real-time OHLCV bars from MarketFeed ticks.
+
+BarBuilder consumes decoded feed batches (Ticker, Quote and Full packets) and
+keeps one array-backed forming bar per (instrument, interval), so thousands of
+instruments and several intervals are updated with a handful of vectorised
+operations per batch. Bars are bucketed on the packet LTT with the same
+session alignment as brokers.resample (09:15 IST for minute bars, IST day for
+"D"), and a bar is emitted once a tick from any instrument passes its end (or
+close_due() is called from a timer), through on_bar(interval, bars) and
+stream(). Volume is the increase in the cumulative day volume that Quote and
+Full packets carry. seed() / seed_from() load today's bars from Historical so
+strategies start with a full session without polling.
+
+    bars = feed.enable_bars((1, 5), on_bar=handler)
+    bars.seed_from(dhan.historical, [(1, 1333, "EQUITY")], today, tomorrow)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+import numpy as np
+
+from brokers.candle_store import IST_OFFSET, candle_columns
+from brokers.feed_decoder import EXCHANGE_NAMES
+from brokers.resample import DAILY, DAY, bucket_starts, parse_interval, resample
+from brokers.snapshot_table import instrument_keys
+
+BAR_DTYPE = np.dtype([
+    ('exchange_segment', 'u1'), ('security_id', '<u4'), ('timestamp', '<i8'),
+    ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('volume', '<f8'), ('open_interest', '<f8'), ('ticks', '<i8'),
+])
+
+_TICK_PACKETS = ("Ticker", "Quote", "Full")
+_OHLC = ('open', 'high', 'low', 'close', 'volume', 'open_interest', 'ticks')
+
+
+def _group_edges(changed):
+    """changed[i]: element i + 1 starts a new group -> (first, last) masks of each group."""
+    first, last = np.empty(len(changed) + 1, dtype=bool), np.empty(len(changed) + 1, dtype=bool)
+    first[0], first[1:] = True, changed
+    last[-1], last[:-1] = True, changed
+    return first, last
+
+
+def interval_seconds(interval):
+    return DAY if interval == DAILY else interval * 60
+
+
+class _Forming:
+    """The forming bar of every instrument for one interval."""
+
+    __slots__ = ("bucket", "active") + _OHLC
+
+    def __init__(self, count):
+        self.bucket = np.full(count, -1, dtype=np.int64)  # last bucket seen, kept after the bar closes
+        self.active = np.zeros(count, dtype=bool)
+        for field in _OHLC:
+            setattr(self, field, np.zeros(count, dtype=np.int64 if field == 'ticks' else np.float64))
+        self.open_interest[:] = np.nan
+
+    def moved(self, count, old_rows):
+        """Copy of this state for a larger instrument set; old row i becomes old_rows[i]."""
+        state = _Forming(count)
+        for field in self.__slots__:
+            getattr(state, field)[old_rows] = getattr(self, field)
+        return state
+
+
+class BarBuilder:
+    def __init__(self, instruments, intervals=(1,), on_bar=None, ltt_offset: int = 0,
+                 keep_history: bool = True, clock=time.time):
+        """
+        Args:
+            instruments (list): MarketFeed-style (exchange_segment, security_id[, request_code])
+            intervals: Bar sizes in minutes, or "D" for session daily bars
+            on_bar: called as on_bar(interval, bars) with a BAR_DTYPE array of completed bars
+            ltt_offset (int): Seconds added to packet LTT to get epoch seconds
+                              (-IST_OFFSET if the feed stamps IST wall-clock time)
+            keep_history (bool): Keep completed bars for bars()
+        """
+        self.intervals = tuple(parse_interval(i) for i in intervals)
+        self.on_bar = on_bar
+        self.ltt_offset = ltt_offset
+        self.clock = clock
+        self.watermark = 0  # latest tick time seen (epoch seconds)
+        self._lock = threading.Lock()
+        self._queues = []
+        self._history = {interval: [] for interval in self.intervals} if keep_history else None
+        self.stats = {"ticks": 0, "late": 0, "unknown": 0, "bars": 0}
+        self._pairs = []
+        self._index = {}
+        self._state = {}
+        self._resize(instruments)
+
+    def _resize(self, instruments):
+        pairs = sorted(set(self._pairs) | {(int(inst[0]), int(inst[1])) for inst in instruments})
+        index = {pair: i for i, pair in enumerate(pairs)}
+        old_rows = np.array([index[pair] for pair in self._pairs], dtype=np.intp)
+        self._state = {interval: (self._state[interval].moved(len(pairs), old_rows) if interval in self._state
+                                  else _Forming(len(pairs))) for interval in self.intervals}
+        last_volume = np.full(len(pairs), -1, dtype=np.int64)
+        if self._pairs:
+            last_volume[old_rows] = self._last_volume
+        self._last_volume = last_volume
+        self._pairs, self._index = pairs, index
+        self._segments = np.array([p[0] for p in pairs], dtype=np.uint8)
+        self._security_ids = np.array([p[1] for p in pairs], dtype=np.uint32)
+        self._keys = instrument_keys(self._segments, self._security_ids)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def covers(self, instruments):
+        return all((int(inst[0]), int(inst[1])) in self._index for inst in instruments)
+
+    def add_instruments(self, instruments):
+        """Track more instruments; forming bars of the existing ones are kept."""
+        with self._lock:
+            if not self.covers(instruments):
+                self._resize(instruments)
+
+    # --- ticks ---
+
+    def _ticks(self, batch):
+        """Known-instrument ticks of a DecodedBatch as (row, ltp, ltt, cumulative volume, oi), by row then arrival."""
+        parts = []
+        for name in _TICK_PACKETS:
+            if name not in batch:
+                continue
+            packets = batch[name]
+            keys = instrument_keys(packets['exchange_segment'], packets['security_id'])
+            pos = np.searchsorted(self._keys, keys)
+            pos[pos >= len(self._keys)] = 0
+            known = self._keys[pos] == keys if len(self._keys) else np.zeros(len(keys), dtype=bool)
+            known &= packets['LTT'] > 0
+            self.stats["unknown"] += int((~known).sum())
+            packets, count = packets[known], int(known.sum())
+            parts.append((
+                pos[known], packets['LTP'].astype(np.float64),
+                packets['LTT'].astype(np.int64) + self.ltt_offset,
+                packets['volume'].astype(np.int64) if name != "Ticker" else np.full(count, -1, dtype=np.int64),
+                packets['OI'].astype(np.float64) if name == "Full" else np.full(count, np.nan),
+                batch.positions[name][known],
+            ))
+        if not parts:
+            return None
+        rows, ltp, ltt, volume, oi, arrival = (np.concatenate(column) for column in zip(*parts))
+        order = np.lexsort((arrival, rows))
+        return rows[order], ltp[order], ltt[order], volume[order], oi[order]
+
+    def _volume_deltas(self, rows, volume):
+        """Per-tick traded quantity from the cumulative day volume (0 where unknown)."""
+        deltas = np.zeros(len(rows), dtype=np.float64)
+        carries = np.flatnonzero(volume >= 0)
+        if not len(carries):
+            return deltas
+        r, v = rows[carries], volume[carries]
+        first, last = _group_edges(r[1:] != r[:-1])
+        previous = np.empty_like(v)
+        previous[1:] = v[:-1]
+        previous[first] = self._last_volume[r[first]]
+        # a drop in the cumulative volume is a new session: the new value is all fresh volume
+        deltas[carries] = np.where(previous < 0, 0, np.where(v >= previous, v - previous, v))
+        self._last_volume[r[last]] = v[last]
+        return deltas
+
+    def _fold(self, interval, rows, ltp, ltt, deltas, oi):
+        """Fold sorted ticks into the forming bars; returns the bars they completed."""
+        state = self._state[interval]
+        bucket = bucket_starts(ltt, interval)
+        current, active = state.bucket[rows], state.active[rows]
+        late = ~active & (bucket <= current)  # that bar was already emitted
+        if late.any():
+            self.stats["late"] += int(late.sum())
+            keep = ~late
+            rows, ltp, deltas, oi, bucket = rows[keep], ltp[keep], deltas[keep], oi[keep], bucket[keep]
+            current, active = current[keep], active[keep]
+            if not len(rows):
+                return None
+        bucket = np.where(active, np.maximum(bucket, current), bucket)  # stragglers join the forming bar
+        order = np.lexsort((bucket, rows))  # stable: arrival order is kept within a bar
+        rows, ltp, deltas, oi, bucket = rows[order], ltp[order], deltas[order], oi[order], bucket[order]
+
+        starts_mask, ends_mask = _group_edges((rows[1:] != rows[:-1]) | (bucket[1:] != bucket[:-1]))
+        starts, ends = np.flatnonzero(starts_mask), np.flatnonzero(ends_mask)
+        seg = {
+            'row': rows[starts], 'bucket': bucket[starts], 'open': ltp[starts],
+            'high': np.maximum.reduceat(ltp, starts), 'low': np.minimum.reduceat(ltp, starts),
+            'close': ltp[ends], 'volume': np.add.reduceat(deltas, starts), 'ticks': ends - starts + 1,
+        }
+        with_oi = np.maximum.reduceat(np.where(np.isnan(oi), -1, np.arange(len(oi))), starts)
+        seg['open_interest'] = np.where(with_oi >= starts, oi[np.maximum(with_oi, 0)], np.nan)
+
+        first, last = _group_edges(seg['row'][1:] != seg['row'][:-1])
+
+        # a row's first segment either continues its forming bar or completes it
+        f = np.flatnonzero(first)
+        r = seg['row'][f]
+        continues = state.active[r] & (seg['bucket'][f] == state.bucket[r])
+        fc, rc = f[continues], r[continues]
+        seg['open'][fc] = state.open[rc]
+        seg['high'][fc] = np.maximum(seg['high'][fc], state.high[rc])
+        seg['low'][fc] = np.minimum(seg['low'][fc], state.low[rc])
+        seg['volume'][fc] += state.volume[rc]
+        seg['ticks'][fc] += state.ticks[rc]
+        seg['open_interest'][fc] = np.where(np.isnan(seg['open_interest'][fc]),
+                                            state.open_interest[rc], seg['open_interest'][fc])
+        closed_rows = r[state.active[r] & ~continues]
+
+        completed = [self._bars(closed_rows, state.bucket[closed_rows],
+                                {field: getattr(state, field)[closed_rows] for field in _OHLC})]
+        done = np.flatnonzero(~last)
+        completed.append(self._bars(seg['row'][done], seg['bucket'][done], {f: seg[f][done] for f in _OHLC}))
+
+        keep = np.flatnonzero(last)
+        r = seg['row'][keep]
+        state.bucket[r], state.active[r] = seg['bucket'][keep], True
+        for field in _OHLC:
+            getattr(state, field)[r] = seg[field][keep]
+        return np.concatenate(completed)
+
+    def _bars(self, rows, buckets, values):
+        bars = np.zeros(len(rows), dtype=BAR_DTYPE)
+        bars['exchange_segment'], bars['security_id'] = self._segments[rows], self._security_ids[rows]
+        bars['timestamp'] = buckets
+        for field in _OHLC:
+            bars[field] = values[field]
+        return bars
+
+    def _due(self, interval, now):
+        state = self._state[interval]
+        rows = np.flatnonzero(state.active & (state.bucket + interval_seconds(interval) <= now))
+        state.active[rows] = False
+        return self._bars(rows, state.bucket[rows], {field: getattr(state, field)[rows] for field in _OHLC})
+
+    def apply(self, batch):
+        """
+        Fold a feed_decoder.DecodedBatch into the forming bars and emit every bar
+        that is now complete.
+
+        Returns:
+            dict: interval -> BAR_DTYPE array of bars completed by this batch
+        """
+        with self._lock:
+            ticks = self._ticks(batch)
+            if ticks is None or not len(ticks[0]):
+                return {}
+            rows, ltp, ltt, volume, oi = ticks
+            self.stats["ticks"] += len(rows)
+            deltas = self._volume_deltas(rows, volume)
+            if len(ltt):
+                self.watermark = max(self.watermark, int(ltt.max()))
+            completed = {}
+            for interval in self.intervals:
+                parts = [self._fold(interval, rows, ltp, ltt, deltas, oi), self._due(interval, self.watermark)]
+                completed[interval] = np.concatenate([p for p in parts if p is not None])
+        return self._emit(completed)
+
+    def close_due(self, now: float = None):
+        """Emit every forming bar whose interval ended by `now` (default: the clock)."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            completed = {interval: self._due(interval, now) for interval in self.intervals}
+        return self._emit(completed)
+
+    async def run_timer(self, every: float = 1.0):
+        """Call close_due() every `every` seconds so quiet instruments still get their bars."""
+        while True:
+            await asyncio.sleep(every)
+            self.close_due()
+
+    # --- output ---
+
+    def _emit(self, completed):
+        completed = {interval: bars[np.lexsort((bars['security_id'], bars['exchange_segment'], bars['timestamp']))]
+                     for interval, bars in completed.items() if len(bars)}
+        for interval, bars in completed.items():
+            self.stats["bars"] += len(bars)
+            if self._history is not None:
+                self._history[interval].append(bars)
+            if self.on_bar is not None:
+                try:
+                    self.on_bar(interval, bars)
+                except Exception as e:
+                    logging.error(f"[BarBuilder] ❌ on_bar failed: {e}")
+            for queue in self._queues:
+                queue.put_nowait((interval, bars))
+        return completed
+
+    async def stream(self):
+        """Async iterator of (interval, bars); apply() must run on the same event loop."""
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def bars(self, exchange_segment, security_id, interval=None):
+        """Completed bars (seeded and live) of one instrument, oldest first."""
+        interval = parse_interval(interval if interval is not None else self.intervals[0])
+        with self._lock:
+            chunks = (self._history or {}).get(interval) or [np.zeros(0, dtype=BAR_DTYPE)]
+            history = np.concatenate(chunks)
+            if len(chunks) > 1:
+                self._history[interval] = [history]
+        mine = history[(history['exchange_segment'] == int(exchange_segment)) &
+                       (history['security_id'] == int(security_id))]
+        return mine[np.argsort(mine['timestamp'], kind='stable')]
+
+    def forming(self, exchange_segment, security_id, interval=None):
+        """The still-open bar of one instrument as a dict, or None."""
+        row = self._index.get((int(exchange_segment), int(security_id)))
+        interval = parse_interval(interval if interval is not None else self.intervals[0])
+        state = self._state[interval]
+        if row is None or not state.active[row]:
+            return None
+        with self._lock:
+            bar = self._bars([row], state.bucket[[row]], {f: getattr(state, f)[[row]] for f in _OHLC})
+        return dict(zip(BAR_DTYPE.names, bar[0].tolist()))
+
+    # --- backfill ---
+
+    def seed(self, exchange_segment, security_id, candles):
+        """
+        Load today's 1-minute candles (e.g. Historical.intraday_columns()["data"])
+        as completed bars of every interval; a bar whose interval has not ended
+        yet becomes the forming bar that live ticks continue.
+
+        Returns:
+            int: Minute candles seeded (0 for an unknown instrument)
+        """
+        row = self._index.get((int(exchange_segment), int(security_id)))
+        columns = candle_columns(candles) if isinstance(candles, dict) else np.asarray(candles, dtype=np.float64)
+        if row is None or not columns.shape[1]:
+            return 0
+        now = self.clock()
+        with self._lock:
+            for interval in self.intervals:
+                bars = resample(columns, interval)
+                state, count = self._state[interval], bars.shape[1]
+                forming = bars[0, -1] + interval_seconds(interval) > now
+                rows = np.full(count, row)
+                values = {field: bars[i + 1] for i, field in enumerate(_OHLC[:-1])}
+                values['ticks'] = np.zeros(count, dtype=np.int64)
+                seeded = self._bars(rows, bars[0].astype(np.int64), values)
+                if self._history is not None:
+                    self._history[interval].append(seeded[:-1] if forming else seeded)
+                state.bucket[row], state.active[row] = seeded['timestamp'][-1], forming
+                if forming:
+                    for field in _OHLC:
+                        getattr(state, field)[row] = seeded[field][-1]
+            # the feed's cumulative volume counts from the open; continue from today's seeded total
+            day = (columns[0] + IST_OFFSET) // DAY
+            today = (now + IST_OFFSET) // DAY
+            if day[-1] == today:
+                self._last_volume[row] = int(columns[5][day == today].sum())
+        return columns.shape[1]
+
+    def seed_from(self, historical, instruments, from_date: str, to_date: str):
+        """
+        seed() from Historical 1-minute candles.
+
+        Args:
+            instruments (list): (exchange_segment code, security_id, instrument_type), e.g. (1, 1333, "EQUITY")
+
+        Returns:
+            dict: (exchange_segment, security_id) -> candles seeded, or the failure remarks
+        """
+        report = {}
+        for segment, security_id, instrument_type in instruments:
+            response = historical.intraday_columns(str(security_id), EXCHANGE_NAMES.get(int(segment), str(segment)),
+                                                   instrument_type, from_date, to_date, 1)
+            if response.get("status") != "success":
+                logging.error(f"[BarBuilder] ❌ Seed failed for {segment}:{security_id}: {response.get('remarks')}")
+                report[(int(segment), int(security_id))] = response.get("remarks")
+                continue
+            report[(int(segment), int(security_id))] = self.seed(segment, security_id, response["data"])
+        return report
+
+    def describe(self):
+        return {
+            "module": "BarBuilder",
+            "instruments": len(self._pairs),
+            "intervals": list(self.intervals),
+            "forming": {str(interval): int(state.active.sum()) for interval, state in self._state.items()},
+            "watermark": self.watermark,
+            "stats": dict(self.stats)
+        }
@@ -0,0 +1,193 @@
+"""
+Persistent on-disk candle store used by Historical as a read-through cache.
+
+One partition per (exchange_segment, instrument, security_id, interval, IST date),
+stored as a (field, row) float64 .npy array so each field is a contiguous column
+and partitions can be memory-mapped. Days that returned no candles (holidays,
+weekends) are stored as empty partitions so they are not fetched again. Today's
+still-open session is never stored.
+
+Layout:
+    <root>/<exchange_segment>/<instrument>/<security_id>/<interval>/<YYYY-MM-DD>.npy
+"""
+
+import os
+import shutil
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+CANDLE_FIELDS = ("timestamp", "open", "high", "low", "close", "volume", "open_interest")
+IST_OFFSET = 19800  # seconds, Dhan timestamps are epoch seconds; sessions are IST days
+
+
+def ist_today():
+    return date(1970, 1, 1) + timedelta(days=(int(time.time()) + IST_OFFSET) // 86400)
+
+
+def ist_day_numbers(timestamps):
+    """Epoch seconds -> days since 1970-01-01 in IST."""
+    return (np.asarray(timestamps, dtype=np.int64) + IST_OFFSET) // 86400
+
+
+def parse_day(value) -> date:
+    """Accept 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS' or a date."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def candle_columns(data: dict):
+    """Dhan candle payload (dict of lists) -> (field, row) float64 array in CANDLE_FIELDS order."""
+    data = data or {}
+    timestamps = data.get("timestamp")
+    count = 0 if timestamps is None else len(timestamps)
+    columns = np.zeros((len(CANDLE_FIELDS), count), dtype=np.float64)
+    for i, field in enumerate(CANDLE_FIELDS):
+        values = data.get(field)
+        if values is not None and len(values) == count:
+            columns[i] = values
+    return columns
+
+
+def day_range(first: date, last: date):
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def trading_windows(from_date, to_date, window_days: int = 5):
+    """
+    Split from_date..to_date (inclusive) into (start, end) pairs covering at
+    most window_days weekdays each. Weekends never start or end a window.
+    """
+    first, last = parse_day(from_date), parse_day(to_date)
+    windows, start, count = [], None, 0
+    day = first
+    while day <= last:
+        if day.weekday() < 5:
+            if start is None:
+                start = day
+            count += 1
+            end = day
+            if count == window_days:
+                windows.append((start, end))
+                start, count = None, 0
+        day += timedelta(days=1)
+    if start is not None:
+        windows.append((start, end))
+    return windows
+
+
+class CandleKey:
+    __slots__ = ("security_id", "exchange_segment", "instrument", "interval")
+
+    def __init__(self, security_id, exchange_segment, instrument, interval):
+        self.security_id = str(security_id)
+        self.exchange_segment = exchange_segment.upper()
+        self.instrument = instrument.upper()
+        self.interval = str(interval)
+
+    def parts(self):
+        return (self.exchange_segment, self.instrument, self.security_id, self.interval)
+
+    def __repr__(self):
+        return "CandleKey(%s)" % "/".join(self.parts())
+
+
+class CandleStore:
+    def __init__(self, root: str):
+        self.root = os.path.expanduser(root)
+
+    def _dir(self, key: CandleKey):
+        return os.path.join(self.root, *key.parts())
+
+    def _path(self, key: CandleKey, day: date):
+        return os.path.join(self._dir(key), f"{day.isoformat()}.npy")
+
+    def has(self, key: CandleKey, day: date) -> bool:
+        return os.path.exists(self._path(key, day))
+
+    def missing_ranges(self, key: CandleKey, first: date, last: date):
+        """
+        Returns:
+            list: (start, end) inclusive date pairs not yet in the store
+        """
+        ranges = []
+        for day in day_range(first, last):
+            if self.has(key, day):
+                continue
+            if ranges and ranges[-1][1] == day - timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+
+    def write_range(self, key: CandleKey, first: date, last: date, data: dict):
+        """
+        Split a Dhan candle payload into per-day partitions covering first..last.
+        Only days before today are written: today's session is still open and
+        later days cannot have candles yet, so they are fetched again next time.
+
+        Returns:
+            np.ndarray: (field, row) columns of the candles from today on, which were not stored
+        """
+        columns = candle_columns(data)
+        days = ist_day_numbers(columns[0])
+        epoch = date(1970, 1, 1)
+        today = ist_today()
+        os.makedirs(self._dir(key), exist_ok=True)
+        for day in day_range(first, min(last, today - timedelta(days=1))):
+            mask = days == (day - epoch).days
+            self._write(self._path(key, day), columns[:, mask])
+        return columns[:, days >= (today - epoch).days]
+
+    def _write(self, path, columns):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(columns))
+        os.replace(tmp, path)
+
+    def read(self, key: CandleKey, first: date, last: date):
+        """
+        Read stored candles for first..last (inclusive) as columns.
+
+        Returns:
+            dict: field -> numpy array, sorted by timestamp
+        """
+        parts = []
+        for day in day_range(first, last):
+            path = self._path(key, day)
+            if os.path.exists(path):
+                part = np.load(path, mmap_mode="r")
+                if part.shape[1]:
+                    parts.append(part)
+        if parts:
+            columns = np.concatenate(parts, axis=1)
+        else:
+            columns = np.zeros((len(CANDLE_FIELDS), 0), dtype=np.float64)
+        return {field: columns[i] for i, field in enumerate(CANDLE_FIELDS)}
+
+    def invalidate(self, key: CandleKey = None, day: date = None):
+        """
+        Drop stored partitions for one day (default: today, the still-open
+        session). With no key, the day is dropped for every stored instrument.
+        """
+        day = day or ist_today()
+        name = f"{day.isoformat()}.npy"
+        if key is not None:
+            paths = [self._path(key, day)]
+        else:
+            paths = [os.path.join(dirpath, name)
+                     for dirpath, _, files in os.walk(self.root) if name in files]
+        removed = 0
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def invalidate_open_day(self):
+        return self.invalidate()
+
+    def clear(self, key: CandleKey = None):
+        shutil.rmtree(self._dir(key) if key else self.root, ignore_errors=True)
@@ -0,0 +1,203 @@
+"""
+Process-wide registry of pooled Dhan HTTP clients.
+
+One DhanHTTP (requests session) and one AsyncDhanHTTP (aiohttp connector) per
+(base URL, client id, access token), sharing a RequestScheduler and HttpMetrics,
+so every Context / DhanContext / DhanClient for the same account reuses the same
+keep-alive connections and rate-limit budget. health_check() re-warms clients
+idle for longer than max_idle before the server drops their connections.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+
+from brokers.dhan_http import DhanHTTP
+from brokers.rate_limiter import RequestScheduler
+from brokers.http_metrics import HttpMetrics
+
+
+class _Pooled:
+    __slots__ = ("http", "async_http", "scheduler", "metrics")
+
+    def __init__(self, scheduler, metrics):
+        self.http = None
+        self.async_http = None
+        self.scheduler = scheduler
+        self.metrics = metrics
+
+
+class ConnectionPool:
+    def __init__(self, pool_connections: int = DhanHTTP.DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DhanHTTP.DEFAULT_POOL_MAXSIZE, async_pool_size: int = 20,
+                 keepalive_timeout: float = 30.0, max_idle: float = 25.0, clock=time.monotonic):
+        """
+        Args:
+            pool_connections / pool_maxsize: requests adapter pool sizes for each DhanHTTP
+            async_pool_size (int): aiohttp connector limit for each AsyncDhanHTTP
+            keepalive_timeout (float): Seconds aiohttp keeps an idle connection
+            max_idle (float): health_check() re-warms clients idle at least this long
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.async_pool_size = async_pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.max_idle = max_idle
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0, "health_checks": 0, "rewarmed": 0, "warm_failures": 0}
+
+    @staticmethod
+    def key(client_id, access_token, base_url=None):
+        token = hashlib.sha256(str(access_token).encode()).hexdigest()[:16]  # never keep the raw token
+        return (base_url or DhanHTTP.API_BASE_URL, str(client_id), token)
+
+    def _entry(self, key, scheduler=None, metrics=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Pooled(scheduler or RequestScheduler(), metrics or HttpMetrics())
+        return entry
+
+    def scheduler(self, client_id, access_token, base_url=None):
+        """The rate-limit budget shared by every client of this account."""
+        with self._lock:
+            return self._entry(self.key(client_id, access_token, base_url)).scheduler
+
+    def metrics(self, client_id, access_token, base_url=None):
+        with self._lock:
+            return self._entry(self.key(client_id, access_token, base_url)).metrics
+
+    def get_http(self, client_id, access_token, base_url=None, scheduler=None, metrics=None):
+        """
+        Shared DhanHTTP for the account; scheduler/metrics only apply when the
+        account is seen for the first time.
+        """
+        key = self.key(client_id, access_token, base_url)
+        with self._lock:
+            entry = self._entry(key, scheduler, metrics)
+            if entry.http is None:
+                entry.http = DhanHTTP(client_id, access_token, scheduler=entry.scheduler, metrics=entry.metrics,
+                                      pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                entry.http.base_url = key[0]
+                self.stats["created"] += 1
+            else:
+                self.stats["reused"] += 1
+            return entry.http
+
+    def get_async_http(self, client_id, access_token, base_url=None, scheduler=None, metrics=None):
+        from brokers.async_dhan_http import AsyncDhanHTTP  # keeps aiohttp out of sync-only processes
+
+        key = self.key(client_id, access_token, base_url)
+        with self._lock:
+            entry = self._entry(key, scheduler, metrics)
+            if entry.async_http is None:
+                entry.async_http = AsyncDhanHTTP(
+                    client_id, access_token, pool_size=self.async_pool_size,
+                    keepalive_timeout=self.keepalive_timeout, scheduler=entry.scheduler, metrics=entry.metrics)
+                entry.async_http.base_url = key[0]
+                self.stats["created"] += 1
+            else:
+                self.stats["reused"] += 1
+            return entry.async_http
+
+    # --- keep-alive ---
+
+    def _idle(self, client, max_idle):
+        return client is not None and (client.last_used is None or self.clock() - client.last_used >= max_idle)
+
+    def health_check(self, max_idle: float = None):
+        """
+        Warm every sync client idle for max_idle seconds or more (never used counts as idle).
+
+        Returns:
+            dict: base_url:client_id -> True/False (warm-up succeeded) for the clients touched
+        """
+        max_idle = self.max_idle if max_idle is None else max_idle
+        with self._lock:
+            clients = [(key, entry.http) for key, entry in self._entries.items()]
+        report = {}
+        for key, http in clients:
+            if self._idle(http, max_idle):
+                report[f"{key[0]}:{key[1]}"] = self._rewarmed(http.warm())
+        self.stats["health_checks"] += 1
+        return report
+
+    async def health_check_async(self, max_idle: float = None):
+        """health_check() for the AsyncDhanHTTP clients (run on the loop that uses them)."""
+        max_idle = self.max_idle if max_idle is None else max_idle
+        with self._lock:
+            clients = [(key, entry.async_http) for key, entry in self._entries.items()
+                       if self._idle(entry.async_http, max_idle)]
+        results = await asyncio.gather(*(client.warm() for _, client in clients))
+        return {f"{key[0]}:{key[1]}": self._rewarmed(ok) for (key, _), ok in zip(clients, results)}
+
+    def _rewarmed(self, ok):
+        self.stats["rewarmed" if ok else "warm_failures"] += 1
+        return ok
+
+    async def keepalive(self, interval: float = 10.0):
+        """Run health checks every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.to_thread(self.health_check)
+            await self.health_check_async()
+            await asyncio.sleep(interval)
+
+    # --- lifecycle ---
+
+    async def aclose(self):
+        """Close every pooled session and forget the clients."""
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+        for entry in entries:
+            if entry.http is not None:
+                entry.http.session.close()
+            if entry.async_http is not None:
+                await entry.async_http.close()
+
+    def describe(self):
+        now = self.clock()
+        with self._lock:
+            clients = {
+                f"{key[0]}:{key[1]}": {
+                    "sync": entry.http is not None,
+                    "async": entry.async_http is not None,
+                    "idle_s": round(now - entry.http.last_used, 3)
+                    if entry.http is not None and entry.http.last_used is not None else None
+                }
+                for key, entry in self._entries.items()
+            }
+        return {
+            "module": "ConnectionPool",
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "async_pool_size": self.async_pool_size,
+            "max_idle": self.max_idle,
+            "clients": clients,
+            "stats": dict(self.stats)
+        }
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def connection_pool():
+    """The process-wide ConnectionPool (created on first use)."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
+
+
+def set_connection_pool(pool: ConnectionPool):
+    """Replace the process-wide pool, e.g. with tuned pool sizes at startup."""
+    global _default_pool
+    with _default_lock:
+        previous, _default_pool = _default_pool, pool
+    if previous is not None and previous._entries:
+        logging.warning("[ConnectionPool] ⚠️ Replaced a pool that still holds clients; close it with aclose()")
+    return pool
@@ -0,0 +1,182 @@
+"""
+Response decoding for DhanHTTP / AsyncDhanHTTP.
+
+loads() is orjson when installed (several times faster than the stdlib on
+large bodies), json.loads otherwise. DhanResponse is the lazy alternative to
+the dict envelope: it keeps the raw body and only decodes when .data or
+.status is read (a 2xx with a malformed body is a failure, so the status
+check has to parse it), while array() maps a single top-level numeric list
+(e.g. a candle field) straight into a float64 buffer without decoding the
+rest of the body. It answers the same ["status"] / .get("data") lookups as
+the dict envelope.
+"""
+
+import json
+import re
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # orjson is optional
+    orjson = None
+    loads = json.loads
+
+CANDLE_ARRAYS = ("open", "high", "low", "close", "volume", "timestamp")
+SUCCESS, FAILURE = "success", "failure"
+
+# top-level object tokens: a key, and a scalar value (string, number, true/false/null)
+_KEY = re.compile(rb'\s*"((?:[^"\\]|\\.)*)"\s*:\s*')
+_SCALAR = re.compile(rb'"(?:[^"\\]|\\.)*"|[-+.\w]+')
+_SEPARATOR = re.compile(rb'\s*([,}])')
+
+
+def _flat_lists(content):
+    """
+    {key: (start, end)} byte spans of the top-level lists in a JSON object body,
+    skipping over scalars. None when the body holds anything else at the top
+    level (nested objects, lists of strings or lists) or is not an object.
+    """
+    opening = re.match(rb'\s*{\s*', content)
+    if opening is None:
+        return None
+    lists, pos = {}, opening.end()
+    if content.startswith(b"}", pos):
+        return lists
+    while True:
+        key = _KEY.match(content, pos)
+        if key is None:
+            return None
+        pos = key.end()
+        if content.startswith(b"[", pos):
+            end = content.find(b"]", pos)
+            if end < 0 or content.find(b"[", pos + 1, end) >= 0 or content.find(b'"', pos, end) >= 0:
+                return None
+            lists[key.group(1).decode()] = (pos, end + 1)
+            pos = end + 1
+        else:
+            scalar = _SCALAR.match(content, pos)
+            if scalar is None:
+                return None
+            pos = scalar.end()
+        separator = _SEPARATOR.match(content, pos)
+        if separator is None:
+            return None
+        if separator.group(1) == b"}":
+            return None if content[separator.end():].strip() else lists
+        pos = separator.end()
+
+
+def _error_message(content):
+    try:
+        return loads(content).get("errorMessage", "Unknown error")
+    except Exception as e:
+        return str(e)
+
+
+class DhanResponse:
+    __slots__ = ("ok", "status_code", "content", "_data", "_decoded", "_remarks", "_lists")
+
+    _KEYS = ("status", "remarks", "data")
+
+    def __init__(self, ok: bool, content: bytes, status_code: int = None):
+        self.ok = ok
+        self.status_code = status_code
+        self.content = content
+        self._data = None
+        self._decoded = False
+        self._lists = None  # array(): spans of the top-level lists, indexed on first use
+        # failures are small and their message lives in the body, so decode them now
+        self._remarks = "" if ok else _error_message(content)
+
+    @property
+    def status(self):
+        if self.ok and not self._decoded:
+            self.data  # validates the body; a malformed one turns this into a failure
+        return SUCCESS if self.ok else FAILURE
+
+    @property
+    def remarks(self):
+        return self._remarks
+
+    @property
+    def data(self):
+        """The decoded body (decoded once, on first access); None for failures."""
+        if not self._decoded:
+            self._decoded = True
+            if self.ok:
+                try:
+                    self._data = loads(self.content)
+                except Exception as e:
+                    self.ok, self._remarks = False, str(e)
+        return self._data
+
+    # --- dict-envelope compatibility ---
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def keys(self):
+        return self._KEYS
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def as_dict(self):
+        return {"status": self.status, "remarks": self.remarks, "data": self.data}
+
+    def __repr__(self):
+        return f"DhanResponse(ok={self.ok!r}, bytes={len(self.content)}, decoded={self._decoded})"
+
+    # --- numeric buffers ---
+
+    def array(self, key: str, dtype="float64"):
+        """
+        Top-level list `key` of the body as a NumPy array. Before .data has been
+        read only that list's bytes are parsed. Keys inside nested objects never
+        match; a body with nested objects, or lists of strings or lists, at the
+        top level is decoded whole instead of sliced.
+
+        Returns:
+            np.ndarray: or None if the response failed or `key` is absent or not a list
+        """
+        import numpy as np  # only paid by callers that want buffers
+
+        if not self.ok:
+            return None
+        if not self._decoded:
+            if self._lists is None:
+                self._lists = _flat_lists(self.content)
+                if self._lists is None:
+                    self.data  # not sliceable (or malformed): decode, and validate, the whole body
+            if not self._decoded:
+                span = self._lists.get(key)
+                if span is None:
+                    return None
+                try:
+                    return np.array(loads(self.content[span[0]:span[1]]), dtype=dtype)
+                except ValueError:
+                    self.data  # a list that does not parse: the body is malformed
+                    return None
+            if not self.ok:
+                return None
+        values = self._data.get(key) if isinstance(self._data, dict) else None
+        return np.asarray(values, dtype=dtype) if isinstance(values, list) else None
+
+    def candles(self, fields=CANDLE_ARRAYS):
+        """
+        Dhan candle payload as {field: float64 array}. One or two fields are
+        sliced straight from the raw bytes; more than that decodes the body once.
+        """
+        if not self.ok:
+            return None
+        if len(fields) > 2:
+            self.data  # decode once; array() then converts the decoded lists
+        return {f: a for f in fields if (a := self.array(f)) is not None}
@@ -1,34 +1,154 @@
-from brokers.super_order import SuperOrder
-from brokers.order import Order
-from brokers.portfolio import Portfolio
-from brokers.funds import Funds
-from brokers.option_chain import OptionChain
-from brokers.historical import Historical
-from brokers.trader_control import TraderControl
-from brokers.market_feed import MarketFeed
-from brokers.order_update import OrderUpdate
+"""
+DhanClient: one entry point to every Dhan module.
+
+Modules are imported and constructed on first attribute access and share the
+context's DhanHTTP (and so its session, rate-limit scheduler and metrics), so
+a script that only reads funds never builds a MarketFeed or loads websockets.
+"""
+
+import asyncio
+from functools import cached_property
+
+# attributes built on demand, in describe_all() order
+REST_MODULES = ("super_order", "order", "portfolio", "funds", "option_chain",
+                "option_chain_cache", "historical", "trader_control")
+STREAM_MODULES = ("market_feed", "order_update")
+
 
 class DhanClient:
     def __init__(self, context):
-        self.super_order = SuperOrder(context)
-        self.order = Order(context)
-        self.portfolio = Portfolio(context)
-        self.funds = Funds(context)
-        self.option_chain = OptionChain(context)
-        self.historical = Historical(context)
-        self.trader_control = TraderControl(context)
-        self.market_feed = MarketFeed(context)
-        self.order_update = OrderUpdate(context)
+        self.context = context
+        self._aio = None
+
+    @cached_property
+    def http(self):
+        """The shared DhanHTTP (Context.get_dhan_http)."""
+        return self.context.get_dhan_http()
+
+    @cached_property
+    def order_index(self):
+        from brokers.order_index import OrderIndex
+        return OrderIndex()
+
+    @cached_property
+    def super_order(self):
+        from brokers.super_order import SuperOrder
+        return SuperOrder(self.http)
+
+    @cached_property
+    def order(self):
+        from brokers.order import Order
+        return Order(self.http, index=self.order_index)
+
+    @cached_property
+    def portfolio(self):
+        from brokers.portfolio import Portfolio
+        return Portfolio(self.http)
+
+    @cached_property
+    def funds(self):
+        from brokers.funds import Funds
+        return Funds(self.http)
+
+    @cached_property
+    def option_chain(self):
+        from brokers.option_chain import OptionChain
+        return OptionChain(self.http)
+
+    @cached_property
+    def option_chain_cache(self):
+        from brokers.option_chain_cache import OptionChainCache
+        return OptionChainCache(self.option_chain)
+
+    @cached_property
+    def historical(self):
+        from brokers.historical import Historical
+        return Historical(self.http)
+
+    @cached_property
+    def trader_control(self):
+        from brokers.trader_control import TraderControl
+        return TraderControl(self.http)
+
+    @cached_property
+    def market_feed(self):
+        from brokers.market_feed import MarketFeed
+        return MarketFeed(self.context)
+
+    @cached_property
+    def order_update(self):
+        from brokers.order_update import OrderUpdate
+        return OrderUpdate(self.context, index=self.order_index)
+
+    def loaded(self):
+        """Names of the modules constructed so far."""
+        return [name for name in REST_MODULES + STREAM_MODULES if name in self.__dict__]
+
+    @property
+    def aio(self):
+        """Awaitable REST modules (AsyncFunds, AsyncOrder, ...) on one pooled AsyncDhanHTTP."""
+        if self._aio is None:
+            from brokers.async_modules import AsyncDhanModules
+            self._aio = AsyncDhanModules(self.context.get_async_dhan_http(), order_index=self.order_index)
+        return self._aio
+
+    async def gather(self, *calls, return_exceptions=False):
+        """
+        Await several broker calls concurrently.
+
+        Example:
+            funds, orders = await dhan.gather(
+                dhan.aio.funds.get_fund_limits(),
+                dhan.aio.order.list_orders(),
+            )
+
+        Returns:
+            list: Results in the order the calls were given
+        """
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def fetch_account_snapshot(self):
+        """
+        Fetch funds, holdings, positions and the order book in one concurrent round.
+
+        Returns:
+            dict: One DhanHTTP envelope per key
+        """
+        funds, holdings, positions, orders = await self.gather(
+            self.aio.funds.get_fund_limits(),
+            self.aio.portfolio.get_holdings(),
+            self.aio.portfolio.get_positions(),
+            self.aio.order.list_orders(),
+        )
+        return {"funds": funds, "holdings": holdings, "positions": positions, "orders": orders}
+
+    def run_async(self, coro):
+        """Run a coroutine (e.g. gather(...)) from sync code and release the pool afterwards."""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.aio.close()
+        return asyncio.run(runner())
+
+    @property
+    def http_metrics(self):
+        """Per-endpoint HttpMetrics shared by the sync and async clients, if the context provides one."""
+        getter = getattr(self.context, "get_http_metrics", None)
+        return getter() if getter is not None else None
+
+    def prometheus_metrics(self):
+        """HTTP latency/status/error metrics in Prometheus text format."""
+        metrics = self.http_metrics
+        return metrics.prometheus() if metrics is not None else ""
 
     def describe_all(self):
-        return {
-            "super_order": self.super_order.describe(),
-            "order": self.order.describe(),
-            "portfolio": self.portfolio.describe(),
-            "funds": self.funds.describe(),
-            "option_chain": self.option_chain.describe(),
-            "historical": self.historical.describe(),
-            "trader_control": self.trader_control.describe(),
-            "market_feed": self.market_feed.describe(),
-            "order_update": self.order_update.describe(),
-        }
+        """
+        REST modules are built if needed (describe() lists their tools); the
+        feed and order-update streams are only described once something built them.
+        """
+        out = {name: getattr(self, name).describe() for name in REST_MODULES}
+        for name in STREAM_MODULES:
+            out[name] = self.__dict__[name].describe() if name in self.__dict__ else None
+        out["http"] = self.http_metrics.describe() if self.http_metrics is not None else None
+        return out
@@ -16,5 +16,10 @@ class DhanContext:
         return self.ws_token
 
     def get_dhan_http(self):
-        from .dhan_http import DhanHTTP
-        return DhanHTTP(client_id=self.client_id, access_token=self.access_token)
+        """Pooled DhanHTTP shared by every caller for this account."""
+        from .connection_pool import connection_pool
+        return connection_pool().get_http(self.client_id, self.access_token)
+
+    def get_async_dhan_http(self):
+        from .connection_pool import connection_pool
+        return connection_pool().get_async_http(self.client_id, self.access_token)
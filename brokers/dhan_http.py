@@ -2,12 +2,19 @@
 Standalone class to interact with DhanHQ APIs using direct HTTP calls.
 
 Supports: GET, POST, PUT, DELETE.
+Requests pass through a RequestScheduler that enforces Dhan's per-class rate limits
+and are timed per endpoint into HttpMetrics (connect / ttfb / total / parse).
 """
 
 import requests
 import logging
 from enum import Enum
-from json import dumps as json_dumps, loads as json_loads
+from json import dumps as json_dumps
+from time import monotonic, perf_counter_ns
+
+from brokers.decoding import DhanResponse, loads
+from brokers.rate_limiter import RequestScheduler
+from brokers.http_metrics import HttpMetrics, TimedHTTPAdapter, reset_connect_timer, connect_ns
 
 
 class DhanHTTP:
@@ -23,12 +30,28 @@ class DhanHTTP:
 
     API_BASE_URL = 'https://api.dhan.co/v2'
     HTTP_DEFAULT_TIMEOUT = 60
+    DEFAULT_POOL_CONNECTIONS = 4  # distinct hosts kept pooled
+    DEFAULT_POOL_MAXSIZE = 16  # keep-alive connections per host
 
-    def __init__(self, client_id: str, access_token: str):
+    def __init__(self, client_id: str, access_token: str, scheduler: RequestScheduler = None,
+                 metrics: HttpMetrics = None, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE, decode: str = "dict"):
+        """
+        Args:
+            decode (str): "dict" for the usual envelope dict, "lazy" for DhanResponse
+                objects that decode the body (or single numeric arrays) on access
+        """
         self.client_id = client_id
         self.access_token = access_token
         self.base_url = self.API_BASE_URL
         self.timeout = self.HTTP_DEFAULT_TIMEOUT
+        # Shared with AsyncDhanHTTP when both come from the same Context
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        # Per-endpoint latency histograms and request hooks, also shared via Context
+        self.metrics = metrics if metrics is not None else HttpMetrics()
+        if decode not in ("dict", "lazy"):
+            raise ValueError("decode must be 'dict' or 'lazy'")
+        self.decode = decode
 
         self.headers = {
             'access-token': self.access_token,
@@ -37,54 +60,94 @@ class DhanHTTP:
             'Accept': 'application/json'
         }
 
+        self.last_used = None  # monotonic time of the last request or warm-up
         self.session = requests.Session()
+        adapter = TimedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _send_request(self, method: HttpMethods, endpoint: str, payload=None):
         url = self.base_url + endpoint
+        info = self.metrics.before(method.value, endpoint, payload)
+        timings = {}
+        result = None
         try:
+            self.scheduler.acquire(method.value, endpoint)
             data = json_dumps(payload) if payload else None
+            reset_connect_timer()
+            start = perf_counter_ns()
             response = getattr(self.session, method.value.lower())(
                 url,
                 data=data,
                 headers=self.headers,
-                timeout=self.timeout
+                timeout=self.timeout,
+                stream=True  # return at headers so ttfb and body read are timed apart
             )
-            return self._parse_response(response)
+            headers_at = perf_counter_ns()
+            content = response.content
+            read_at = perf_counter_ns()
+            if self.decode == "lazy":
+                result = DhanResponse(response.ok, content, response.status_code)
+            else:
+                result = self._parse_content(response.ok, content)
+            timings = {
+                "connect": connect_ns() or None,
+                "ttfb": headers_at - start,
+                "total": read_at - start,
+                "parse": perf_counter_ns() - read_at
+            }
+            self.metrics.observe(info, response.status_code, timings)
+            return result
         except Exception as e:
             logging.error(f"[DhanHTTP:{method.value}] ❌ Exception: {e}")
-            return {
-                "status": self.HttpResponseStatus.FAILURE.value,
-                "remarks": str(e),
-                "data": None
-            }
+            self.metrics.error(info, e)
+            result = self._failure(str(e))
+            return result
+        finally:
+            self.last_used = monotonic()
+            self.metrics.after(info, result, timings)
 
     def _parse_response(self, response):
+        return self._parse_content(response.ok, response.content)
+
+    @classmethod
+    def _parse_content(cls, ok: bool, content: bytes):
         try:
-            content = json_loads(response.content)
-            if response.ok:
+            content = loads(content)
+            if ok:
                 return {
-                    "status": self.HttpResponseStatus.SUCCESS.value,
+                    "status": cls.HttpResponseStatus.SUCCESS.value,
                     "remarks": "",
                     "data": content
                 }
             else:
-                return {
-                    "status": self.HttpResponseStatus.FAILURE.value,
-                    "remarks": content.get("errorMessage", "Unknown error"),
-                    "data": None
-                }
+                return cls._failure(content.get("errorMessage", "Unknown error"))
         except Exception as e:
             logging.warning(f"[DhanHTTP] ⚠️ Failed to parse response: {e}")
-            return {
-                "status": self.HttpResponseStatus.FAILURE.value,
-                "remarks": str(e),
-                "data": None
-            }
+            return cls._failure(str(e))
+
+    @classmethod
+    def _failure(cls, remarks: str):
+        return {
+            "status": cls.HttpResponseStatus.FAILURE.value,
+            "remarks": remarks,
+            "data": None
+        }
+
+    def warm(self):
+        """Open (or refresh) a keep-alive connection to the API host without an API call."""
+        try:
+            self.session.head(self.base_url, headers=self.headers, timeout=self.timeout)
+            self.last_used = monotonic()
+            return True
+        except Exception as e:
+            logging.warning(f"[DhanHTTP] ⚠️ Warm-up failed: {e}")
+            return False
 
     def get(self, endpoint: str):
         return self._send_request(self.HttpMethods.GET, endpoint)
 
-    def post(self, endpoint: str, payload: dict):
+    def post(self, endpoint: str, payload: dict = None):
         return self._send_request(self.HttpMethods.POST, endpoint, payload)
 
     def put(self, endpoint: str, payload: dict):
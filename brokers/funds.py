@@ -1,12 +1,20 @@
 """
 Handles fund-related data retrieval and margin calculations from Dhan.
 Fully GPT-readable and compatible with Messenger/brain logic.
+
+calculate_margins() prices a whole basket concurrently; MarginEstimator
+(brokers.margin_estimator) adds memoization and a local funds ledger on top.
 """
 
 from brokers.dhan_http import DhanHTTP
 
 
 class Funds:
+    TOOLS = {
+        "get_fund_limits": "read",
+        "calculate_margin": "read"
+    }
+
     def __init__(self, dhan: DhanHTTP):
         self.dhan = dhan
 
@@ -33,6 +41,38 @@ class Funds:
         Returns:
             dict: Margin breakdown for given trade
         """
+        payload = self._margin_payload(security_id, exchange_segment, transaction_type, quantity,
+                                       product_type, price, trigger_price)
+        return self.dhan.post("/margincalculator", payload)
+
+    def calculate_margins(self, legs, max_workers: int = 8):
+        """
+        calculate_margin() for many legs at once, run concurrently; the shared
+        DhanHTTP scheduler keeps the calls within the rate limits.
+
+        Args:
+            legs (list): dicts of calculate_margin() arguments
+            max_workers (int): Requests in flight at once
+
+        Returns:
+            list: One margin envelope per leg, in input order
+        """
+        if len(legs) <= 1:
+            return [self._leg_margin(leg) for leg in legs]
+        from concurrent.futures import ThreadPoolExecutor  # keeps `from brokers import Funds` light
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(legs))) as pool:
+            return list(pool.map(self._leg_margin, legs))
+
+    def _leg_margin(self, leg):
+        try:
+            return self.calculate_margin(**leg)
+        except Exception as e:  # a malformed leg fails alone
+            return DhanHTTP._failure(str(e))
+
+    @staticmethod
+    def _margin_payload(security_id, exchange_segment, transaction_type, quantity,
+                        product_type, price, trigger_price=0.0):
         payload = {
             "securityId": security_id,
             "exchangeSegment": exchange_segment.upper(),
@@ -41,8 +81,12 @@ class Funds:
             "productType": product_type.upper(),
             "price": round(float(price), 2)
         }
-
         if trigger_price > 0:
             payload["triggerPrice"] = round(float(trigger_price), 2)
+        return payload
 
-        return self.dhan.post("/margincalculator", payload)
+    def describe(self):
+        return {
+            "module": "Funds",
+            "tools": dict(self.TOOLS)
+        }
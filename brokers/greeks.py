@@ -0,0 +1,303 @@
+"""
+Vectorised Black-Scholes / Black-76 pricing, Greeks and implied volatility.
+
+Everything works on NumPy arrays, so a whole option chain (every strike and
+expiry) is priced and inverted in one call. GreeksEngine maps a list of option
+contracts onto a MarketFeed SnapshotTable and recomputes IV and Greeks for the
+entire chain from the latest ticks; the previous IVs seed the next solve, so a
+per-tick refresh usually converges in two or three Newton steps.
+
+Output units follow Dhan's option chain: IV in percent, theta per calendar
+day, vega per 1 vol point.
+"""
+
+import math
+import time
+from datetime import date
+
+import numpy as np
+
+try:
+    from scipy.special import ndtr as _ndtr
+except ImportError:  # scipy is optional
+    _ndtr = None
+
+BLACK_SCHOLES, BLACK_76 = "black_scholes", "black76"
+YEAR_SECONDS = 365.0 * 86400
+EXPIRY_CUTOFF = 10 * 3600  # 15:30 IST, seconds after 00:00 UTC on expiry day
+MIN_TIME = 60.0 / YEAR_SECONDS  # floor time to expiry at one minute
+SQRT_2PI = math.sqrt(2.0 * math.pi)
+IV_BOUNDS = (1e-4, 5.0)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def norm_cdf(x):
+    """Standard normal CDF; scipy's ndtr when available, else erfc approximation (rel. error < 1.2e-7)."""
+    if _ndtr is not None:
+        return _ndtr(x)
+    z = np.abs(x) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = -1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    half_erfc = 0.5 * t * np.exp(-z * z + poly)
+    return np.where(x >= 0, 1.0 - half_erfc, half_erfc)
+
+
+def year_fraction(expiry, now: float = None):
+    """Years from now (epoch seconds) to 15:30 IST on each expiry ('YYYY-MM-DD' or date)."""
+    now = time.time() if now is None else now
+    expiry = np.atleast_1d(np.asarray(expiry))
+    if expiry.dtype.kind in "US O":
+        days = np.array([date.fromisoformat(str(e)[:10]).toordinal() for e in expiry.ravel()]).reshape(expiry.shape)
+    else:
+        days = expiry.astype(np.int64)  # ordinals
+    epoch = (days - date(1970, 1, 1).toordinal()) * 86400.0 + EXPIRY_CUTOFF
+    return np.maximum((epoch - now) / YEAR_SECONDS, MIN_TIME)
+
+
+def _forward(underlying, t, rate, carry):
+    return underlying * np.exp(carry * t), np.exp(-rate * t)
+
+
+def _d1_d2(forward, strike, t, sigma):
+    vol_t = sigma * np.sqrt(t)
+    d1 = (np.log(forward / strike) + 0.5 * vol_t * vol_t) / vol_t
+    return d1, d1 - vol_t
+
+
+def carry_for(model, rate, dividend=0.0):
+    """Cost of carry b: r - q for Black-Scholes on spot, 0 for Black-76 on futures."""
+    if model == BLACK_76:
+        return 0.0
+    if model == BLACK_SCHOLES:
+        return rate - dividend
+    raise ValueError(f"model must be '{BLACK_SCHOLES}' or '{BLACK_76}'")
+
+
+def price(underlying, strike, t, sigma, is_call, rate=0.0, carry=0.0):
+    """Option price under the generalised Black-Scholes model (carry b)."""
+    forward, discount = _forward(np.asarray(underlying, dtype=np.float64), t, rate, carry)
+    d1, d2 = _d1_d2(forward, strike, t, sigma)
+    call = discount * (forward * norm_cdf(d1) - strike * norm_cdf(d2))
+    put = discount * (strike * norm_cdf(-d2) - forward * norm_cdf(-d1))
+    return np.where(is_call, call, put)
+
+
+def greeks(underlying, strike, t, sigma, is_call, rate=0.0, carry=0.0):
+    """
+    Returns:
+        dict: price, delta, gamma, theta (per year), vega (per 1.0 vol), as arrays
+    """
+    underlying = np.asarray(underlying, dtype=np.float64)
+    forward, discount = _forward(underlying, t, rate, carry)
+    d1, d2 = _d1_d2(forward, strike, t, sigma)
+    sqrt_t = np.sqrt(t)
+    nd1, pdf = norm_cdf(d1), norm_pdf(d1)
+    nd2 = norm_cdf(d2)
+    scaled = discount * forward  # = underlying * e^((b - r) t)
+    decay = -scaled * pdf * sigma / (2.0 * sqrt_t)
+    call_theta = decay - (carry - rate) * scaled * nd1 - rate * strike * discount * nd2
+    put_theta = decay + (carry - rate) * scaled * (1.0 - nd1) + rate * strike * discount * (1.0 - nd2)
+    return {
+        "price": np.where(is_call, discount * (forward * nd1 - strike * nd2),
+                          discount * (strike * (1.0 - nd2) - forward * (1.0 - nd1))),
+        "delta": np.where(is_call, scaled * nd1, scaled * (nd1 - 1.0)) / underlying,
+        "gamma": scaled * pdf / (underlying * underlying * sigma * sqrt_t),
+        "theta": np.where(is_call, call_theta, put_theta),
+        "vega": scaled * pdf * sqrt_t,
+    }
+
+
+def implied_vol(target, underlying, strike, t, is_call, rate=0.0, carry=0.0,
+                guess=None, tol=1e-8, max_iter=50):
+    """
+    Vectorised implied volatility: Newton steps safeguarded by bisection inside a
+    shrinking bracket. Prices outside the no-arbitrage bounds give NaN.
+
+    Args:
+        guess: Optional starting vols (e.g. the previous tick's IV)
+    """
+    target = np.asarray(target, dtype=np.float64)
+    underlying = np.broadcast_to(np.asarray(underlying, dtype=np.float64), target.shape)
+    strike = np.broadcast_to(np.asarray(strike, dtype=np.float64), target.shape)
+    t = np.broadcast_to(np.asarray(t, dtype=np.float64), target.shape)
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), target.shape)
+
+    forward, discount = _forward(underlying, t, rate, carry)
+    intrinsic = discount * np.where(is_call, np.maximum(forward - strike, 0.0), np.maximum(strike - forward, 0.0))
+    upper = discount * np.where(is_call, forward, strike)
+    valid = (target > intrinsic) & (target < upper) & (underlying > 0) & (strike > 0)
+
+    lo = np.full(target.shape, IV_BOUNDS[0])
+    hi = np.full(target.shape, IV_BOUNDS[1])
+    if guess is None:
+        # Brenner-Subrahmanyam, good near the money
+        guess = target / (discount * forward) * math.sqrt(2.0 * math.pi) / np.sqrt(t)
+    sigma = np.clip(np.nan_to_num(np.asarray(guess, dtype=np.float64), nan=0.2), 0.01, 3.0)
+    sigma = np.broadcast_to(sigma, target.shape).copy()
+
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.nonzero(active)
+        f, k, tt, c, s = forward[idx], strike[idx], t[idx], is_call[idx], sigma[idx]
+        d1, d2 = _d1_d2(f, k, tt, s)
+        df = discount[idx]
+        model = np.where(c, df * (f * norm_cdf(d1) - k * norm_cdf(d2)),
+                         df * (k * norm_cdf(-d2) - f * norm_cdf(-d1)))
+        vega = df * f * norm_pdf(d1) * np.sqrt(tt)
+        diff = model - target[idx]
+
+        l, h = lo[idx], hi[idx]
+        h = np.where(diff > 0, s, h)
+        l = np.where(diff < 0, s, l)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = s - diff / vega
+        bisect = ~((step > l) & (step < h)) | (vega < 1e-12)
+        done = (np.abs(diff) < tol) | (h - l < 1e-10)
+        s = np.where(done, s, np.where(bisect, 0.5 * (l + h), step))
+
+        sigma[idx], lo[idx], hi[idx] = s, l, h
+        active[idx] = ~done
+    return np.where(valid, sigma, np.nan)
+
+
+class ChainGreeks:
+    """Per-contract arrays from one GreeksEngine refresh, in the engine's contract order."""
+    __slots__ = ("security_id", "strike", "expiry", "is_call", "price", "underlying",
+                 "t", "iv", "delta", "gamma", "theta", "vega", "computed_at")
+
+    def __init__(self, **columns):
+        for name in self.__slots__:
+            setattr(self, name, columns.get(name))
+
+    def __len__(self):
+        return len(self.strike)
+
+    def records(self, mask=None):
+        """List of per-contract dicts (optionally only where mask is True)."""
+        rows = np.arange(len(self)) if mask is None else np.nonzero(mask)[0]
+        return [{
+            "security_id": int(self.security_id[i]), "strike": float(self.strike[i]),
+            "expiry": str(self.expiry[i]), "side": "CE" if self.is_call[i] else "PE",
+            "price": float(self.price[i]), "underlying": float(self.underlying[i]),
+            "iv": float(self.iv[i]), "delta": float(self.delta[i]), "gamma": float(self.gamma[i]),
+            "theta": float(self.theta[i]), "vega": float(self.vega[i]),
+        } for i in rows]
+
+
+class GreeksEngine:
+    def __init__(self, contracts, underlying=None, model: str = BLACK_SCHOLES,
+                 rate: float = 0.065, dividend: float = 0.0, clock=time.time):
+        """
+        Args:
+            contracts (list): (exchange_segment, security_id, strike, expiry 'YYYY-MM-DD', 'CE'/'PE'),
+                optionally followed by the contract's own underlying (exchange_segment, security_id)
+            underlying: (exchange_segment, security_id) priced for every contract, or a
+                dict expiry -> (exchange_segment, security_id), e.g. the matching future for Black-76
+            model (str): 'black_scholes' (spot underlying) or 'black76' (futures underlying)
+        """
+        self.model = model
+        self.rate = rate
+        self.carry = carry_for(model, rate, dividend)
+        self.clock = clock
+
+        contracts = list(contracts)
+        self.segments = np.array([int(c[0]) for c in contracts], dtype=np.int64)
+        self.security_ids = np.array([int(c[1]) for c in contracts], dtype=np.int64)
+        self.strikes = np.array([float(c[2]) for c in contracts], dtype=np.float64)
+        self.expiries = np.array([str(c[3])[:10] for c in contracts])
+        self.is_call = np.array([str(c[4]).upper() in ("CE", "CALL", "C") for c in contracts])
+        self.underlyings = [
+            tuple(map(int, c[5] if len(c) > 5 else underlying[e] if isinstance(underlying, dict) else underlying))
+            for c, e in zip(contracts, self.expiries)
+        ]
+        self._expiry_days = np.array([date.fromisoformat(e).toordinal() for e in self.expiries], dtype=np.int64)
+        self._table = None
+        self._rows = self._underlying_rows = None
+        self._last_iv = None
+        self.refreshes = 0
+
+    def instruments(self, request_code: int = 15):
+        """MarketFeed subscription list covering the contracts and their underlyings."""
+        pairs = dict.fromkeys(list(zip(self.segments.tolist(), self.security_ids.tolist())) + self.underlyings)
+        return [(segment, sid, request_code) for segment, sid in pairs]
+
+    def _bind(self, table):
+        rows = [table.row_of(s, i) for s, i in zip(self.segments, self.security_ids)]
+        under = [table.row_of(s, i) for s, i in self.underlyings]
+        if None in rows or None in under:
+            raise ValueError("SnapshotTable does not cover every contract and underlying; "
+                             "subscribe GreeksEngine.instruments().")
+        self._table = table
+        self._rows = np.array(rows, dtype=np.intp)
+        self._underlying_rows = np.array(under, dtype=np.intp)
+
+    def update(self, table, now: float = None):
+        """Recompute the whole chain from a SnapshotTable kept current by MarketFeed (feed.snapshot)."""
+        if table is not self._table:
+            self._bind(table)
+        with table._lock:
+            ltp = table.rows['LTP']
+            prices, underlying = ltp[self._rows].copy(), ltp[self._underlying_rows].copy()
+        return self.compute(prices, underlying, now)
+
+    def compute(self, prices, underlying, now: float = None):
+        """
+        Args:
+            prices: Option LTPs in contract order
+            underlying: Underlying price per contract (or one scalar)
+
+        Returns:
+            ChainGreeks
+        """
+        now = self.clock() if now is None else now
+        prices = np.asarray(prices, dtype=np.float64)
+        underlying = np.broadcast_to(np.asarray(underlying, dtype=np.float64), prices.shape)
+        t = year_fraction(self._expiry_days, now)
+        sigma = implied_vol(prices, underlying, self.strikes, t, self.is_call, self.rate, self.carry,
+                            guess=self._last_iv)
+        self._last_iv = np.where(np.isnan(sigma), 0.2, sigma)
+        g = greeks(underlying, self.strikes, t, self._last_iv, self.is_call, self.rate, self.carry)
+        missing = np.isnan(sigma)
+        self.refreshes += 1
+        return ChainGreeks(
+            security_id=self.security_ids, strike=self.strikes, expiry=self.expiries, is_call=self.is_call,
+            price=prices, underlying=underlying, t=t, iv=sigma * 100.0,
+            delta=np.where(missing, np.nan, g["delta"]),
+            gamma=np.where(missing, np.nan, g["gamma"]),
+            theta=np.where(missing, np.nan, g["theta"] / 365.0),
+            vega=np.where(missing, np.nan, g["vega"] / 100.0),
+            computed_at=now,
+        )
+
+    def describe(self):
+        return {
+            "module": "GreeksEngine",
+            "model": self.model,
+            "rate": self.rate,
+            "contracts": len(self.strikes),
+            "expiries": sorted(set(self.expiries.tolist())),
+            "refreshes": self.refreshes
+        }
+
+
+def chain_greeks(snapshot, expiry: str, rate: float = 0.065, model: str = BLACK_SCHOLES,
+                 dividend: float = 0.0, now: float = None):
+    """
+    Local IV and Greeks for an OptionChainCache ChainSnapshot (priced off its
+    underlying LTP), e.g. to refresh between rate-limited chain fetches.
+
+    Returns:
+        ChainGreeks: CE legs first, then PE legs; security_id is 0 (not in the chain payload)
+    """
+    strikes = np.concatenate([snapshot.strikes, snapshot.strikes])
+    prices = np.concatenate([snapshot.columns["ltp"][:, 0], snapshot.columns["ltp"][:, 1]])
+    contracts = [(0, 0, k, expiry, "CE" if i < len(snapshot.strikes) else "PE") for i, k in enumerate(strikes)]
+    engine = GreeksEngine(contracts, (0, 0), model, rate, dividend)
+    return engine.compute(prices, snapshot.underlying_ltp, now)
@@ -1,15 +1,38 @@
 """
 Fetch historical candle data (OHLC + volume) for intraday and daily timeframes.
 Directly uses DhanHTTP and is GPT-callable.
+
+With a CandleStore attached, ranges are read through the local store and only
+the missing days are fetched from the API. Today's session is fetched on every
+call and never stored, so intraday candles for it stay current.
+
+intraday_columns() returns candles as float64 columns instead of JSON lists and
+resample() derives any bar size (3, 10, ... minutes or daily) from 1-minute
+candles, so one fetch serves every interval.
 """
 
 import logging
+from datetime import timedelta
+
+import numpy as np
+
 from brokers.dhan_http import DhanHTTP
+from brokers.candle_store import CANDLE_FIELDS, CandleStore, CandleKey, candle_columns, parse_day, trading_windows
+from brokers.resample import parse_interval, resample, to_fields
+
+INTEGER_FIELDS = ("timestamp", "volume")
 
 
 class Historical:
-    def __init__(self, dhan: DhanHTTP):
+    TOOLS = {
+        "get_intraday": "read",
+        "get_daily": "read"
+    }
+    INTRADAY_WINDOW_DAYS = 5  # trading days per /charts/intraday call
+
+    def __init__(self, dhan: DhanHTTP, store: CandleStore = None):
         self.dhan = dhan
+        self.store = store
 
     def get_intraday(self, security_id: str, exchange_segment: str,
                      instrument_type: str, from_date: str, to_date: str, interval: int = 1):
@@ -22,20 +45,82 @@ class Historical:
         Returns:
             dict: Intraday candles
         """
+        return self._intraday(security_id, exchange_segment, instrument_type, from_date, to_date, interval)
+
+    def intraday_columns(self, security_id: str, exchange_segment: str,
+                         instrument_type: str, from_date: str, to_date: str, interval: int = 1):
+        """
+        get_intraday() with candles as columns instead of nested JSON lists.
+
+        Returns:
+            dict: {"status", "remarks", "data"}; data is {field: float64 array} over CANDLE_FIELDS
+        """
+        return self._intraday(security_id, exchange_segment, instrument_type, from_date, to_date, interval,
+                              arrays=True)
+
+    def resample(self, security_id: str, exchange_segment: str,
+                 instrument_type: str, from_date: str, to_date: str, interval=5):
+        """
+        Candles at any bar size, derived locally from 1-minute candles.
+
+        Args:
+            interval: Minutes (any positive int, e.g. 3 or 10) or "D" for session daily bars
+
+        Returns:
+            dict: {"status", "remarks", "data"}; data is {field: float64 array} over CANDLE_FIELDS
+        """
+        try:
+            interval = parse_interval(interval)
+        except ValueError as e:
+            logging.error(f"[Historical] ❌ {e}")
+            return {"status": "failure", "remarks": str(e), "data": ""}
+
+        response = self.intraday_columns(security_id, exchange_segment, instrument_type, from_date, to_date, 1)
+        return self._resampled(response, interval)
+
+    def _intraday(self, security_id, exchange_segment, instrument_type, from_date, to_date, interval,
+                  arrays=False):
+        payload, error = self._intraday_payload(security_id, exchange_segment, instrument_type,
+                                                from_date, to_date, interval)
+        if error:
+            return error
+        if self.store:
+            return self._read_through("/charts/intraday", payload, str(interval), arrays,
+                                      self.INTRADAY_WINDOW_DAYS)
+        return self._as_columns(self.dhan.post("/charts/intraday", payload), arrays)
+
+    # --- request / response shaping, shared with AsyncHistorical ---
+
+    @staticmethod
+    def _intraday_payload(security_id, exchange_segment, instrument_type, from_date, to_date, interval):
+        """(payload, None), or (None, failure envelope) for an unsupported interval."""
         if interval not in [1, 5, 15, 25, 60]:
             err = "interval must be one of [1, 5, 15, 25, 60]"
             logging.error(f"[Historical] ❌ {err}")
-            return {"status": "failure", "remarks": err, "data": ""}
+            return None, {"status": "failure", "remarks": err, "data": ""}
 
-        payload = {
+        return {
             "securityId": security_id,
             "exchangeSegment": exchange_segment.upper(),
             "instrument": instrument_type.upper(),
             "interval": interval,
             "fromDate": from_date,
             "toDate": to_date
-        }
-        return self.dhan.post("/charts/intraday", payload)
+        }, None
+
+    @staticmethod
+    def _as_columns(response, arrays):
+        if not arrays or response.get("status") != DhanHTTP.HttpResponseStatus.SUCCESS.value:
+            return response
+        return {"status": response.get("status"), "remarks": response.get("remarks", ""),
+                "data": to_fields(candle_columns(response.get("data")))}
+
+    @staticmethod
+    def _resampled(response, interval):
+        if response.get("status") != DhanHTTP.HttpResponseStatus.SUCCESS.value:
+            return response
+        columns = np.stack([response["data"][field] for field in CANDLE_FIELDS])
+        return {**response, "data": to_fields(resample(columns, interval))}
 
     def get_daily(self, security_id: str, exchange_segment: str,
                   instrument_type: str, from_date: str, to_date: str, expiry_code: int = 0):
@@ -61,4 +146,77 @@ class Historical:
             "fromDate": from_date,
             "toDate": to_date
         }
+        if self.store:
+            return self._read_through("/charts/historical", payload, f"D{expiry_code}")
         return self.dhan.post("/charts/historical", payload)
+
+    def invalidate_open_day(self):
+        """Drop stored candles for today (read-through never writes them; a store filled elsewhere might)."""
+        return self.store.invalidate_open_day() if self.store else 0
+
+    # --- read-through store ---
+    # Ranges are whole IST days, from_date..to_date inclusive.
+
+    def _plan(self, payload, interval):
+        key = CandleKey(payload["securityId"], payload["exchangeSegment"],
+                        payload["instrument"], interval)
+        first, last = parse_day(payload["fromDate"]), parse_day(payload["toDate"])
+        return key, first, last
+
+    def _window(self, payload, start, end):
+        # toDate is exclusive on the Dhan side
+        return {**payload, "fromDate": start.isoformat(),
+                "toDate": (end + timedelta(days=1)).isoformat()}
+
+    def _fetches(self, key, first, last, window_days=None):
+        """
+        (start, end, fetch) per API call needed to fill the store. Missing ranges
+        are split into windows of at most window_days weekdays; weekend days ride
+        along with a neighbouring window, and a range with no weekdays is
+        written empty without a call (fetch=False).
+        """
+        for start, end in self.store.missing_ranges(key, first, last):
+            windows = trading_windows(start, end, window_days) if window_days else [(start, end)]
+            if not windows:
+                yield start, end, False
+                continue
+            cover = start
+            for i, (_, window_end) in enumerate(windows):
+                cover_end = end if i == len(windows) - 1 else window_end
+                yield cover, cover_end, True
+                cover = cover_end + timedelta(days=1)
+
+    def _from_store(self, key, first, last, arrays=False, live=()):
+        """Stored candles for first..last, followed by the live (unstored) ones from today on."""
+        columns = self.store.read(key, first, last)
+        if any(part.shape[1] for part in live):
+            columns = {field: np.concatenate([values] + [part[i] for part in live])
+                       for i, (field, values) in enumerate(columns.items())}
+        if not arrays:
+            # the API's shape: integer timestamp / volume, no open_interest
+            columns = {field: values.astype(np.int64).tolist() if field in INTEGER_FIELDS else values.tolist()
+                       for field, values in columns.items() if field != "open_interest"}
+        return {
+            "status": DhanHTTP.HttpResponseStatus.SUCCESS.value,
+            "remarks": "",
+            "data": columns
+        }
+
+    def _read_through(self, endpoint, payload, interval, arrays=False, window_days=None):
+        key, first, last = self._plan(payload, interval)
+        live = []
+        for start, end, fetch in self._fetches(key, first, last, window_days):
+            data = None
+            if fetch:
+                response = self.dhan.post(endpoint, self._window(payload, start, end))
+                if response.get("status") != DhanHTTP.HttpResponseStatus.SUCCESS.value:
+                    return response
+                data = response.get("data")
+            live.append(self.store.write_range(key, start, end, data))
+        return self._from_store(key, first, last, arrays, live)
+
+    def describe(self):
+        return {
+            "module": "Historical",
+            "tools": dict(self.TOOLS)
+        }
@@ -0,0 +1,211 @@
+"""
+Per-endpoint HTTP instrumentation for DhanHTTP / AsyncDhanHTTP.
+
+HttpMetrics keeps, per (method, endpoint), latency histograms for the
+connect, ttfb (request sent -> response headers), total (-> body read) and
+parse phases, plus response status and error counts. Export with as_dict()
+or prometheus().
+
+Endpoints are normalised (ids -> {id}) so label cardinality stays bounded.
+Pre/post hooks let callers attach tracing; a failing hook is logged, never
+raised into the request.
+"""
+
+import logging
+import re
+import threading
+from time import perf_counter_ns
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from core.latency import LatencyHistogram
+
+PHASES = ("connect", "ttfb", "total", "parse")
+
+_ID_SEGMENT = re.compile(r"/(?=[^/]*\d)[^/]+")
+_EXTERNAL = re.compile(r"(/external)/[^/]+")
+
+
+def endpoint_label(endpoint: str) -> str:
+    """'/orders/112233' -> '/orders/{id}'; query strings are dropped."""
+    path = endpoint.split("?", 1)[0]
+    path = _EXTERNAL.sub(r"\1/{id}", path)
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+# --- connect timing for requests/urllib3 ---
+
+_connect = threading.local()
+
+
+def _timed(connection_cls):
+    class Timed(connection_cls):
+        def connect(self):
+            start = perf_counter_ns()
+            try:
+                super().connect()
+            finally:
+                _connect.ns = getattr(_connect, "ns", 0) + perf_counter_ns() - start
+    Timed.__name__ = f"Timed{connection_cls.__name__}"
+    return Timed
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _timed(HTTPConnection)
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _timed(HTTPSConnection)
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections report DNS+TCP+TLS setup time to HttpMetrics."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def reset_connect_timer():
+    _connect.ns = 0
+
+
+def connect_ns():
+    """Connection setup time spent by this thread since reset_connect_timer() (0 if reused)."""
+    return getattr(_connect, "ns", 0)
+
+
+# --- registry ---
+
+class _EndpointStats:
+    __slots__ = ("phases", "statuses", "errors")
+
+    def __init__(self):
+        self.phases = {phase: LatencyHistogram() for phase in PHASES}
+        self.statuses = {}
+        self.errors = {}
+
+
+class HttpMetrics:
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.pre_hooks = []
+        self.post_hooks = []
+
+    # --- hooks ---
+
+    def add_hooks(self, pre=None, post=None):
+        """
+        pre(info) runs before the request; post(info, result, timings) after it.
+        info is {"method", "endpoint", "label", "payload"}; timings maps phase -> ns.
+        """
+        if pre is not None:
+            self.pre_hooks.append(pre)
+        if post is not None:
+            self.post_hooks.append(post)
+
+    def remove_hooks(self, pre=None, post=None):
+        if pre in self.pre_hooks:
+            self.pre_hooks.remove(pre)
+        if post in self.post_hooks:
+            self.post_hooks.remove(post)
+
+    def before(self, method: str, endpoint: str, payload=None):
+        info = {"method": method, "endpoint": endpoint, "label": endpoint_label(endpoint), "payload": payload}
+        for hook in self.pre_hooks:
+            try:
+                hook(info)
+            except Exception as e:
+                logging.warning(f"[HttpMetrics] ⚠️ Pre-hook failed: {e}")
+        return info
+
+    def after(self, info, result, timings):
+        for hook in self.post_hooks:
+            try:
+                hook(info, result, timings)
+            except Exception as e:
+                logging.warning(f"[HttpMetrics] ⚠️ Post-hook failed: {e}")
+
+    # --- recording ---
+
+    def _entry(self, method, label):
+        key = (method, label)
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, _EndpointStats())
+        return stats
+
+    def observe(self, info, status: int, timings: dict):
+        stats = self._entry(info["method"], info["label"])
+        with self._lock:
+            for phase, ns in timings.items():
+                if ns is not None:
+                    stats.phases[phase].observe(ns)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def error(self, info, exc: Exception):
+        stats = self._entry(info["method"], info["label"])
+        name = type(exc).__name__
+        with self._lock:
+            stats.errors[name] = stats.errors.get(name, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    # --- export ---
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: "METHOD /endpoint" -> {"phases": {phase: histogram}, "statuses": {...}, "errors": {...}}
+        """
+        with self._lock:
+            return {
+                f"{method} {label}": {
+                    "phases": {phase: h.as_dict() for phase, h in stats.phases.items() if h.count},
+                    "statuses": {str(code): n for code, n in stats.statuses.items()},
+                    "errors": dict(stats.errors)
+                }
+                for (method, label), stats in sorted(self._stats.items())
+            }
+
+    def prometheus(self, prefix: str = "dhan_http"):
+        """Prometheus text exposition format (durations in seconds)."""
+        durations, responses, errors = [], [], []
+        with self._lock:
+            for (method, label), stats in sorted(self._stats.items()):
+                base = f'method="{method}",endpoint="{label}"'
+                for phase, h in stats.phases.items():
+                    if not h.count:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(h.bounds + ("+Inf",), h.counts):
+                        cumulative += n
+                        le = bound if bound == "+Inf" else repr(bound / 1e6)
+                        durations.append(f'{prefix}_duration_seconds_bucket{{{base},phase="{phase}",le="{le}"}} {cumulative}')
+                    durations.append(f'{prefix}_duration_seconds_sum{{{base},phase="{phase}"}} {h.sum_ns / 1e9!r}')
+                    durations.append(f'{prefix}_duration_seconds_count{{{base},phase="{phase}"}} {h.count}')
+                for code, n in sorted(stats.statuses.items()):
+                    responses.append(f'{prefix}_responses_total{{{base},status="{code}"}} {n}')
+                for name, n in sorted(stats.errors.items()):
+                    errors.append(f'{prefix}_errors_total{{{base},error="{name}"}} {n}')
+        # each metric family must be one contiguous group
+        lines = [f"# TYPE {prefix}_duration_seconds histogram", *durations,
+                 f"# TYPE {prefix}_responses_total counter", *responses,
+                 f"# TYPE {prefix}_errors_total counter", *errors]
+        return "\n".join(lines) + "\n"
+
+    def describe(self):
+        return {
+            "module": "HttpMetrics",
+            "endpoints": self.as_dict(),
+            "hooks": {"pre": len(self.pre_hooks), "post": len(self.post_hooks)}
+        }
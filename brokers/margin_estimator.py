@@ -0,0 +1,303 @@
+"""
+Memoized pre-trade margin estimation and a local funds ledger.
+
+MarginEstimator answers margin queries for whole baskets. Results from
+/margincalculator are memoized for `ttl` seconds per (security, segment, side,
+product, quantity band, price band); a leg that lands in a cached band is
+priced by scaling the cached margin by notional, so repeated checks around the
+same size and price do not touch the network. Misses in a basket are
+de-duplicated and fetched concurrently through Funds.calculate_margins().
+
+FundsLedger holds available / utilized funds, seeded from get_fund_limits()
+and moved locally by order fills (via OrderIndex), so check() compares a
+basket's margin with the ledger instead of calling /fundlimit. refresh()
+re-reads the broker figures; fills between refreshes are booked
+conservatively at the instrument's cached margin rate (full notional if none).
+The ledger nets fills per (security, product): a fill that opens or adds to
+a position (long or short) blocks margin, one that reduces it releases the
+margin booked for the closed quantity. Positions opened before attach() are
+not known to it, so their closing fills are booked as new ones until the
+next refresh() corrects the totals.
+
+    ledger = FundsLedger(dhan.funds).attach(dhan.order.index)
+    estimator = MarginEstimator(dhan.funds, ledger=ledger)
+    estimator.check([{"security_id": "1333", "exchange_segment": "NSE_EQ", "transaction_type": "BUY",
+                      "quantity": 10, "product_type": "INTRADAY", "price": 1500.0}, ...])
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from brokers.dhan_http import DhanHTTP
+from brokers.order_index import PRODUCT_CODES
+
+MARGIN_FIELDS = ("totalMargin", "spanMargin", "exposureMargin", "variableMargin")  # scaled with notional
+SELL_SIDES = ("S", "SELL")  # OrderState.transaction_type is "B"/"S" from the stream, "BUY"/"SELL" from REST
+
+
+def band(value: float, width: float):
+    """Log-scale bucket: values within a factor of (1 + width) of each other share a band."""
+    return math.floor(math.log(value) / math.log1p(width)) if value > 0 else 0
+
+
+class _Margin:
+    __slots__ = ("response", "notional", "fetched_at")
+
+    def __init__(self, response, notional, fetched_at):
+        self.response = response
+        self.notional = notional
+        self.fetched_at = fetched_at
+
+
+class FundsLedger:
+    def __init__(self, funds, max_age: float = 300.0, clock=time.monotonic):
+        """
+        Args:
+            funds: Funds, read once per refresh()
+            max_age (float): Seconds after which the ledger counts as stale and check() refreshes it
+        """
+        self.funds = funds
+        self.max_age = max_age
+        self.clock = clock
+        self.available = None
+        self.utilized = 0.0
+        self.sod_limit = None
+        self.refreshed_at = None
+        self.rates = {}  # (security_id, product) -> margin per unit notional, fed by MarginEstimator
+        self.positions = {}  # (security_id, product) -> [net qty (short < 0), margin booked for it]
+        self._fills_seen = {}
+        self._lock = threading.Lock()
+        self.stats = {"refreshes": 0, "fills": 0, "errors": 0}
+
+    @property
+    def stale(self):
+        return self.refreshed_at is None or self.clock() - self.refreshed_at > self.max_age
+
+    def refresh(self):
+        """Re-seed from get_fund_limits(). Returns False (ledger unchanged) on failure."""
+        response = self.funds.get_fund_limits()
+        if response.get("status") != "success":
+            self.stats["errors"] += 1
+            logging.error(f"[FundsLedger] ❌ Fund limits failed: {response.get('remarks')}")
+            return False
+        data = response.get("data") or {}
+        with self._lock:
+            # the API spells it "availabelBalance"
+            self.available = float(data.get("availabelBalance", data.get("availableBalance", 0.0)) or 0.0)
+            self.utilized = float(data.get("utilizedAmount", 0.0) or 0.0)
+            self.sod_limit = data.get("sodLimit")
+            self.refreshed_at = self.clock()
+            self.stats["refreshes"] += 1
+        return True
+
+    def book(self, amount: float):
+        """Move `amount` of funds from available to utilized (negative releases)."""
+        with self._lock:
+            if self.available is not None:
+                self.available -= amount
+            self.utilized += amount
+
+    def on_fill(self, security_id, product: str, qty: int, price: float, transaction_type: str = "BUY"):
+        """Book one fill: opening quantity blocks margin, closing quantity releases its share."""
+        key = (str(security_id), str(product).upper())
+        signed = -qty if str(transaction_type).upper() in SELL_SIDES else qty
+        with self._lock:
+            position = self.positions.setdefault(key, [0, 0.0])
+            net, booked = position
+            closing = min(qty, abs(net)) if net * signed < 0 else 0
+            released = booked * closing / abs(net) if closing else 0.0
+            blocked = self.rates.get(key, 1.0) * (qty - closing) * price
+            position[0], position[1] = net + signed, booked - released + blocked
+            if not position[0]:
+                del self.positions[key]
+        self.book(blocked - released)
+        self.stats["fills"] += 1
+
+    def on_order(self, state):
+        """OrderIndex callback: book the fills of an OrderState not seen before."""
+        seen = self._fills_seen.get(state.order_id, 0)
+        if len(state.fills) <= seen:
+            return
+        self._fills_seen[state.order_id] = len(state.fills)
+        raw = state.raw or {}
+        product = str(raw.get("Product") or raw.get("productType") or "").upper()
+        for qty, price in state.fills[seen:]:
+            self.on_fill(state.security_id, PRODUCT_CODES.get(product, product), qty, price,
+                         state.transaction_type or "BUY")
+
+    def attach(self, order_index):
+        """Book fills from an OrderIndex; orders it already holds count as booked."""
+        for order_id, state in order_index.orders.items():
+            self._fills_seen[order_id] = len(state.fills)
+        order_index.subscribe(self.on_order)
+        return self
+
+    async def refresh_every(self, interval: float = 60.0):
+        while True:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(interval)
+
+    def describe(self):
+        return {
+            "module": "FundsLedger",
+            "available": self.available,
+            "utilized": self.utilized,
+            "open_positions": len(self.positions),
+            "stale": self.stale,
+            "stats": dict(self.stats)
+        }
+
+
+class MarginEstimator:
+    def __init__(self, funds, ledger: FundsLedger = None, ttl: float = 10.0, qty_band: float = 0.25,
+                 price_band: float = 0.01, max_workers: int = 8, max_entries: int = 4096, clock=time.monotonic):
+        """
+        Args:
+            funds: Funds (its calculate_margins() fetches cache misses)
+            ledger (FundsLedger): Local funds for check(); /fundlimit is only read when it is stale
+            ttl (float): Seconds a memoized margin is reused
+            qty_band / price_band (float): Relative width of the quantity / price bands
+        """
+        self.funds = funds
+        self.ledger = ledger
+        self.ttl = ttl
+        self.qty_band = qty_band
+        self.price_band = price_band
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "requests": 0}
+
+    def key(self, leg):
+        price = float(leg.get("price") or 0.0)
+        return (str(leg["security_id"]), leg["exchange_segment"].upper(), leg["transaction_type"].upper(),
+                leg["product_type"].upper(), band(int(leg["quantity"]), self.qty_band),
+                band(price, self.price_band), float(leg.get("trigger_price") or 0.0) > 0)
+
+    @staticmethod
+    def _notional(leg):
+        # market legs (price 0) scale by quantity alone
+        return int(leg["quantity"]) * (float(leg.get("price") or 0.0) or 1.0)
+
+    def _cached(self, key, now):
+        entry = self._entries.get(key)
+        return entry if entry is not None and now - entry.fetched_at < self.ttl else None
+
+    def _scaled(self, entry, leg, source):
+        factor = self._notional(leg) / entry.notional if entry.notional else 1.0
+        data = dict(entry.response.get("data") or {})
+        for field in MARGIN_FIELDS:
+            if isinstance(data.get(field), (int, float)):
+                data[field] = round(data[field] * factor, 2)
+        if isinstance(data.get("availableBalance"), (int, float)) and "totalMargin" in data:
+            data["insufficientBalance"] = round(max(data["totalMargin"] - data["availableBalance"], 0.0), 2)
+        return {"status": "success", "remarks": "", "data": data, "source": source}
+
+    def _store(self, key, leg, response, now):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                expired = [k for k, e in self._entries.items() if now - e.fetched_at >= self.ttl]
+                for k in expired or list(self._entries)[:len(self._entries) // 2]:
+                    del self._entries[k]
+            self._entries[key] = _Margin(response, self._notional(leg), now)
+        total = (response.get("data") or {}).get("totalMargin")
+        if self.ledger is not None and isinstance(total, (int, float)) and float(leg.get("price") or 0.0) > 0:
+            self.ledger.rates[(str(leg["security_id"]), leg["product_type"].upper())] = \
+                total / self._notional(leg)
+
+    def estimate(self, legs):
+        """
+        Margin for each leg: memoized when a fresh result covers its band, the
+        rest fetched concurrently (one request per distinct band).
+
+        Returns:
+            list: margin envelopes in input order, each with "source": "cache" or "network"
+        """
+        now = self.clock()
+        results, misses = [None] * len(legs), {}
+        with self._lock:
+            for i, leg in enumerate(legs):
+                try:
+                    key = self.key(leg)
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    results[i] = DhanHTTP._failure(f"invalid leg: {e!r}")
+                    self.stats["errors"] += 1
+                    continue
+                entry = self._cached(key, now)
+                if entry is not None:
+                    results[i] = self._scaled(entry, leg, "cache")
+                    self.stats["hits"] += 1
+                else:
+                    misses.setdefault(key, []).append(i)
+        if not misses:
+            return results
+
+        keys = list(misses)
+        self.stats["misses"] += sum(len(v) for v in misses.values())
+        self.stats["requests"] += len(keys)
+        responses = self.funds.calculate_margins([legs[misses[k][0]] for k in keys], self.max_workers)
+        now = self.clock()
+        for key, response in zip(keys, responses):
+            first = legs[misses[key][0]]
+            if response.get("status") != "success":
+                self.stats["errors"] += 1
+                for i in misses[key]:
+                    results[i] = response
+                continue
+            self._store(key, first, response, now)
+            entry = _Margin(response, self._notional(first), now)
+            for i in misses[key]:
+                results[i] = self._scaled(entry, legs[i], "network")
+        return results
+
+    def check(self, legs):
+        """
+        Pre-trade check of a basket against the ledger (or the broker's
+        availableBalance when no ledger is attached).
+
+        Returns:
+            dict: {"ok", "required", "available", "shortfall", "network_calls", "legs", "errors"}
+        """
+        requests_before = self.stats["requests"]
+        margins = self.estimate(legs)
+        priced = [m["data"] or {} for m in margins if m.get("status") == "success"]
+        failed = [m for m in margins if m.get("status") != "success"]
+        required = sum(float(data.get("totalMargin", 0.0) or 0.0) for data in priced)
+        calls = self.stats["requests"] - requests_before
+        if self.ledger is not None:
+            if self.ledger.stale:
+                self.ledger.refresh()
+                calls += 1
+            available = self.ledger.available
+        else:
+            available = next((data["availableBalance"] for data in priced
+                              if isinstance(data.get("availableBalance"), (int, float))), None)
+        ok = not failed and available is not None and required <= available
+        return {
+            "ok": ok,
+            "required": round(required, 2),
+            "available": available,
+            "shortfall": round(max(required - available, 0.0), 2) if available is not None else None,
+            "network_calls": calls,
+            "legs": margins,
+            "errors": [m.get("remarks") for m in failed]
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def describe(self):
+        return {
+            "module": "MarginEstimator",
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "bands": {"quantity": self.qty_band, "price": self.price_band},
+            "ledger": self.ledger.describe() if self.ledger is not None else None,
+            "stats": dict(self.stats)
+        }
@@ -1,10 +1,18 @@
 import asyncio
+import logging
+import threading
 import websockets
 import struct
-from datetime import datetime
 from collections import defaultdict
 import json
 
+from brokers.feed_decoder import (
+    FeedDecoder, EXCHANGE_NAMES, TICKER_STRUCT, DEPTH_STRUCT, QUOTE_STRUCT, OI_STRUCT, FULL_STRUCT,
+    depth_levels, ticker_dict, depth_dict, quote_dict, oi_dict, full_dict
+)
+from brokers.snapshot_table import SnapshotTable
+from brokers.supervisor import ConnectionSupervisor
+
 class MarketFeed:
     market_feed_wss = 'wss://api-feed.dhan.co'
 
@@ -17,38 +25,166 @@ class MarketFeed:
         self.instruments = getattr(context, "market_instruments", [])
         self.version = "v1"
         self.ws = None
-        self.loop = asyncio.get_event_loop()
+        self._loop = None  # event loop for the sync wrappers, resolved on first use
         self.is_authorized = False
         self.data = ""
+        self.decoder = None  # FeedDecoder, created on first batch read
+        self.snapshot = None  # SnapshotTable, allocated at subscribe time once enabled
+        self.snapshot_enabled = False
+        self.bars = None  # BarBuilder, fed from every packet read once enabled
+        self._snapshot_thread = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_loop = None  # the worker thread's event loop
+        self._snapshot_task = None
+        self.supervisor = None
+        self.recorder = None  # TickRecorder, journals every received frame once set
 
     def describe(self):
         return {
             "module": "MarketFeed",
             "client_id": bool(self.client_id),
             "instruments": len(self.instruments),
-            "connected": self.ws is not None
+            "connected": self.ws is not None,
+            "decoder": "columnar" if self.decoder else "dict",
+            "snapshot": self.snapshot.describe() if self.snapshot is not None else None,
+            "bars": self.bars.describe() if self.bars is not None else None,
+            "recorder": self.recorder.describe() if self.recorder is not None else None,
+            "supervisor": self.supervisor.metrics() if self.supervisor is not None else None
         }
 
+    @property
+    def loop(self):
+        if self._loop is None:
+            try:
+                self._loop = asyncio.get_event_loop()
+            except RuntimeError:  # e.g. after asyncio.run() cleared the current loop
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+        return self._loop
+
     def run_forever(self):
         self.loop.run_until_complete(self.connect())
 
     def get_data(self):
         return self.loop.run_until_complete(self.get_instrument_data())
 
+    def get_batch(self, max_frames=512, max_wait=0.005):
+        return self.loop.run_until_complete(self.get_instrument_batch(max_frames, max_wait))
+
+    def enable_snapshot(self):
+        """Keep self.snapshot (a SnapshotTable) updated from every packet read."""
+        self.snapshot_enabled = True
+        if self.snapshot is None:
+            self.snapshot = SnapshotTable(self.instruments)
+        return self.snapshot
+
+    def enable_bars(self, intervals=(1,), on_bar=None, **kwargs):
+        """
+        Build OHLCV bars from every packet read (see brokers.bar_builder).
+
+        Returns:
+            BarBuilder: emits completed bars via on_bar(interval, bars) and stream()
+        """
+        from brokers.bar_builder import BarBuilder
+
+        if self.bars is None:
+            self.bars = BarBuilder(self.instruments, intervals, on_bar, **kwargs)
+        return self.bars
+
+    def _apply(self, batch):
+        if self.snapshot is not None:
+            self.snapshot.apply(batch)
+        if self.bars is not None:
+            self.bars.apply(batch)
+
+    def start_snapshot(self, max_frames=512):
+        """
+        Connect and maintain the snapshot table from a background thread with
+        its own event loop. Read it with self.snapshot.get()/snapshot(); the
+        sync get_data()/get_batch() helpers must not be used while it runs.
+        """
+        self.enable_snapshot()
+        self._snapshot_stop.clear()
+        self._snapshot_loop = asyncio.new_event_loop()
+        self._snapshot_thread = threading.Thread(
+            target=self._snapshot_worker, args=(self._snapshot_loop, max_frames),
+            name="MarketFeedSnapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+        return self.snapshot
+
+    def stop_snapshot(self, timeout=5.0):
+        """Cancel the worker (even while it waits on a quiet feed), then close the connection."""
+        self._snapshot_stop.set()
+        if self._snapshot_loop is not None:
+            try:
+                self._snapshot_loop.call_soon_threadsafe(self._cancel_snapshot)
+            except RuntimeError:  # worker already finished and closed its loop
+                pass
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join(timeout)
+            if self._snapshot_thread.is_alive():
+                logging.warning(f"[MarketFeed] ⚠️ Snapshot worker still running after {timeout}s")
+            self._snapshot_thread = None
+
+    def _cancel_snapshot(self):
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+
+    def _snapshot_worker(self, loop, max_frames):
+        asyncio.set_event_loop(loop)
+        self._snapshot_task = loop.create_task(self.maintain_snapshot(max_frames))
+        try:
+            loop.run_until_complete(self._snapshot_task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.error(f"[MarketFeed] ❌ Snapshot worker stopped: {e}")
+        finally:
+            try:
+                loop.run_until_complete(self._close_ws())
+            finally:
+                self._snapshot_task = None
+                self._snapshot_loop = None
+                loop.close()
+
+    async def maintain_snapshot(self, max_frames=512):
+        self.enable_snapshot()
+        await self.connect()
+        while not self._snapshot_stop.is_set():
+            await self.get_instrument_batch(max_frames)
+
+    def start_recording(self, directory, **kwargs):
+        """Journal every received frame to `directory` (see brokers.tick_journal)."""
+        from brokers.tick_journal import TickRecorder
+
+        if self.recorder is None:
+            self.recorder = TickRecorder(directory, **kwargs).start()
+        return self.recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.stop()
+        return recorder
+
     def close_connection(self):
         return self.loop.run_until_complete(self.disconnect())
 
     async def connect(self):
         if not self.ws or self.ws.state == websockets.protocol.State.CLOSED:
-            if self.version == 'v1':
-                self.ws = await websockets.connect(MarketFeed.market_feed_wss)
-                await self.authorize()
-            elif self.version == 'v2':
-                url = f"{MarketFeed.market_feed_wss}?version=2&token={self.access_token}&clientId={self.client_id}&authType=2"
-                self.ws = await websockets.connect(url)
+            self.ws = await self._open()
             await self.subscribe_instruments()
 
-    async def authorize(self):
+    async def _open(self):
+        if self.version == 'v2':
+            url = f"{self.market_feed_wss}?version=2&token={self.access_token}&clientId={self.client_id}&authType=2"
+            return await websockets.connect(url)
+        ws = await websockets.connect(self.market_feed_wss)
+        await self.authorize(ws)
+        return ws
+
+    async def authorize(self, ws=None):
         if self.version != 'v1':
             self.is_authorized = True
             return
@@ -57,11 +193,47 @@ class MarketFeed:
         dhan_auth = b'\0' * 50
         payload = api_access_token + b"2P"
         header = struct.pack('<bH30s50s', 11, 83 + len(payload), client_id, dhan_auth)
-        await self.ws.send(header + payload)
+        await (ws or self.ws).send(header + payload)
         self.is_authorized = True
 
-    async def subscribe_instruments(self):
-        instrument_batches = self._process_batches(self.instruments)
+    def supervised(self, handler, standby=False, backoff=None, max_frames=512, max_wait=0.005):
+        """
+        Build a ConnectionSupervisor that keeps this feed connected: drops are
+        retried with jittered backoff and the current instrument set is
+        resubscribed. handler receives each DecodedBatch.
+        """
+        async def subscribe(ws):
+            self.ws = ws
+            await self.subscribe_instruments()
+
+        async def receive(ws):
+            while True:
+                yield await self.get_instrument_batch(max_frames, max_wait)
+
+        self.supervisor = ConnectionSupervisor(
+            "MarketFeed", self._open, subscribe, receive, handler,
+            backoff=backoff, standby=standby
+        )
+        return self.supervisor
+
+    async def run_supervised(self, handler, standby=False, backoff=None, max_frames=512):
+        await self.supervised(handler, standby, backoff, max_frames).run()
+
+    async def subscribe(self, instruments):
+        """Add instruments to the subscription set (replayed on every reconnect)."""
+        new = [inst for inst in instruments if inst not in self.instruments]
+        self.instruments = list(self.instruments) + new
+        if self.ws is not None and new:
+            await self.subscribe_instruments(new)
+
+    async def subscribe_instruments(self, instruments=None):
+        if self.snapshot_enabled and self.snapshot is None:
+            self.snapshot = SnapshotTable(self.instruments)
+        elif self.snapshot is not None and not self.snapshot.covers(self.instruments):
+            self.snapshot.add_instruments(self.instruments)
+        if self.bars is not None and not self.bars.covers(self.instruments):
+            self.bars.add_instruments(self.instruments)
+        instrument_batches = self._process_batches(instruments or self.instruments)
         for req_code, batches in instrument_batches.items():
             for batch in batches:
                 if self.version == 'v2':
@@ -82,8 +254,47 @@ class MarketFeed:
 
     async def get_instrument_data(self):
         response = await self.ws.recv()
+        if self.recorder is not None:
+            self.recorder.record(response)
+        if self.snapshot is not None or self.bars is not None:
+            self._apply(self._get_decoder().decode([response]))
         return self._parse_response(response)
 
+    def _get_decoder(self):
+        if self.decoder is None:
+            self.decoder = FeedDecoder()
+        return self.decoder
+
+    async def get_instrument_batch(self, max_frames=512, max_wait=0.005):
+        """
+        Receive up to max_frames frames, waiting at most max_wait seconds after
+        the first one, and decode them together into columnar buffers.
+
+        Returns:
+            DecodedBatch: per-packet-type structured arrays (raw epoch LTT);
+            call .as_dicts() for the same dicts get_data() returns.
+        """
+        decoder = self._get_decoder()
+        recorder = self.recorder
+        frames = [await self.ws.recv()]
+        if recorder is not None:
+            recorder.record(frames[0])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        while len(frames) < max_frames:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                frames.append(await asyncio.wait_for(self.ws.recv(), remaining))
+            except asyncio.TimeoutError:
+                break
+            if recorder is not None:
+                recorder.record(frames[-1])
+        batch = decoder.decode(frames)
+        self._apply(batch)
+        return batch
+
     async def disconnect(self):
         if self.ws:
             if self.version == 'v2':
@@ -91,11 +302,22 @@ class MarketFeed:
                 header = self._header(12, 83)
                 await self.ws.send(header)
 
+    async def _close_ws(self, timeout=1.0):
+        """disconnect() and close the socket; abort it if the close handshake stalls."""
+        ws = self.ws
+        if ws is None:
+            return
+        try:
+            await asyncio.wait_for(self.disconnect(), timeout)
+            await asyncio.wait_for(ws.close(), timeout)
+        except Exception as e:
+            logging.warning(f"[MarketFeed] ⚠️ Close failed, aborting connection: {e}")
+            ws.transport.abort()
+        finally:
+            self.ws = None
+
     def _exchange_name(self, code):
-        return {
-            0: "IDX_I", 1: "NSE_EQ", 2: "NSE_FNO", 3: "NSE_CURRENCY",
-            4: "BSE_EQ", 5: "MCX_COMM", 7: "BSE_CURRENCY", 8: "BSE_FNO"
-        }.get(code, str(code))
+        return EXCHANGE_NAMES.get(code, str(code))
 
     def _process_batches(self, tuples_list, batch_size=100):
         result = defaultdict(list)
@@ -122,7 +344,7 @@ class MarketFeed:
         return struct.pack('<bH30s50s', code, length, client, dhan)
 
     def _parse_response(self, data):
-        first = struct.unpack('<B', data[0:1])[0]
+        first = data[0]
         if first == 2: return self._parse_ticker(data)
         if first == 3: return self._parse_depth(data)
         if first == 4: return self._parse_quote(data)
@@ -130,90 +352,18 @@ class MarketFeed:
         if first == 8: return self._parse_full(data)
 
     def _parse_ticker(self, data):
-        d = struct.unpack('<BHBIfI', data[0:16])
-        return {
-            "type": "Ticker",
-            "exchange_segment": d[2],
-            "security_id": d[3],
-            "LTP": round(d[4], 2),
-            "LTT": datetime.utcfromtimestamp(d[5]).strftime('%H:%M:%S')
-        }
+        return ticker_dict(TICKER_STRUCT.unpack_from(data))
 
     def _parse_depth(self, data):
-        d = struct.unpack('<BHBIf100s', data[0:112])
-        depth_data = d[5]
-        depth = []
-        for i in range(5):
-            pkt = struct.unpack('<IIHHff', depth_data[i * 20:(i + 1) * 20])
-            depth.append({
-                "bid_qty": pkt[0], "ask_qty": pkt[1],
-                "bid_orders": pkt[2], "ask_orders": pkt[3],
-                "bid_price": round(pkt[4], 2), "ask_price": round(pkt[5], 2)
-            })
-        return {
-            "type": "Depth",
-            "exchange_segment": d[2],
-            "security_id": d[3],
-            "LTP": round(d[4], 2),
-            "depth": depth
-        }
+        d = DEPTH_STRUCT.unpack_from(data)
+        return depth_dict(d, depth_levels(d[5]))
 
     def _parse_quote(self, data):
-        d = struct.unpack('<BHBIfHIfIIIffff', data[0:50])
-        return {
-            "type": "Quote",
-            "exchange_segment": d[2],
-            "security_id": d[3],
-            "LTP": round(d[4], 2),
-            "LTQ": d[5],
-            "LTT": datetime.utcfromtimestamp(d[6]).strftime('%H:%M:%S'),
-            "avg_price": round(d[7], 2),
-            "volume": d[8],
-            "total_sell_qty": d[9],
-            "total_buy_qty": d[10],
-            "open": round(d[11], 2),
-            "close": round(d[12], 2),
-            "high": round(d[13], 2),
-            "low": round(d[14], 2)
-        }
+        return quote_dict(QUOTE_STRUCT.unpack_from(data))
 
     def _parse_oi(self, data):
-        d = struct.unpack('<BHBII', data[0:12])
-        return {
-            "type": "OI",
-            "exchange_segment": d[2],
-            "security_id": d[3],
-            "OI": d[4]
-        }
+        return oi_dict(OI_STRUCT.unpack_from(data))
 
     def _parse_full(self, data):
-        d = struct.unpack('<BHBIfHIfIIIIIIffff100s', data[0:162])
-        depth_data = d[18]
-        depth = []
-        for i in range(5):
-            pkt = struct.unpack('<IIHHff', depth_data[i * 20:(i + 1) * 20])
-            depth.append({
-                "bid_qty": pkt[0], "ask_qty": pkt[1],
-                "bid_orders": pkt[2], "ask_orders": pkt[3],
-                "bid_price": round(pkt[4], 2), "ask_price": round(pkt[5], 2)
-            })
-        return {
-            "type": "Full",
-            "exchange_segment": d[2],
-            "security_id": d[3],
-            "LTP": round(d[4], 2),
-            "LTQ": d[5],
-            "LTT": datetime.utcfromtimestamp(d[6]).strftime('%H:%M:%S'),
-            "avg_price": round(d[7], 2),
-            "volume": d[8],
-            "total_sell_qty": d[9],
-            "total_buy_qty": d[10],
-            "OI": d[11],
-            "oi_day_high": d[12],
-            "oi_day_low": d[13],
-            "open": round(d[14], 2),
-            "close": round(d[15], 2),
-            "high": round(d[16], 2),
-            "low": round(d[17], 2),
-            "depth": depth
-        }
+        d = FULL_STRUCT.unpack_from(data)
+        return full_dict(d, depth_levels(d[18]))
@@ -7,6 +7,11 @@ from brokers.dhan_http import DhanHTTP
 
 
 class OptionChain:
+    TOOLS = {
+        "get_chain": "read",
+        "get_expiry_dates": "read"
+    }
+
     def __init__(self, dhan: DhanHTTP):
         self.dhan = dhan
 
@@ -45,3 +50,9 @@ class OptionChain:
             "UnderlyingSeg": under_exchange_segment.upper()
         }
         return self.dhan.post("/optionchain/expirylist", payload)
+
+    def describe(self):
+        return {
+            "module": "OptionChain",
+            "tools": dict(self.TOOLS)
+        }
@@ -0,0 +1,379 @@
+"""
+Caching layer over OptionChain with columnar snapshots and incremental diffs.
+
+- Per-endpoint TTLs: the chain is cached for chain_ttl seconds (never less than
+  Dhan's option-chain rate window), the expiry list until the IST date changes
+  or expiry_ttl elapses.
+- Concurrent callers of the same key share one in-flight request (threads via
+  get_*, coroutines via get_*_async when wrapping an AsyncOptionChain).
+- Each chain is parsed once into a ChainSnapshot: sorted strikes plus one
+  (strike, CE/PE) float64 array per field. ChainDiff marks the strikes whose
+  LTP, OI or IV moved since the previous snapshot.
+
+Failures are returned as-is and never evict the last good entry.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from brokers.candle_store import ist_today
+from brokers.dhan_http import DhanHTTP
+from brokers.option_chain import OptionChain
+from brokers.rate_limiter import DEFAULT_LIMITS, OPTION_CHAIN
+
+CE, PE = 0, 1
+SIDES = ("CE", "PE")
+
+# snapshot column -> key in the Dhan per-leg payload (greeks are nested)
+CHAIN_FIELDS = {
+    "ltp": "last_price",
+    "oi": "oi",
+    "iv": "implied_volatility",
+    "volume": "volume",
+    "bid": "top_bid_price",
+    "bid_qty": "top_bid_quantity",
+    "ask": "top_ask_price",
+    "ask_qty": "top_ask_quantity",
+    "prev_close": "previous_close_price",
+    "prev_oi": "previous_oi",
+    "prev_volume": "previous_volume",
+    "delta": "delta",
+    "gamma": "gamma",
+    "theta": "theta",
+    "vega": "vega",
+}
+_GREEKS = ("delta", "gamma", "theta", "vega")
+DIFF_FIELDS = ("ltp", "oi", "iv")
+
+MIN_CHAIN_TTL = max(per for _, per in DEFAULT_LIMITS[OPTION_CHAIN])
+
+
+def _chain_payload(data):
+    """Dhan wraps the chain as {"data": {"last_price", "oc"}, "status"}; accept either level."""
+    if isinstance(data, dict) and "oc" not in data and isinstance(data.get("data"), dict):
+        data = data["data"]
+    return data or {}
+
+
+class ChainSnapshot:
+    __slots__ = ("key", "underlying_ltp", "strikes", "columns", "present", "fetched_at")
+
+    def __init__(self, key, underlying_ltp, strikes, columns, present, fetched_at):
+        self.key = key
+        self.underlying_ltp = underlying_ltp
+        self.strikes = strikes  # (n,) sorted
+        self.columns = columns  # field -> (n, 2) float64, column 0 = CE, 1 = PE
+        self.present = present  # (n, 2) bool, False where a leg is missing
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_response(cls, key, data, fetched_at=None):
+        data = _chain_payload(data)
+        chain = data.get("oc") or {}
+        strikes = np.array(sorted(float(s) for s in chain), dtype=np.float64)
+        columns = {field: np.full((len(strikes), 2), np.nan) for field in CHAIN_FIELDS}
+        present = np.zeros((len(strikes), 2), dtype=bool)
+        by_strike = {float(s): legs for s, legs in chain.items()}
+        for row, strike in enumerate(strikes):
+            legs = by_strike[strike] or {}
+            for side, name in ((CE, "ce"), (PE, "pe")):
+                leg = legs.get(name)
+                if not leg:
+                    continue
+                present[row, side] = True
+                greeks = leg.get("greeks") or {}
+                for field, source in CHAIN_FIELDS.items():
+                    value = greeks.get(source) if field in _GREEKS else leg.get(source)
+                    if value is not None:
+                        columns[field][row, side] = value
+        return cls(key, float(data.get("last_price") or np.nan), strikes, columns, present,
+                   time.monotonic() if fetched_at is None else fetched_at)
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def row_of(self, strike):
+        row = int(np.searchsorted(self.strikes, float(strike)))
+        if row < len(self.strikes) and self.strikes[row] == float(strike):
+            return row
+        return None
+
+    def field(self, name, side):
+        """One column for one side, e.g. snapshot.field("oi", "PE")."""
+        return self.columns[name][:, SIDES.index(side) if isinstance(side, str) else side]
+
+    def get(self, strike, side):
+        row = self.row_of(strike)
+        side = SIDES.index(side) if isinstance(side, str) else side
+        if row is None or not self.present[row, side]:
+            return None
+        return {"strike": float(self.strikes[row]), "side": SIDES[side],
+                **{field: float(values[row, side]) for field, values in self.columns.items()}}
+
+    def atm_strike(self):
+        if not len(self.strikes):
+            return None
+        return float(self.strikes[np.abs(self.strikes - self.underlying_ltp).argmin()])
+
+    def diff(self, previous):
+        return ChainDiff(previous, self)
+
+
+class ChainDiff:
+    """
+    Legs of `current` whose LTP, OI or IV differ from `previous` (or that are
+    new). With no previous snapshot every present leg counts as changed.
+    """
+
+    def __init__(self, previous, current, fields=DIFF_FIELDS):
+        self.current = current
+        self.fields = fields
+        n = len(current.strikes)
+        self.changed = current.present.copy()
+        self.deltas = {field: np.zeros((n, 2)) for field in fields}
+        self.removed_strikes = np.empty(0)
+        if previous is None or not len(previous.strikes):
+            return
+
+        if np.array_equal(previous.strikes, current.strikes):
+            rows, matched = np.arange(n), np.ones(n, dtype=bool)
+        else:
+            rows = np.searchsorted(previous.strikes, current.strikes).clip(0, max(len(previous.strikes) - 1, 0))
+            matched = previous.strikes[rows] == current.strikes
+            self.removed_strikes = np.setdiff1d(previous.strikes, current.strikes)
+
+        was_present = previous.present[rows] & matched[:, None]
+        moved = np.zeros((n, 2), dtype=bool)
+        for field in fields:
+            before, after = previous.columns[field][rows], current.columns[field]
+            delta = np.where(was_present, after - before, 0.0)
+            self.deltas[field] = np.nan_to_num(delta)
+            moved |= ~((before == after) | (np.isnan(before) & np.isnan(after)))
+        self.changed = current.present & (~was_present | moved)
+
+    def __len__(self):
+        return int(self.changed.sum())
+
+    def __bool__(self):
+        return bool(self.changed.any())
+
+    def changed_strikes(self):
+        return self.current.strikes[self.changed.any(axis=1)]
+
+    def records(self):
+        """[{strike, side, ltp, oi, iv, d_ltp, d_oi, d_iv}, ...] for changed legs only."""
+        out = []
+        for row, side in zip(*np.nonzero(self.changed)):
+            record = {"strike": float(self.current.strikes[row]), "side": SIDES[side]}
+            for field in self.fields:
+                record[field] = float(self.current.columns[field][row, side])
+                record[f"d_{field}"] = float(self.deltas[field][row, side])
+            out.append(record)
+        return out
+
+
+class _Entry:
+    __slots__ = ("response", "snapshot", "diff", "fetched_at", "day")
+
+    def __init__(self, response, fetched_at, day):
+        self.response = response
+        self.snapshot = None
+        self.diff = None
+        self.fetched_at = fetched_at
+        self.day = day
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # _Entry, or the failure envelope shared with every waiter
+
+
+class OptionChainCache:
+    def __init__(self, option_chain: OptionChain, chain_ttl: float = MIN_CHAIN_TTL,
+                 expiry_ttl: float = 6 * 3600, clock=time.monotonic):
+        """
+        Args:
+            option_chain: OptionChain (sync callers) or AsyncOptionChain (*_async callers)
+            chain_ttl (float): Seconds a chain stays fresh; raised to Dhan's option-chain window
+        """
+        self.option_chain = option_chain
+        self.chain_ttl = max(chain_ttl, MIN_CHAIN_TTL)
+        self.expiry_ttl = expiry_ttl
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _Flight
+        self._inflight_async = {}  # key -> asyncio.Future
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    # --- keys / freshness ---
+
+    @staticmethod
+    def _chain_key(under_security_id, under_exchange_segment, expiry):
+        return ("chain", str(under_security_id), under_exchange_segment.upper(), str(expiry))
+
+    @staticmethod
+    def _expiry_key(under_security_id, under_exchange_segment):
+        return ("expiry", str(under_security_id), under_exchange_segment.upper())
+
+    def _fresh(self, key, max_age=None):
+        # an explicit max_age (0 forces a refetch) is honoured as given; the scheduler still spaces calls
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = self.clock() - entry.fetched_at
+        if key[0] == "expiry":
+            ttl = self.expiry_ttl if max_age is None else max_age
+            return entry if entry.day == ist_today() and age < ttl else None
+        return entry if age < (self.chain_ttl if max_age is None else max_age) else None
+
+    def _store(self, key, response):
+        if response.get("status") != "success":
+            self.stats["errors"] += 1
+            return response
+        now = self.clock()
+        entry = _Entry(response, now, ist_today())
+        if key[0] == "chain":
+            previous = self._entries.get(key)
+            entry.snapshot = ChainSnapshot.from_response(key, response.get("data"), now)
+            entry.diff = entry.snapshot.diff(previous.snapshot if previous else None)
+        self._entries[key] = entry
+        return entry
+
+    # --- sync ---
+
+    def _get(self, key, loader, max_age=None):
+        with self._lock:
+            entry = self._fresh(key, max_age)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            return flight.result
+        try:
+            response = loader()
+        except Exception as e:
+            response = DhanHTTP._failure(str(e))
+        try:
+            with self._lock:
+                flight.result = self._store(key, response)
+            return flight.result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def get_expiry_dates(self, under_security_id: str, under_exchange_segment: str):
+        key = self._expiry_key(under_security_id, under_exchange_segment)
+        result = self._get(key, lambda: self.option_chain.get_expiry_dates(
+            under_security_id, under_exchange_segment))
+        return result.response if isinstance(result, _Entry) else result
+
+    def get_chain(self, under_security_id: str, under_exchange_segment: str, expiry: str,
+                  max_age: float = None):
+        """Same envelope as OptionChain.get_chain, served from cache while fresh."""
+        result = self._chain(under_security_id, under_exchange_segment, expiry, max_age)
+        return result.response if isinstance(result, _Entry) else result
+
+    def _chain(self, under_security_id, under_exchange_segment, expiry, max_age=None):
+        key = self._chain_key(under_security_id, under_exchange_segment, expiry)
+        return self._get(key, lambda: self.option_chain.get_chain(
+            under_security_id, under_exchange_segment, expiry), max_age)
+
+    def snapshot(self, under_security_id: str, under_exchange_segment: str, expiry: str,
+                 max_age: float = None):
+        """
+        Returns:
+            ChainSnapshot: or None if the fetch failed and nothing is cached
+        """
+        result = self._chain(under_security_id, under_exchange_segment, expiry, max_age)
+        if isinstance(result, _Entry):
+            return result.snapshot
+        entry = self._entries.get(self._chain_key(under_security_id, under_exchange_segment, expiry))
+        return entry.snapshot if entry else None
+
+    def changes(self, under_security_id: str, under_exchange_segment: str, expiry: str):
+        """
+        Returns:
+            tuple: (ChainSnapshot, ChainDiff against the snapshot before it); (None, None) on failure
+        """
+        self._chain(under_security_id, under_exchange_segment, expiry)
+        entry = self._entries.get(self._chain_key(under_security_id, under_exchange_segment, expiry))
+        return (entry.snapshot, entry.diff) if entry else (None, None)
+
+    # --- async (wrapping AsyncOptionChain) ---
+
+    async def _get_async(self, key, loader, max_age=None):
+        entry = self._fresh(key, max_age)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry
+        pending = self._inflight_async.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+        self.stats["misses"] += 1
+        pending = self._inflight_async[key] = asyncio.get_running_loop().create_future()
+        try:
+            response = await loader()
+            with self._lock:
+                result = self._store(key, response)
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved for callers that never awaited
+            raise
+        finally:
+            del self._inflight_async[key]
+
+    async def get_expiry_dates_async(self, under_security_id: str, under_exchange_segment: str):
+        key = self._expiry_key(under_security_id, under_exchange_segment)
+        result = await self._get_async(key, lambda: self.option_chain.get_expiry_dates(
+            under_security_id, under_exchange_segment))
+        return result.response if isinstance(result, _Entry) else result
+
+    async def get_chain_async(self, under_security_id: str, under_exchange_segment: str, expiry: str,
+                              max_age: float = None):
+        key = self._chain_key(under_security_id, under_exchange_segment, expiry)
+        result = await self._get_async(key, lambda: self.option_chain.get_chain(
+            under_security_id, under_exchange_segment, expiry), max_age)
+        return result.response if isinstance(result, _Entry) else result
+
+    async def changes_async(self, under_security_id: str, under_exchange_segment: str, expiry: str):
+        await self.get_chain_async(under_security_id, under_exchange_segment, expiry)
+        entry = self._entries.get(self._chain_key(under_security_id, under_exchange_segment, expiry))
+        return (entry.snapshot, entry.diff) if entry else (None, None)
+
+    # --- maintenance ---
+
+    def invalidate(self, under_security_id: str = None, under_exchange_segment: str = None):
+        """Drop cached entries, all of them or those of one underlying."""
+        with self._lock:
+            for key in list(self._entries):
+                if under_security_id is None or (key[1] == str(under_security_id) and (
+                        under_exchange_segment is None or key[2] == under_exchange_segment.upper())):
+                    del self._entries[key]
+
+    def describe(self):
+        return {
+            "module": "OptionChainCache",
+            "chain_ttl": self.chain_ttl,
+            "expiry_ttl": self.expiry_ttl,
+            "entries": len(self._entries),
+            "stats": dict(self.stats)
+        }
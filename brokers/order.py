@@ -4,26 +4,62 @@ Designed to be GPT-callable and connected to Messenger or TagRouter.
 """
 
 from brokers.dhan_http import DhanHTTP
+from brokers.order_index import OrderIndex
+from brokers.order_fast_path import OrderTemplate
+from core.latency import LatencyRecorder
 
 
 class Order:
-    def __init__(self, dhan: DhanHTTP):
+    TOOLS = {
+        "list_orders": "read",
+        "get_by_id": "read",
+        "get_by_correlation": "read",
+        "place": "write",
+        "modify": "write",
+        "cancel": "write"
+    }
+
+    def __init__(self, dhan: DhanHTTP, index: OrderIndex = None):
         self.dhan = dhan
+        self.index = index  # fed by OrderUpdate; answers status lookups while fresh
+        self._templates = {}
+        self.tick_to_wire = LatencyRecorder()  # fast-path sends only
+        self.round_trip = LatencyRecorder()
+
+    def _from_index(self, state):
+        return {
+            "status": DhanHTTP.HttpResponseStatus.SUCCESS.value,
+            "remarks": "",
+            "data": state.as_dict()
+        }
 
     def list_orders(self):
+        """All orders placed today."""
         return self.dhan.get("/orders")
 
-    def get_by_id(self, order_id: str):
+    def get_by_id(self, order_id: str, max_age: float = None):
+        """
+        Order status. Served from the OrderUpdate index when the entry is
+        terminal or younger than max_age seconds, otherwise over HTTP.
+        """
+        state = self.index.get(order_id, max_age) if self.index else None
+        if state is not None:
+            return self._from_index(state)
         return self.dhan.get(f"/orders/{order_id}")
 
-    def get_by_correlation(self, correlation_id: str):
+    def get_by_correlation(self, correlation_id: str, max_age: float = None):
+        state = self.index.get_by_correlation(correlation_id, max_age) if self.index else None
+        if state is not None:
+            return self._from_index(state)
         return self.dhan.get(f"/orders/external/{correlation_id}")
 
     def cancel(self, order_id: str):
+        """Cancel a pending order."""
         return self.dhan.delete(f"/orders/{order_id}")
 
     def modify(self, order_id: str, order_type: str, leg_name: str, quantity: int,
                price: float, trigger_price: float, disclosed_quantity: int, validity: str):
+        """Modify a pending order (quantity, price, trigger, validity)."""
         payload = {
             "orderId": str(order_id),
             "orderType": order_type,
@@ -36,13 +72,12 @@ class Order:
         }
         return self.dhan.put(f"/orders/{order_id}", payload)
 
-    def place(self, security_id: str, exchange_segment: str, transaction_type: str,
-              quantity: int, order_type: str, product_type: str, price: float,
-              trigger_price: float = 0.0, disclosed_quantity: int = 0,
-              after_market_order: bool = False, validity: str = "DAY",
-              amo_time: str = "OPEN", bo_profit_value=None, bo_stop_loss_value=None,
-              tag: str = None, slicing: bool = False):
-        
+    def _place_payload(self, security_id: str, exchange_segment: str, transaction_type: str,
+                       quantity: int, order_type: str, product_type: str, price: float,
+                       trigger_price: float = 0.0, disclosed_quantity: int = 0,
+                       after_market_order: bool = False, validity: str = "DAY",
+                       amo_time: str = "OPEN", bo_profit_value=None, bo_stop_loss_value=None,
+                       tag: str = None):
         if after_market_order and amo_time not in ['OPEN', 'OPEN_30', 'OPEN_60']:
             raise Exception("Invalid amo_time. Use: OPEN, OPEN_30, OPEN_60")
 
@@ -64,9 +99,67 @@ class Order:
 
         if tag:
             payload["correlationId"] = tag
+        return payload
+
+    def place(self, security_id: str, exchange_segment: str, transaction_type: str,
+              quantity: int, order_type: str, product_type: str, price: float,
+              trigger_price: float = 0.0, disclosed_quantity: int = 0,
+              after_market_order: bool = False, validity: str = "DAY",
+              amo_time: str = "OPEN", bo_profit_value=None, bo_stop_loss_value=None,
+              tag: str = None, slicing: bool = False):
+        """
+        Place a new order.
 
+        Args:
+            transaction_type (str): BUY / SELL
+            order_type (str): LIMIT / MARKET / STOP_LOSS / STOP_LOSS_MARKET
+            product_type (str): CNC / INTRADAY / MARGIN / MTF
+            tag (str): Optional correlation id
+            slicing (bool): Split above the exchange freeze quantity
+        """
+        payload = self._place_payload(
+            security_id, exchange_segment, transaction_type, quantity, order_type,
+            product_type, price, trigger_price, disclosed_quantity, after_market_order,
+            validity, amo_time, bo_profit_value, bo_stop_loss_value, tag
+        )
         endpoint = "/orders/slicing" if slicing else "/orders"
         return self.dhan.post(endpoint, payload)
 
+    def template(self, security_id: str, exchange_segment: str, transaction_type: str,
+                 order_type: str, product_type: str, **kwargs):
+        """
+        Pre-validated, pre-serialised order for the fast path; cached per
+        instrument/side/product/order type. Only price, quantity and tag are
+        patched at send time: order.template(...).send(quantity, price).
+
+        Returns:
+            OrderTemplate
+        """
+        key = (security_id, exchange_segment.upper(), transaction_type.upper(),
+               order_type.upper(), product_type.upper(), tuple(sorted(kwargs.items())))
+        template = self._templates.get(key)
+        if template is None:
+            template = OrderTemplate(self, security_id, exchange_segment, transaction_type,
+                                     order_type, product_type, **kwargs)
+            self._templates[key] = template
+        return template
+
     def place_slice(self, *args, **kwargs):
         return self.place(*args, slicing=True, **kwargs)
+
+    def latency_report(self):
+        """
+        Returns:
+            dict: Fast-path tick-to-wire and round-trip latency summaries (microseconds)
+        """
+        return {
+            "templates": len(self._templates),
+            "tick_to_wire": self.tick_to_wire.summary(),
+            "round_trip": self.round_trip.summary()
+        }
+
+    def describe(self):
+        return {
+            "module": "Order",
+            "tools": dict(self.TOOLS)
+        }
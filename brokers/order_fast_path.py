@@ -0,0 +1,131 @@
+"""
+Low-latency order path built from pre-serialised request templates.
+
+An OrderTemplate validates and serialises the order payload once per
+instrument/side/product. At send time only quantity, price and (optionally)
+the correlation tag are spliced into the cached JSON bytes, and the request is
+sent as a copy of a pre-built PreparedRequest on the DhanHTTP session, skipping
+payload building, header merging and request preparation.
+
+Tick-to-wire (caller's tick timestamp -> request handed to the socket) and
+round-trip latencies are recorded on the owning Order. Sends are also timed
+into the DhanHTTP's HttpMetrics and run its request hooks, like any other
+call (hooks see the payload as the rendered JSON bytes).
+"""
+
+import logging
+import math
+from json import dumps as json_dumps
+from time import monotonic, perf_counter_ns
+
+import requests
+
+from brokers.dhan_http import DhanHTTP
+from brokers.http_metrics import reset_connect_timer, connect_ns
+
+_QTY, _PRICE, _TAG = "@@QTY@@", "@@PRICE@@", "@@TAG@@"
+
+
+def _compile(payload):
+    """Serialise payload and split it around the slot sentinels."""
+    body = json_dumps(payload).encode()
+    parts, slots = [], []
+    for slot in (_QTY, _PRICE, _TAG):
+        marker = json_dumps(slot).encode()
+        if marker in body:
+            slots.append((body.index(marker), slot, marker))
+    cursor = 0
+    for index, slot, marker in sorted(slots):
+        parts.append(body[cursor:index])
+        cursor = index + len(marker)
+    parts.append(body[cursor:])
+    return parts, [slot for _, slot, _ in sorted(slots)]
+
+
+class OrderTemplate:
+    def __init__(self, order, security_id: str, exchange_segment: str, transaction_type: str,
+                 order_type: str, product_type: str, slicing: bool = False, **kwargs):
+        if not isinstance(order.dhan, DhanHTTP):
+            raise TypeError("OrderTemplate needs the blocking DhanHTTP client.")
+        self.order = order
+        self.dhan = order.dhan
+        self.endpoint = "/orders/slicing" if slicing else "/orders"
+
+        kwargs.pop("tag", None)
+        payload = order._place_payload(security_id, exchange_segment, transaction_type,
+                                       1, order_type, product_type, 0.0, **kwargs)
+        payload["quantity"], payload["price"] = _QTY, _PRICE
+        self._parts, self._slots = _compile(payload)
+        payload["correlationId"] = _TAG
+        self._tagged_parts, self._tagged_slots = _compile(payload)
+
+        self._prepared = self.dhan.session.prepare_request(requests.Request(
+            "POST", self.dhan.base_url + self.endpoint, headers=self.dhan.headers, data=b"{}"
+        ))
+
+    def render(self, quantity: int, price: float, tag: str = None) -> bytes:
+        if not math.isfinite(quantity) or not math.isfinite(price):
+            raise ValueError(f"quantity and price must be finite, got {quantity!r} / {price!r}")
+        if quantity <= 0:
+            raise ValueError("quantity must be > 0")
+        values = {_QTY: str(int(quantity)).encode(), _PRICE: repr(float(price)).encode()}
+        if tag:
+            values[_TAG] = json_dumps(str(tag)).encode()
+            parts, slots = self._tagged_parts, self._tagged_slots
+        else:
+            parts, slots = self._parts, self._slots
+        out = [parts[0]]
+        for slot, part in zip(slots, parts[1:]):
+            out.append(values[slot])
+            out.append(part)
+        return b"".join(out)
+
+    def send(self, quantity: int, price: float, tag: str = None, tick_ns: int = None):
+        """
+        Args:
+            tick_ns (int): time.perf_counter_ns() when the triggering tick/signal was
+                seen; defaults to the call time.
+
+        Returns:
+            dict: Same envelope as Order.place
+        """
+        start = perf_counter_ns() if tick_ns is None else tick_ns
+        try:
+            body = self.render(quantity, price, tag)
+        except (TypeError, ValueError) as e:
+            logging.error(f"[OrderTemplate] ❌ {e}")
+            return DhanHTTP._failure(str(e))
+        request = self._prepared.copy()
+        request.body = body
+        request.headers["Content-Length"] = str(len(body))
+
+        dhan = self.dhan
+        info = dhan.metrics.before("POST", self.endpoint, body)
+        timings, result, wire = {}, None, None
+        try:
+            dhan.scheduler.acquire("POST", self.endpoint)
+            reset_connect_timer()
+            wire = perf_counter_ns()
+            response = dhan.session.send(request, timeout=dhan.timeout, stream=True)
+            headers_at = perf_counter_ns()
+            content = response.content
+            read_at = perf_counter_ns()
+            result = DhanHTTP._parse_content(response.ok, content)
+            timings = {
+                "connect": connect_ns() or None,
+                "ttfb": headers_at - wire,
+                "total": read_at - wire,
+                "parse": perf_counter_ns() - read_at
+            }
+            dhan.metrics.observe(info, response.status_code, timings)
+        except Exception as e:
+            logging.error(f"[OrderTemplate] ❌ Exception: {e}")
+            dhan.metrics.error(info, e)
+            result = DhanHTTP._failure(str(e))
+        finally:
+            dhan.last_used = monotonic()
+            dhan.metrics.after(info, result, timings)
+        if wire is not None:
+            self.order.tick_to_wire.record(wire - start)
+            self.order.round_trip.record(perf_counter_ns() - wire)
+        return result
@@ -0,0 +1,246 @@
+"""
+In-process order state index maintained from the OrderUpdate stream.
+
+Orders are indexed by orderNo and by correlationId with status, filled
+quantity, average price and individual fills. Order uses the index to answer
+get_by_id / get_by_correlation while an entry is fresh, instead of polling
+over HTTP.
+
+Subscribers can register async callbacks (fed from a bounded dispatch queue,
+oldest entries dropped on overflow) or await wait_for()/wait_until_filled().
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+
+TERMINAL_STATUSES = frozenset({"TRADED", "CANCELLED", "REJECTED", "EXPIRED"})
+# order-alert short codes -> REST names
+PRODUCT_CODES = {"C": "CNC", "I": "INTRADAY", "M": "MARGIN", "F": "MTF", "V": "CO", "B": "BO"}
+
+
+def _first(data, *keys, default=None):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+class OrderState:
+    __slots__ = ("order_id", "correlation_id", "status", "security_id", "transaction_type",
+                 "quantity", "filled_qty", "avg_price", "fills", "updated_at", "raw")
+
+    def __init__(self, order_id):
+        self.order_id = order_id
+        self.correlation_id = None
+        self.status = None
+        self.security_id = None
+        self.transaction_type = None
+        self.quantity = 0
+        self.filled_qty = 0
+        self.avg_price = 0.0
+        self.fills = []
+        self.updated_at = None
+        self.raw = None
+
+    @property
+    def terminal(self):
+        return self.status in TERMINAL_STATUSES
+
+    @property
+    def remaining_qty(self):
+        return max(self.quantity - self.filled_qty, 0)
+
+    def copy(self):
+        clone = OrderState(self.order_id)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.fills = list(self.fills)
+        return clone
+
+    def as_dict(self):
+        """Order fields under the same names the REST order book uses."""
+        return {
+            "orderId": self.order_id,
+            "correlationId": self.correlation_id,
+            "orderStatus": self.status,
+            "securityId": self.security_id,
+            "transactionType": self.transaction_type,
+            "quantity": self.quantity,
+            "filledQty": self.filled_qty,
+            "remainingQuantity": self.remaining_qty,
+            "averageTradedPrice": self.avg_price,
+            "fills": list(self.fills),
+            "source": "order_update"
+        }
+
+
+class OrderIndex:
+    def __init__(self, max_age: float = 5.0, queue_size: int = 1000, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self.orders = {}
+        self.by_correlation = {}
+        self.callbacks = []
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.updates = 0
+        self._queue = None
+        self._dispatcher = None
+        self._waiters = {}  # order_id -> [(statuses, future)]
+
+    # --- updates ---
+
+    def apply(self, data: dict):
+        """Apply one order_alert 'Data' payload. Returns the updated OrderState."""
+        order_id = _first(data, "orderNo", "OrderNo", "orderId")
+        if order_id is None:
+            return None
+        order_id = str(order_id)
+        state = self.orders.get(order_id)
+        if state is None:
+            state = self.orders[order_id] = OrderState(order_id)
+
+        correlation_id = _first(data, "correlationId", "CorrelationId")
+        if correlation_id:
+            state.correlation_id = str(correlation_id)
+            self.by_correlation[state.correlation_id] = state
+        state.status = str(_first(data, "status", "Status", "orderStatus", default=state.status or "")).upper()
+        state.security_id = _first(data, "securityId", "SecurityId", default=state.security_id)
+        state.transaction_type = _first(data, "txnType", "TxnType", "transactionType",
+                                        default=state.transaction_type)
+        state.quantity = int(_first(data, "quantity", "Quantity", default=state.quantity) or 0)
+
+        filled = int(_first(data, "tradedQty", "TradedQty", "filledQty", default=state.filled_qty) or 0)
+        if filled > state.filled_qty:
+            price = float(_first(data, "tradedPrice", "TradedPrice", "AvgTradedPrice",
+                                 "avgTradedPrice", default=0.0) or 0.0)
+            state.fills.append((filled - state.filled_qty, price))
+            state.filled_qty = filled
+        state.avg_price = float(_first(data, "avgTradedPrice", "AvgTradedPrice",
+                                       "averageTradedPrice", default=state.avg_price) or 0.0)
+        state.updated_at = self.clock()
+        state.raw = data
+        self.updates += 1
+
+        self._resolve_waiters(state)
+        self._enqueue(state)
+        return state
+
+    # --- lookups ---
+
+    def _fresh(self, state, max_age):
+        if state is None or state.updated_at is None:
+            return None
+        if state.terminal:
+            return state
+        max_age = self.max_age if max_age is None else max_age
+        return state if self.clock() - state.updated_at <= max_age else None
+
+    def get(self, order_id: str, max_age: float = None):
+        """Fresh OrderState (terminal, or updated within max_age seconds), else None."""
+        return self._fresh(self.orders.get(str(order_id)), max_age)
+
+    def get_by_correlation(self, correlation_id: str, max_age: float = None):
+        return self._fresh(self.by_correlation.get(str(correlation_id)), max_age)
+
+    # --- subscribers ---
+
+    def subscribe(self, callback):
+        """Register a (sync or async) callback called with each updated OrderState."""
+        self.callbacks.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    def wait_for(self, order_id: str, statuses=TERMINAL_STATUSES, timeout: float = None):
+        """
+        Awaitable that resolves with the OrderState once its status is one of statuses.
+        Raises asyncio.TimeoutError after timeout seconds.
+        """
+        order_id = str(order_id)
+        future = asyncio.get_running_loop().create_future()
+        state = self.orders.get(order_id)
+        if state is not None and state.status in statuses:
+            future.set_result(state)
+        else:
+            waiter = (frozenset(statuses), future)
+            self._waiters.setdefault(order_id, []).append(waiter)
+            # a timed-out or cancelled wait must not outlive its caller
+            future.add_done_callback(lambda _, w=waiter: self._discard_waiter(order_id, w))
+        if timeout is None:
+            return future
+        return asyncio.wait_for(future, timeout)
+
+    def wait_until_filled(self, order_id: str, timeout: float = None):
+        """
+        Awaitable that resolves with the OrderState once the order is done: filled,
+        or rejected / cancelled / expired, which can never fill. Check
+        state.status == "TRADED" (or state.filled_qty for partial fills).
+        """
+        return self.wait_for(order_id, TERMINAL_STATUSES, timeout)
+
+    def _resolve_waiters(self, state):
+        waiters = self._waiters.get(state.order_id)
+        if not waiters:
+            return
+        pending = []
+        for statuses, future in waiters:
+            if future.done():
+                continue
+            if state.status in statuses:
+                future.get_loop().call_soon_threadsafe(
+                    lambda f=future, s=state: f.done() or f.set_result(s))
+            else:
+                pending.append((statuses, future))
+        if pending:
+            self._waiters[state.order_id] = pending
+        else:
+            del self._waiters[state.order_id]
+
+    def _discard_waiter(self, order_id, waiter):
+        waiters = self._waiters.get(order_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[order_id]
+
+    def _enqueue(self, state):
+        if not self.callbacks:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._queue is None or self._dispatcher is None or self._dispatcher.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._dispatcher = loop.create_task(self._dispatch())
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(state.copy())  # callbacks see the state as of this update
+
+    async def _dispatch(self):
+        while True:
+            state = await self._queue.get()
+            for callback in list(self.callbacks):
+                try:
+                    result = callback(state)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logging.error(f"[OrderIndex] ❌ Callback error: {e}")
+
+    def describe(self):
+        return {
+            "module": "OrderIndex",
+            "orders": len(self.orders),
+            "updates": self.updates,
+            "open_waiters": sum(len(w) for w in self._waiters.values()),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "dropped": self.dropped
+        }
@@ -2,23 +2,31 @@ import asyncio
 import websockets
 import json
 
+from brokers.order_index import OrderIndex
+from brokers.supervisor import ConnectionSupervisor
+
 
 class OrderUpdate:
-    def __init__(self, context):
+    def __init__(self, context, index: OrderIndex = None):
         self.client_id = context.dhan_client_id
         self.access_token = context.dhan_access_token
         self.order_feed_wss = "wss://api-order-update.dhan.co"
+        self.supervisor = None
+        self.index = index  # updated from every order_alert
+
+    def _auth_message(self):
+        return {
+            "LoginReq": {
+                "MsgCode": 42,
+                "ClientId": str(self.client_id),
+                "Token": str(self.access_token)
+            },
+            "UserType": "SELF"
+        }
 
     async def connect_order_update(self):
         async with websockets.connect(self.order_feed_wss) as websocket:
-            auth_message = {
-                "LoginReq": {
-                    "MsgCode": 42,
-                    "ClientId": str(self.client_id),
-                    "Token": str(self.access_token)
-                },
-                "UserType": "SELF"
-            }
+            auth_message = self._auth_message()
             await websocket.send(json.dumps(auth_message))
             print(f"✅ Subscribed to Order Updates: {auth_message}")
 
@@ -26,20 +34,50 @@ class OrderUpdate:
                 data = json.loads(message)
                 await self.handle_order_update(data)
 
+    def supervised(self, standby=False, backoff=None):
+        """
+        Build a ConnectionSupervisor for the order stream: drops are retried with
+        jittered backoff and the login is replayed. A standby connection is
+        opened without logging in, so it never delivers duplicate updates.
+        """
+        async def open_connection():
+            return await websockets.connect(self.order_feed_wss)
+
+        async def subscribe(ws):
+            await ws.send(json.dumps(self._auth_message()))
+
+        async def receive(ws):
+            async for message in ws:
+                yield json.loads(message)
+
+        self.supervisor = ConnectionSupervisor(
+            "OrderUpdate", open_connection, subscribe, receive, self.handle_order_update,
+            backoff=backoff, standby=standby
+        )
+        return self.supervisor
+
+    async def run_supervised(self, standby=False, backoff=None):
+        await self.supervised(standby, backoff).run()
+
     async def handle_order_update(self, order_update):
         if order_update.get('Type') == 'order_alert':
             data = order_update.get('Data', {})
+            if self.index is not None:
+                self.index.apply(data)
             order_id = data.get("orderNo")
             status = data.get("status", "Unknown")
             print(f"🟢 Order Update - Status: {status}, Order ID: {order_id}, Data: {data}")
         else:
             print(f"⚠️ Unknown message received: {order_update}")
 
-    def connect_sync(self):
+    def connect_sync(self, reconnect=True, standby=False):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            loop.run_until_complete(self.connect_order_update())
+            if reconnect:
+                loop.run_until_complete(self.run_supervised(standby))
+            else:
+                loop.run_until_complete(self.connect_order_update())
         except Exception as e:
             print(f"❌ Error: {e}")
         finally:
@@ -49,5 +87,7 @@ class OrderUpdate:
         return {
             "module": "OrderUpdate",
             "client_id_present": bool(self.client_id),
-            "connected": True
+            "connected": True if self.supervisor is None else self.supervisor.state == "connected",
+            "supervisor": self.supervisor.metrics() if self.supervisor is not None else None,
+            "index": self.index.describe() if self.index is not None else None
         }
@@ -0,0 +1,365 @@
+"""
+Incremental mark-to-market P&L for positions and holdings.
+
+PnLEngine loads /positions and /holdings once into compact per-row arrays (net
+quantity, average cost, realized P&L, last price), then keeps them current
+without polling: fills arrive from OrderIndex (the OrderUpdate stream) and
+prices from decoded MarketFeed batches, and only the rows of instruments that
+changed are repriced. Portfolio totals and per-underlying aggregates are kept
+as running sums, so reading them is O(1). reconcile() re-reads the REST
+endpoints, adopts them as the truth and reports any drift.
+
+    pnl = PnLEngine.from_portfolio(dhan.portfolio, underlyings={(2, 35001): "NIFTY"})
+    pnl.attach(dhan.order_index)
+    feed.subscribe(pnl.instruments())   # then pnl.update_prices(batch) per DecodedBatch
+    pnl.totals()
+"""
+
+import asyncio
+import logging
+import threading
+
+import numpy as np
+
+from brokers.feed_decoder import EXCHANGE_NAMES
+from brokers.order_index import PRODUCT_CODES
+from brokers.snapshot_table import instrument_keys
+
+SEGMENT_CODES = {name: code for code, name in EXCHANGE_NAMES.items()}
+HOLDINGS = "HOLDINGS"  # product of rows loaded from /holdings
+AGGREGATES = ("unrealized", "realized", "net_exposure", "gross_exposure")
+
+_SEGMENTS = {"E": "EQ", "D": "FNO", "C": "CURRENCY", "M": "COMM"}
+_PRICE_PACKETS = ("Ticker", "Quote", "Depth", "Full")
+
+
+def _segment(value, exchange=None):
+    value = str(value or "").upper()
+    if value in SEGMENT_CODES:
+        return value
+    if exchange and value in _SEGMENTS:
+        return f"{str(exchange).upper()}_{_SEGMENTS[value]}"
+    return {"NSE": "NSE_EQ", "BSE": "BSE_EQ"}.get(value, value)
+
+
+class PnLEngine:
+    def __init__(self, underlyings: dict = None):
+        """
+        Args:
+            underlyings (dict): (exchange_segment code, security_id) -> underlying name for the
+                                per-underlying aggregates; unmapped instruments group under themselves
+        """
+        self.underlyings = {(int(k[0]), int(k[1])): name for k, name in (underlyings or {}).items()}
+        self._lock = threading.Lock()
+        self._fills_seen = {}  # order_id -> fills already booked
+        self._touched = []  # per in-flight reconcile(): row keys booked since its fetch began
+        self._reset([])
+        self.stats = {"fills": 0, "price_updates": 0, "rows_repriced": 0, "reconciles": 0, "drift": 0}
+
+    # --- rows ---
+
+    def _reset(self, rows):
+        """Rebuild the arrays from (segment code, security_id, product, qty, avg, realized, ltp) tuples."""
+        rows = sorted(rows, key=lambda r: (r[0], r[1], r[2]))
+        count = len(rows)
+        self.products = [r[2] for r in rows]
+        self.segment = np.array([r[0] for r in rows], dtype=np.uint8)
+        self.security_id = np.array([r[1] for r in rows], dtype=np.uint32)
+        self.qty = np.array([r[3] for r in rows], dtype=np.int64)
+        self.avg = np.array([r[4] for r in rows], dtype=np.float64)
+        self.realized = np.array([r[5] for r in rows], dtype=np.float64)
+        self.ltp = np.array([r[6] for r in rows], dtype=np.float64)
+        self._keys = instrument_keys(self.segment, self.security_id)
+        self._row = {(int(r[0]), int(r[1]), r[2]): i for i, r in enumerate(rows)}
+
+        self.groups = []
+        group_ids = {}
+        self.group = np.zeros(count, dtype=np.int64)
+        for i, r in enumerate(rows):
+            name = self.underlyings.get((int(r[0]), int(r[1])), f"{EXCHANGE_NAMES.get(int(r[0]), r[0])}:{r[1]}")
+            if name not in group_ids:
+                group_ids[name] = len(self.groups)
+                self.groups.append(name)
+            self.group[i] = group_ids[name]
+        self._group_ids = group_ids
+        self._recompute()
+
+    def _contributions(self, rows):
+        qty, ltp = self.qty[rows], self.ltp[rows]
+        return np.stack([qty * (ltp - self.avg[rows]), self.realized[rows], qty * ltp, np.abs(qty) * ltp])
+
+    def _recompute(self):
+        """Rebuild every running sum from the rows (drops accumulated float drift)."""
+        contrib = self._contributions(slice(None))
+        self._row_contrib = contrib
+        self._totals = contrib.sum(axis=1)
+        self._group_totals = np.zeros((len(AGGREGATES), len(self.groups)))
+        for i in range(len(AGGREGATES)):
+            self._group_totals[i] = np.bincount(self.group, weights=contrib[i], minlength=len(self.groups))
+
+    def _refresh(self, rows):
+        """Re-derive the contributions of `rows` and move the running sums by the difference."""
+        new = self._contributions(rows)
+        delta = new - self._row_contrib[:, rows]
+        self._row_contrib[:, rows] = new
+        self._totals += delta.sum(axis=1)
+        groups = self.group[rows]
+        for i in range(len(AGGREGATES)):
+            self._group_totals[i] += np.bincount(groups, weights=delta[i], minlength=len(self.groups))
+
+    def _ensure_row(self, segment, security_id, product):
+        key = (int(segment), int(security_id), product)
+        row = self._row.get(key)
+        if row is None:  # first trade in a new instrument: rebuild (rare)
+            self._reset(list(self._rows()) + [key + (0, 0.0, 0.0, 0.0)])
+            row = self._row[key]
+        return row
+
+    def _rows(self):
+        return zip(self.segment.tolist(), self.security_id.tolist(), self.products,
+                   self.qty.tolist(), self.avg.tolist(), self.realized.tolist(), self.ltp.tolist())
+
+    # --- loading ---
+
+    @staticmethod
+    def rows_from(positions, holdings):
+        """REST /positions and /holdings payloads -> row tuples."""
+        rows = []
+        for pos in positions or []:
+            segment = SEGMENT_CODES.get(_segment(pos.get("exchangeSegment")))
+            if segment is None:
+                continue
+            qty = int(pos.get("netQty", 0) or 0)
+            avg = float(pos.get("costPrice", 0.0) or 0.0)
+            unrealized = float(pos.get("unrealizedProfit", 0.0) or 0.0)
+            ltp = avg + unrealized / qty if qty else avg  # positions carry no LTP; back it out
+            rows.append((segment, int(pos["securityId"]), str(pos.get("productType", "")).upper(), qty, avg,
+                         float(pos.get("realizedProfit", 0.0) or 0.0), ltp))
+        for holding in holdings or []:
+            segment = SEGMENT_CODES.get(_segment(holding.get("exchange")))
+            qty = int(holding.get("totalQty", 0) or 0)
+            if segment is None or not qty:
+                continue
+            avg = float(holding.get("avgCostPrice", 0.0) or 0.0)
+            rows.append((segment, int(holding["securityId"]), HOLDINGS, qty, avg, 0.0,
+                         float(holding.get("lastTradedPrice", avg) or avg)))
+        return rows
+
+    def _fetch(self, portfolio):
+        positions, holdings = portfolio.get_positions(), portfolio.get_holdings()
+        for name, response in (("positions", positions), ("holdings", holdings)):
+            if response.get("status") != "success":
+                logging.error(f"[PnLEngine] ❌ Loading {name} failed: {response.get('remarks')}")
+                return None
+        return self.rows_from(positions.get("data"), holdings.get("data"))
+
+    def load(self, portfolio):
+        """Replace the book with Portfolio.get_positions() + get_holdings(). Returns False on failure."""
+        rows = self._fetch(portfolio)
+        if rows is None:
+            return False
+        with self._lock:
+            self._reset(rows)
+        return True
+
+    @classmethod
+    def from_portfolio(cls, portfolio, underlyings: dict = None):
+        engine = cls(underlyings)
+        engine.load(portfolio)
+        return engine
+
+    def instruments(self, request_code: int = 15):
+        """MarketFeed (exchange_segment, security_id, request_code) tuples for the open rows."""
+        return sorted({(int(s), int(i), request_code) for s, i in zip(self.segment, self.security_id)})
+
+    # --- fills ---
+
+    def apply_fill(self, exchange_segment, security_id, product: str, side: str, qty: int, price: float):
+        """
+        Book one fill (average-cost method; a fill through zero flips the position at the fill price).
+
+        Args:
+            exchange_segment: "NSE_EQ" or its feed code
+            side: "BUY"/"B" or "SELL"/"S"
+        """
+        segment = exchange_segment if isinstance(exchange_segment, int) else SEGMENT_CODES[_segment(exchange_segment)]
+        signed = int(qty) if str(side).upper() in ("BUY", "B") else -int(qty)
+        with self._lock:
+            for touched in self._touched:
+                touched.add((int(segment), int(security_id), str(product).upper()))
+            row = self._ensure_row(segment, security_id, str(product).upper())
+            held, avg = int(self.qty[row]), float(self.avg[row])
+            if held == 0 or (held > 0) == (signed > 0):
+                total = held + signed
+                self.avg[row] = (held * avg + signed * price) / total
+                self.qty[row] = total
+            else:
+                closed = min(abs(signed), abs(held))
+                self.realized[row] += closed * (price - avg) * (1 if held > 0 else -1)
+                total = held + signed
+                self.qty[row] = total
+                if total == 0:
+                    self.avg[row] = 0.0
+                elif (total > 0) != (held > 0):
+                    self.avg[row] = price
+            if not self.ltp[row]:
+                self.ltp[row] = price
+            self._refresh(np.array([row]))
+            self.stats["fills"] += 1
+
+    def on_order(self, state):
+        """OrderIndex callback: book the fills of an OrderState not seen before."""
+        raw = state.raw or {}
+        seen = self._fills_seen.get(state.order_id, 0)
+        fills = state.fills[seen:]
+        if not fills:
+            return
+        self._fills_seen[state.order_id] = len(state.fills)
+        segment = _segment(raw.get("Segment") or raw.get("exchangeSegment"), raw.get("Exchange"))
+        product = str(raw.get("Product") or raw.get("productType") or "").upper()
+        product = PRODUCT_CODES.get(product, product)
+        for qty, price in fills:
+            self.apply_fill(segment, state.security_id, product, state.transaction_type, qty, price)
+
+    def attach(self, order_index):
+        """Book fills from an OrderIndex (fed by OrderUpdate). Orders already filled are marked as seen."""
+        for order_id, state in order_index.orders.items():
+            self._fills_seen[order_id] = len(state.fills)
+        order_index.subscribe(self.on_order)
+        return self
+
+    # --- prices ---
+
+    def _reprice(self, keys, prices):
+        """Set the last price of every row of the given instrument keys (in arrival order); returns rows touched."""
+        lo = np.searchsorted(self._keys, keys, side="left")
+        hi = np.searchsorted(self._keys, keys, side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if not total:
+            return 0
+        # expand each [lo, hi) range (an instrument can have several product rows)
+        rows = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)
+        self.ltp[rows] = np.repeat(prices, counts)  # repeated rows keep the last price
+        rows.sort()
+        rows = rows[np.r_[True, rows[1:] != rows[:-1]]]
+        self._refresh(rows)
+        return len(rows)
+
+    def update_prices(self, batch):
+        """Reprice from a feed_decoder.DecodedBatch; only rows of instruments in the batch are touched."""
+        keys, prices, arrival = [], [], []
+        for name in _PRICE_PACKETS:
+            if name in batch:
+                packets = batch[name]
+                keys.append(instrument_keys(packets['exchange_segment'], packets['security_id']))
+                prices.append(packets['LTP'].astype(np.float64))
+                arrival.append(batch.positions[name])
+        if not keys:
+            return 0
+        keys, prices = np.concatenate(keys), np.concatenate(prices)
+        if len(arrival) > 1:
+            order = np.argsort(np.concatenate(arrival), kind="stable")
+            keys, prices = keys[order], prices[order]
+        valid = prices > 0
+        with self._lock:
+            touched = self._reprice(keys[valid], prices[valid])
+            self.stats["price_updates"] += 1
+            self.stats["rows_repriced"] += touched
+        return touched
+
+    def update_price(self, exchange_segment: int, security_id, ltp: float):
+        with self._lock:
+            return self._reprice(instrument_keys([exchange_segment], [int(security_id)]), np.array([float(ltp)]))
+
+    # --- reads (O(1)) ---
+
+    def totals(self):
+        """
+        Returns:
+            dict: unrealized, realized, total P&L, net and gross exposure
+        """
+        with self._lock:
+            unrealized, realized, net, gross = self._totals.tolist()
+        return {"unrealized": unrealized, "realized": realized, "pnl": unrealized + realized,
+                "net_exposure": net, "gross_exposure": gross}
+
+    def underlying(self, name: str):
+        """The same aggregates for one underlying, or None if nothing is held in it."""
+        group = self._group_ids.get(name)
+        if group is None:
+            return None
+        with self._lock:
+            unrealized, realized, net, gross = self._group_totals[:, group].tolist()
+        return {"unrealized": unrealized, "realized": realized, "pnl": unrealized + realized,
+                "net_exposure": net, "gross_exposure": gross}
+
+    def by_underlying(self):
+        return {name: self.underlying(name) for name in self.groups}
+
+    def position(self, exchange_segment, security_id, product: str):
+        segment = exchange_segment if isinstance(exchange_segment, int) else SEGMENT_CODES[_segment(exchange_segment)]
+        row = self._row.get((int(segment), int(security_id), str(product).upper()))
+        if row is None:
+            return None
+        with self._lock:
+            unrealized, realized, net, gross = self._row_contrib[:, row].tolist()
+            return {"qty": int(self.qty[row]), "avg": float(self.avg[row]), "ltp": float(self.ltp[row]),
+                    "unrealized": unrealized, "realized": realized, "net_exposure": net}
+
+    # --- reconciliation ---
+
+    def reconcile(self, portfolio):
+        """
+        Re-read /positions and /holdings, adopt them and report rows whose net
+        quantity differed from the locally booked one. Local prices are kept.
+        Rows that book a fill while the REST calls are in flight keep their local
+        state: the broker snapshot may predate that fill, and the next
+        reconcile() compares them again.
+
+        Returns:
+            dict: {"ok", "drift": [{"key", "local_qty", "broker_qty"}]}
+        """
+        touched = set()
+        with self._lock:
+            self._touched.append(touched)
+        try:
+            rows = self._fetch(portfolio)
+        finally:
+            with self._lock:
+                self._touched.remove(touched)
+        if rows is None:
+            return {"ok": False, "drift": []}
+        with self._lock:
+            local = {(r[0], r[1], r[2]): r for r in self._rows()}
+            broker = {(r[0], r[1], r[2]): r for r in rows}
+            drift = []
+            for key in sorted((set(local) | set(broker)) - touched, key=str):
+                local_qty = local[key][3] if key in local else 0
+                broker_qty = broker[key][3] if key in broker else 0
+                if local_qty != broker_qty:
+                    drift.append({"key": key, "local_qty": local_qty, "broker_qty": broker_qty})
+            # keep live prices where we have them
+            merged = [r[:6] + (local[key][6] or r[6] if key in local else r[6],)
+                      for key, r in broker.items() if key not in touched]
+            self._reset(merged + [local[key] for key in touched if key in local])
+            self.stats["reconciles"] += 1
+            self.stats["drift"] += len(drift)
+        if drift:
+            logging.warning(f"[PnLEngine] ⚠️ Reconcile found {len(drift)} position(s) out of sync")
+        return {"ok": True, "drift": drift}
+
+    async def reconcile_every(self, portfolio, interval: float = 60.0):
+        """reconcile() every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reconcile, portfolio)
+
+    def describe(self):
+        return {
+            "module": "PnLEngine",
+            "rows": len(self.qty),
+            "underlyings": len(self.groups),
+            "totals": self.totals(),
+            "stats": dict(self.stats)
+        }
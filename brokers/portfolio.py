@@ -7,6 +7,12 @@ from brokers.dhan_http import DhanHTTP
 
 
 class Portfolio:
+    TOOLS = {
+        "get_holdings": "read",
+        "get_positions": "read",
+        "convert_position": "write"
+    }
+
     def __init__(self, dhan: DhanHTTP):
         self.dhan = dhan
 
@@ -50,3 +56,9 @@ class Portfolio:
             "toProductType": to_product_type.upper()
         }
         return self.dhan.post("/positions/convert", payload)
+
+    def describe(self):
+        return {
+            "module": "Portfolio",
+            "tools": dict(self.TOOLS)
+        }
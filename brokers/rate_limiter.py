@@ -0,0 +1,219 @@
+"""
+Client-side rate limiting for Dhan REST calls.
+
+Dhan budgets order, data, quote and non-trading APIs separately. RequestScheduler
+keeps one set of token buckets per endpoint class and queues callers in priority
+lanes, so order placement, modification and cancellation are granted before
+bulk fetches waiting on the same budget.
+
+The scheduler is a clock-driven state machine (submit/poll) with thin blocking
+and asyncio wrappers on top; pass a fake clock and sleep to test it.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    CRITICAL = 0   # order place / modify / cancel, kill switch
+    HIGH = 1       # order status, position conversion
+    NORMAL = 2
+    BULK = 3       # historical candles, backfills
+
+
+ORDER, DATA, QUOTE, NON_TRADING, OPTION_CHAIN = (
+    "order", "data", "quote", "non_trading", "option_chain"
+)
+
+# endpoint class -> [(requests, per_seconds), ...]; every window must have room
+DEFAULT_LIMITS = {
+    ORDER: [(25, 1), (250, 60), (1000, 3600), (7000, 86400)],
+    DATA: [(5, 1), (100000, 86400)],
+    QUOTE: [(1, 1)],
+    NON_TRADING: [(20, 1)],
+    OPTION_CHAIN: [(1, 3)],
+}
+
+
+def classify(method: str, endpoint: str):
+    """
+    Map a request to its Dhan rate-limit class and default priority lane.
+
+    Returns:
+        tuple: (endpoint_class, Priority)
+    """
+    path = endpoint.split("?", 1)[0]
+    write = method.upper() != "GET"
+    if path.startswith(("/orders", "/super/orders")):
+        return (ORDER, Priority.CRITICAL) if write else (NON_TRADING, Priority.HIGH)
+    if path.startswith("/killswitch"):
+        return NON_TRADING, Priority.CRITICAL
+    if path.startswith("/positions/convert"):
+        return ORDER, Priority.HIGH
+    if path.startswith("/charts"):
+        return DATA, Priority.BULK
+    if path.startswith("/optionchain"):
+        return OPTION_CHAIN, Priority.NORMAL
+    if path.startswith("/marketfeed"):
+        return QUOTE, Priority.NORMAL
+    return NON_TRADING, Priority.NORMAL
+
+
+class TokenBucket:
+    def __init__(self, requests: int, per_seconds: float, now: float):
+        self.capacity = float(requests)
+        self.rate = requests / per_seconds
+        self.tokens = float(requests)
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _Ticket:
+    __slots__ = ("endpoint_class", "priority", "seq", "submitted", "granted")
+
+    def __init__(self, endpoint_class, priority, seq, submitted):
+        self.endpoint_class = endpoint_class
+        self.priority = priority
+        self.seq = seq
+        self.submitted = submitted
+        self.granted = None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    POLL_INTERVAL = 0.001
+
+    def __init__(self, limits: dict = None, clock=time.monotonic, sleep=time.sleep):
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.clock = clock
+        self.sleep = sleep
+        now = clock()
+        self._buckets = {
+            name: [TokenBucket(n, per, now) for n, per in windows]
+            for name, windows in self.limits.items()
+        }
+        self._queues = {name: [] for name in self.limits}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._stats = {name: {"granted": 0, "wait_total": 0.0, "wait_max": 0.0}
+                       for name in self.limits}
+
+    def submit(self, endpoint_class: str, priority: Priority = Priority.NORMAL):
+        """Queue a request in its class lane. Unknown classes are never limited."""
+        ticket = _Ticket(endpoint_class, Priority(priority), next(self._seq), self.clock())
+        queue = self._queues.get(endpoint_class)
+        if queue is not None:
+            with self._lock:
+                heapq.heappush(queue, ticket)
+        else:
+            ticket.granted = ticket.submitted
+        return ticket
+
+    def poll(self, ticket) -> float:
+        """
+        Grant the ticket if it is at the head of its lane and every window has a
+        token. Returns 0 when granted, otherwise the seconds to wait before
+        polling again.
+        """
+        if ticket.granted is not None:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            delay = max(b.delay(now) for b in self._buckets[ticket.endpoint_class])
+            queue = self._queues[ticket.endpoint_class]
+            if queue[0] is not ticket:
+                return max(delay, self.POLL_INTERVAL)
+            if delay > 0:
+                return delay
+            for bucket in self._buckets[ticket.endpoint_class]:
+                bucket.take()
+            heapq.heappop(queue)
+            ticket.granted = now
+            self._record(ticket)
+            return 0.0
+
+    def _record(self, ticket):
+        waited = ticket.granted - ticket.submitted
+        stats = self._stats[ticket.endpoint_class]
+        stats["granted"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+    def acquire(self, method: str, endpoint: str, priority: Priority = None) -> float:
+        """Block until the request may be sent. Returns the time spent waiting."""
+        endpoint_class, default_priority = classify(method, endpoint)
+        ticket = self.submit(endpoint_class, default_priority if priority is None else priority)
+        try:
+            while True:
+                delay = self.poll(ticket)
+                if delay <= 0:
+                    return ticket.granted - ticket.submitted
+                self.sleep(delay)
+        except BaseException:
+            self.cancel(ticket)
+            raise
+
+    async def acquire_async(self, method: str, endpoint: str, priority: Priority = None) -> float:
+        endpoint_class, default_priority = classify(method, endpoint)
+        ticket = self.submit(endpoint_class, default_priority if priority is None else priority)
+        try:
+            while True:
+                delay = self.poll(ticket)
+                if delay <= 0:
+                    return ticket.granted - ticket.submitted
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancel(ticket)
+            raise
+
+    def cancel(self, ticket):
+        if ticket.granted is not None:
+            return
+        with self._lock:
+            queue = self._queues[ticket.endpoint_class]
+            if ticket in queue:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+
+    def metrics(self):
+        """
+        Returns:
+            dict: Per endpoint class: queue depth (total and per lane), granted
+            count and wait-time totals in seconds.
+        """
+        with self._lock:
+            out = {}
+            for name, queue in self._queues.items():
+                stats = self._stats[name]
+                lanes = {p.name: 0 for p in Priority}
+                for ticket in queue:
+                    lanes[ticket.priority.name] += 1
+                out[name] = {
+                    "queue_depth": len(queue),
+                    "queue_depth_by_priority": lanes,
+                    "granted": stats["granted"],
+                    "wait_total": stats["wait_total"],
+                    "wait_max": stats["wait_max"],
+                    "wait_avg": stats["wait_total"] / stats["granted"] if stats["granted"] else 0.0,
+                }
+            return out
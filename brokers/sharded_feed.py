@@ -0,0 +1,218 @@
+"""
+Sharded MarketFeed: several websocket connections, each received and decoded
+in its own worker process, merged into one consumer-facing stream.
+
+Instruments are split across at most MAX_CONNECTIONS connections of at most
+MAX_INSTRUMENTS_PER_CONNECTION each (Dhan's per-user feed limits). Workers
+ship DecodedBatch objects back over a multiprocessing queue; the consumer side
+keeps per-shard throughput and lag counters so a lagging shard is visible.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import queue
+import time
+from types import SimpleNamespace
+
+from brokers.market_feed import MarketFeed
+from brokers.snapshot_table import SnapshotTable
+
+MAX_INSTRUMENTS_PER_CONNECTION = 5000
+MAX_CONNECTIONS = 5
+
+
+def plan_shards(instruments, shards: int = None,
+                max_per_connection: int = MAX_INSTRUMENTS_PER_CONNECTION,
+                max_connections: int = MAX_CONNECTIONS):
+    """
+    Split instruments into evenly sized shards, one per connection.
+
+    Returns:
+        list: One instrument list per shard
+    """
+    instruments = list(instruments)
+    needed = max(1, math.ceil(len(instruments) / max_per_connection))
+    count = max(needed, shards or needed)
+    if count > max_connections:
+        raise ValueError(
+            f"{len(instruments)} instruments need {count} connections; limit is {max_connections}."
+        )
+    count = min(count, max(1, len(instruments)))
+    return [instruments[i::count] for i in range(count)]
+
+
+def _shard_worker(shard_id, client_id, access_token, instruments, version, url,
+                  out_queue, stop_event, max_frames, max_wait):
+    """Worker process entry point: connect one shard and stream decoded batches."""
+    context = SimpleNamespace(dhan_client_id=client_id, dhan_access_token=access_token,
+                              market_instruments=instruments)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    feed = MarketFeed(context)
+    feed.version = version
+    if url:
+        feed.market_feed_wss = url
+
+    async def run():
+        await feed.connect()
+        while not stop_event.is_set():
+            batch = await feed.get_instrument_batch(max_frames, max_wait)
+            # put() pickles in a feeder thread, after the next decode() has reused the buffers
+            out_queue.put((shard_id, time.time(), batch.copy(), None))
+
+    try:
+        loop.run_until_complete(run())
+    except Exception as e:
+        out_queue.put((shard_id, time.time(), None, str(e)))
+    finally:
+        loop.close()
+
+
+class ShardStats:
+    __slots__ = ("shard_id", "instruments", "frames", "batches", "started",
+                 "last_batch_at", "last_lag", "max_lag", "lag_total", "error")
+
+    def __init__(self, shard_id, instruments):
+        self.shard_id = shard_id
+        self.instruments = instruments
+        self.frames = 0
+        self.batches = 0
+        self.started = time.time()
+        self.last_batch_at = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.lag_total = 0.0
+        self.error = None
+
+    def record(self, frames, decoded_at, received_at):
+        lag = received_at - decoded_at
+        self.frames += frames
+        self.batches += 1
+        self.last_batch_at = received_at
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.lag_total += lag
+
+    def as_dict(self, now=None):
+        now = now or time.time()
+        elapsed = max(now - self.started, 1e-9)
+        return {
+            "instruments": self.instruments,
+            "frames": self.frames,
+            "batches": self.batches,
+            "frames_per_sec": self.frames / elapsed,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "avg_lag": self.lag_total / self.batches if self.batches else 0.0,
+            "idle_for": now - self.last_batch_at if self.last_batch_at else None,
+            "error": self.error
+        }
+
+
+class ShardedMarketFeed:
+    def __init__(self, context, shards: int = None, max_frames: int = 512,
+                 max_wait: float = 0.005, snapshot: bool = False):
+        self.client_id = context.dhan_client_id
+        self.access_token = context.dhan_access_token
+        self.instruments = getattr(context, "market_instruments", [])
+        self.version = "v1"
+        self.url = None  # override MarketFeed.market_feed_wss, e.g. for a local simulator
+        self.max_frames = max_frames
+        self.max_wait = max_wait
+        self.shards = plan_shards(self.instruments, shards)
+        self.snapshot = SnapshotTable(self.instruments) if snapshot else None
+        self.stats = {i: ShardStats(i, len(s)) for i, s in enumerate(self.shards)}
+        self._mp = multiprocessing.get_context("spawn")
+        self._queue = None
+        self._stop = None
+        self._workers = []
+
+    def describe(self):
+        return {
+            "module": "ShardedMarketFeed",
+            "client_id": bool(self.client_id),
+            "instruments": len(self.instruments),
+            "shards": len(self.shards),
+            "running": any(w.is_alive() for w in self._workers)
+        }
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = self._mp.Queue()
+        self._stop = self._mp.Event()
+        for shard_id, instruments in enumerate(self.shards):
+            worker = self._mp.Process(
+                target=_shard_worker,
+                args=(shard_id, self.client_id, self.access_token, instruments, self.version,
+                      self.url, self._queue, self._stop, self.max_frames, self.max_wait),
+                name=f"MarketFeedShard-{shard_id}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: float = 5.0):
+        if self._stop is not None:
+            self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def _receive(self, timeout):
+        shard_id, decoded_at, batch, error = self._queue.get(timeout=timeout)
+        stats = self.stats[shard_id]
+        if error is not None:
+            stats.error = error
+            logging.error(f"[ShardedMarketFeed] ❌ Shard {shard_id} stopped: {error}")
+            return None
+        stats.record(batch.count, decoded_at, time.time())
+        if self.snapshot is not None:
+            self.snapshot.apply(batch)
+        return shard_id, batch
+
+    def get_batch(self, timeout: float = None):
+        """
+        Next decoded batch from any shard.
+
+        Returns:
+            tuple: (shard_id, DecodedBatch), or None on timeout or shard error
+        """
+        try:
+            return self._receive(timeout)
+        except queue.Empty:
+            return None
+
+    def batches(self, timeout: float = None):
+        """
+        Yield (shard_id, DecodedBatch) from all shards until every worker has
+        stopped, or nothing arrives within timeout seconds.
+        """
+        while self._workers:
+            try:
+                item = self._receive(timeout if timeout is not None else 1.0)
+            except queue.Empty:
+                if timeout is not None or not any(w.is_alive() for w in self._workers):
+                    return
+                continue
+            if item is not None:
+                yield item
+
+    def metrics(self):
+        """
+        Returns:
+            dict: Per-shard throughput and lag counters, plus the merged queue backlog
+        """
+        now = time.time()
+        try:
+            backlog = self._queue.qsize() if self._queue is not None else 0
+        except NotImplementedError:
+            backlog = None
+        return {
+            "backlog": backlog,
+            "shards": {i: s.as_dict(now) for i, s in self.stats.items()}
+        }
@@ -0,0 +1,165 @@
+"""
+Last-value snapshot table for MarketFeed instruments.
+
+One preallocated structured-array row per subscribed (exchange_segment,
+security_id), updated in place from decoded feed batches. Single lookups go
+through a dict index (O(1)); batch updates map packets to rows with a sorted
+key array and np.searchsorted, so applying a batch is vectorised end to end.
+Reads and writes share a lock, so snapshot() can be called from any thread.
+add_instruments() grows the table in place, keeping the values collected so far.
+"""
+
+import threading
+
+import numpy as np
+
+SNAPSHOT_DTYPE = np.dtype([
+    ('exchange_segment', 'u1'), ('security_id', '<u4'),
+    ('LTP', '<f8'), ('LTQ', '<i8'), ('LTT', '<i8'), ('avg_price', '<f8'),
+    ('volume', '<i8'), ('total_buy_qty', '<i8'), ('total_sell_qty', '<i8'),
+    ('OI', '<i8'), ('oi_day_high', '<i8'), ('oi_day_low', '<i8'),
+    ('open', '<f8'), ('close', '<f8'), ('high', '<f8'), ('low', '<f8'),
+    ('bid_price', '<f8'), ('bid_qty', '<i8'), ('ask_price', '<f8'), ('ask_qty', '<i8'),
+    ('updates', '<i8'),
+])
+
+# snapshot field -> packet types that carry it (top-of-book comes from depth level 0)
+_FIELD_SOURCES = {
+    'LTP': ('Ticker', 'Quote', 'Depth', 'Full'),
+    'LTT': ('Ticker', 'Quote', 'Full'),
+    'LTQ': ('Quote', 'Full'),
+    'avg_price': ('Quote', 'Full'),
+    'volume': ('Quote', 'Full'),
+    'total_buy_qty': ('Quote', 'Full'),
+    'total_sell_qty': ('Quote', 'Full'),
+    'open': ('Quote', 'Full'),
+    'close': ('Quote', 'Full'),
+    'high': ('Quote', 'Full'),
+    'low': ('Quote', 'Full'),
+    'OI': ('OI', 'Full'),
+    'oi_day_high': ('Full',),
+    'oi_day_low': ('Full',),
+    'bid_price': ('Depth', 'Full'),
+    'bid_qty': ('Depth', 'Full'),
+    'ask_price': ('Depth', 'Full'),
+    'ask_qty': ('Depth', 'Full'),
+}
+_TOP_OF_BOOK = ('bid_price', 'bid_qty', 'ask_price', 'ask_qty')
+
+
+def instrument_keys(exchange_segment, security_id):
+    return (np.asarray(exchange_segment, dtype=np.uint64) << np.uint64(32)) | \
+        np.asarray(security_id, dtype=np.uint64)
+
+
+class SnapshotTable:
+    def __init__(self, instruments):
+        """
+        Args:
+            instruments (list): MarketFeed-style (exchange_segment, security_id[, request_code])
+        """
+        self._index = {}
+        self._layout(sorted({(int(inst[0]), int(inst[1])) for inst in instruments}))
+        self._lock = threading.Lock()
+        self.packets_applied = 0
+        self.packets_unknown = 0
+
+    def _layout(self, pairs):
+        rows = np.zeros(len(pairs), dtype=SNAPSHOT_DTYPE)
+        if pairs:
+            rows['exchange_segment'], rows['security_id'] = zip(*pairs)
+        index = {pair: i for i, pair in enumerate(pairs)}
+        if self._index:
+            rows[[index[pair] for pair in self._index]] = self.rows[list(self._index.values())]
+        self.rows, self._index = rows, index
+        self._keys = instrument_keys(rows['exchange_segment'], rows['security_id'])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def covers(self, instruments):
+        return all((int(inst[0]), int(inst[1])) in self._index for inst in instruments)
+
+    def add_instruments(self, instruments):
+        """Track more instruments; values already collected are kept (row numbers may shift)."""
+        with self._lock:
+            if not self.covers(instruments):
+                self._layout(sorted(set(self._index) | {(int(inst[0]), int(inst[1])) for inst in instruments}))
+
+    def row_of(self, exchange_segment, security_id):
+        return self._index.get((int(exchange_segment), int(security_id)))
+
+    def get(self, exchange_segment, security_id):
+        """
+        Returns:
+            dict: Latest values for one instrument, or None if not subscribed
+        """
+        with self._lock:
+            row = self.row_of(exchange_segment, security_id)
+            if row is None:
+                return None
+            record = self.rows[row].copy()
+        return dict(zip(SNAPSHOT_DTYPE.names, record.tolist()))
+
+    def snapshot(self, instruments=None):
+        """
+        Copy of the table (or of the given (exchange_segment, security_id) rows),
+        consistent as of a single point in the update stream.
+
+        Returns:
+            numpy.ndarray: SNAPSHOT_DTYPE rows
+        """
+        if instruments is None:
+            with self._lock:
+                return self.rows.copy()
+        with self._lock:
+            rows = [self.row_of(inst[0], inst[1]) for inst in instruments]
+            return self.rows[np.array([r for r in rows if r is not None], dtype=np.intp)]
+
+    def _locate(self, packets):
+        keys = instrument_keys(packets['exchange_segment'], packets['security_id'])
+        pos = np.searchsorted(self._keys, keys)
+        pos[pos >= len(self._keys)] = 0
+        known = self._keys[pos] == keys if len(self._keys) else np.zeros(len(keys), dtype=bool)
+        return pos, known
+
+    def apply(self, batch):
+        """Apply a feed_decoder.DecodedBatch. Later packets win within a batch."""
+        with self._lock:  # rows are located under the lock: add_instruments() may move them
+            located, unknown = {}, 0
+            for name, packets in batch.packets.items():
+                pos, known = self._locate(packets)
+                located[name] = (packets[known], pos[known], batch.positions[name][known])
+                unknown += int((~known).sum())
+            self.packets_unknown += unknown
+            for field, sources in _FIELD_SOURCES.items():
+                rows, values, order = [], [], []
+                for name in sources:
+                    if name not in located:
+                        continue
+                    packets, pos, arrival = located[name]
+                    if field in _TOP_OF_BOOK:
+                        values.append(packets['depth'][:, 0][field])
+                    else:
+                        values.append(packets[field])
+                    rows.append(pos)
+                    order.append(arrival)
+                if not rows:
+                    continue
+                rows, values = np.concatenate(rows), np.concatenate(values)
+                if len(order) > 1:
+                    by_arrival = np.argsort(np.concatenate(order), kind='stable')
+                    rows, values = rows[by_arrival], values[by_arrival]
+                # fancy assignment with repeated rows keeps the last value
+                self.rows[field][rows] = values
+            for packets, pos, _ in located.values():
+                np.add.at(self.rows['updates'], pos, 1)
+                self.packets_applied += len(pos)
+
+    def describe(self):
+        return {
+            "module": "SnapshotTable",
+            "instruments": len(self.rows),
+            "packets_applied": self.packets_applied,
+            "packets_unknown": self.packets_unknown
+        }
@@ -7,17 +7,25 @@ from brokers.dhan_http import DhanHTTP
 
 
 class SuperOrder:
+    TOOLS = {
+        "list": "read",
+        "place": "write",
+        "modify": "write",
+        "cancel": "write"
+    }
+
     def __init__(self, dhan: DhanHTTP):
         self.dhan = dhan
 
     def list(self):
+        """All super orders placed today."""
         return self.dhan.get("/super/orders")
 
     def place(self, security_id: str, exchange_segment: str, transaction_type: str,
               quantity: int, order_type: str, product_type: str, price: float,
               target_price: float, stop_loss_price: float, trailing_jump: float = 0.0,
               tag: str = None):
-        
+        """Place an entry order with bundled target and stop-loss legs."""
         if not all([security_id, exchange_segment, transaction_type, quantity,
                     order_type, product_type, price, target_price, stop_loss_price]):
             raise ValueError("Missing required fields for super order.")
@@ -53,7 +61,7 @@ class SuperOrder:
                quantity: int = 0, price: float = 0.0,
                target_price: float = 0.0, stop_loss_price: float = 0.0,
                trailing_jump: float = 0.0):
-        
+        """Modify one leg (ENTRY_LEG / TARGET_LEG / STOP_LOSS_LEG) of a super order."""
         if leg_name not in ("ENTRY_LEG", "TARGET_LEG", "STOP_LOSS_LEG"):
             raise ValueError("Invalid leg name.")
 
@@ -77,6 +85,13 @@ class SuperOrder:
         return self.dhan.put(f"/super/orders/{order_id}", payload)
 
     def cancel(self, order_id: str, leg: str):
+        """Cancel one leg (ENTRY_LEG / TARGET_LEG / STOP_LOSS_LEG) of a super order."""
         if leg not in ("ENTRY_LEG", "TARGET_LEG", "STOP_LOSS_LEG"):
             raise ValueError("Invalid leg for cancellation.")
         return self.dhan.delete(f"/super/orders/{order_id}/{leg}")
+
+    def describe(self):
+        return {
+            "module": "SuperOrder",
+            "tools": dict(self.TOOLS)
+        }
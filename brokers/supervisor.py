@@ -0,0 +1,178 @@
+"""
+Supervised websocket connections with jittered backoff, subscription replay
+and an optional warm standby.
+
+A ConnectionSupervisor is built from four callables supplied by the feed:
+
+    open_connection()  -> ws     handshake (and auth that does not subscribe)
+    subscribe(ws)                replay the current subscription set
+    receive(ws)                  async iterator of decoded items
+    handler(item)                consumer callback (sync or async)
+
+When the connection drops it reconnects with full-jitter exponential backoff
+and replays subscribe(). With standby=True a second connection is kept open
+(handshake done, not subscribed) and takes over as soon as the primary fails.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+
+from core.backoff import Backoff
+
+
+class ConnectionSupervisor:
+    def __init__(self, name, open_connection, subscribe, receive, handler,
+                 backoff: Backoff = None, standby: bool = False, clock=time.monotonic):
+        self.name = name
+        self.open_connection = open_connection
+        self.subscribe = subscribe
+        self.receive = receive
+        self.handler = handler
+        self.backoff = backoff or Backoff()
+        self.standby = standby
+        self.clock = clock
+
+        self.ws = None
+        self.state = "idle"
+        self._standby_task = None
+        self._stopping = False
+        self._dropped_at = None
+        self._last_message_at = None
+        self._lost_since = None
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "standby_takeovers": 0,
+            "messages": 0,
+            "last_reconnect_time": None,
+            "max_reconnect_time": 0.0,
+            "last_lost_interval": None,
+            "total_lost_time": 0.0,
+            "last_error": None,
+        }
+
+    def metrics(self):
+        """
+        Returns:
+            dict: Connection counters. reconnect_time is drop -> resubscribed;
+            lost_interval is last message before a drop -> first message after.
+        """
+        return {"name": self.name, "state": self.state, "standby": self.standby, **self.stats}
+
+    async def _open_with_retry(self):
+        while not self._stopping:
+            try:
+                ws = await self.open_connection()
+                self.backoff.reset()
+                return ws
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                delay = self.backoff.next_delay()
+                logging.warning(f"[{self.name}] ⚠️ Connect failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        return None
+
+    def _start_standby(self):
+        if self.standby and not self._stopping:
+            self._standby_task = asyncio.ensure_future(self._open_with_retry())
+
+    async def _take_standby(self):
+        task, self._standby_task = self._standby_task, None
+        if task is None:
+            return None
+        try:
+            ws = await task  # usually already open; otherwise mid-handshake
+        except Exception:
+            return None
+        if ws is None or getattr(ws, "close_code", None) is not None:
+            return None
+        return ws
+
+    async def _establish(self):
+        ws = await self._take_standby()
+        if ws is not None:
+            self.stats["standby_takeovers"] += 1
+        else:
+            ws = await self._open_with_retry()
+        if ws is None:
+            return None
+        self.ws = ws
+        await self.subscribe(ws)
+        self.stats["connects"] += 1
+        if self._dropped_at is not None:
+            elapsed = self.clock() - self._dropped_at
+            self.stats["reconnects"] += 1
+            self.stats["last_reconnect_time"] = elapsed
+            self.stats["max_reconnect_time"] = max(self.stats["max_reconnect_time"], elapsed)
+            self._dropped_at = None
+        self._start_standby()
+        return ws
+
+    async def _dispatch(self, item):
+        try:
+            result = self.handler(item)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logging.error(f"[{self.name}] ❌ Handler error: {e}")
+
+    async def _consume(self, ws):
+        async for item in self.receive(ws):
+            now = self.clock()
+            if self._lost_since is not None:
+                lost = now - self._lost_since
+                self.stats["last_lost_interval"] = lost
+                self.stats["total_lost_time"] += lost
+                self._lost_since = None
+            self._last_message_at = now
+            self.stats["messages"] += 1
+            await self._dispatch(item)
+
+    async def run(self):
+        """Connect, consume and reconnect until stop() is called."""
+        self._stopping = False
+        try:
+            while not self._stopping:
+                self.state = "connecting"
+                try:
+                    ws = await self._establish()
+                    if ws is None:
+                        break
+                    self.state = "connected"
+                    await self._consume(ws)
+                    error = "connection closed"
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+                if self._stopping:
+                    break
+                if self._dropped_at is None:
+                    self._dropped_at = self.clock()
+                if self._lost_since is None:
+                    self._lost_since = self._last_message_at or self._dropped_at
+                self.stats["last_error"] = error
+                self.state = "reconnecting"
+                logging.warning(f"[{self.name}] ⚠️ Connection lost: {error}")
+                if self._standby_task is None:
+                    await asyncio.sleep(self.backoff.next_delay())
+        finally:
+            self.state = "stopped"
+            await self._close_all()
+
+    async def _close_all(self):
+        task, self._standby_task = self._standby_task, None
+        if task is not None:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and not task.exception() and task.result() is not None:
+                await task.result().close()
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def stop(self):
+        self._stopping = True
+        if self.ws is not None:
+            await self.ws.close()
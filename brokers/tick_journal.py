@@ -0,0 +1,271 @@
+"""
+Append-only journal of raw MarketFeed frames, and a memory-mapped replayer.
+
+TickRecorder.record() only appends (receive time, frame) to an in-memory queue;
+a background thread batches the queue into rotating journal files, so the
+receive path never touches the disk. TickReplayer memory-maps journals and
+feeds the frames back through MarketFeed's own parsers (dict or columnar
+batch, snapshot and bars included), paced at recorded wall-clock speed, a
+multiple of it, or as fast as possible.
+
+File layout (little-endian):
+    header  b"DHANTJ01" + int64 first-record epoch ns
+    record  int64 receive epoch ns + uint32 length + frame bytes
+
+    feed.start_recording("journal/")
+    ...
+    TickReplayer("journal/").frames()              # (recv_ns, frame) in order
+    await TickReplayer("journal/").replay(handler, batch=True, speed=1.0)
+"""
+
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+MAGIC = b"DHANTJ01"
+HEADER_STRUCT = struct.Struct("<8sq")
+RECORD_STRUCT = struct.Struct("<qI")
+SUFFIX = ".tj"
+
+
+class TickRecorder:
+    def __init__(self, directory: str, max_bytes: int = 64 << 20, flush_interval: float = 0.05,
+                 prefix: str = "ticks", clock=time.time_ns):
+        """
+        Args:
+            directory (str): Journal directory (created if missing)
+            max_bytes (int): Rotate to a new file once the current one reaches this size
+            flush_interval (float): Seconds between background writes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.prefix = prefix
+        self.clock = clock
+        self.files = []
+        self._pending = deque()
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"frames": 0, "bytes": 0, "writes": 0, "errors": 0}
+
+    # --- hot path ---
+
+    def record(self, frame):
+        """Queue one received frame; never blocks on I/O."""
+        self._pending.append((self.clock(), frame))
+
+    # --- background writer ---
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="TickRecorder", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Write everything queued so far and close the current file."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self._drain()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self):
+        """Write the queue now (from the caller's thread)."""
+        self._drain()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        if self._pending:
+            with self._lock:
+                self._write_pending()
+
+    def _write_pending(self):
+        pending = self._pending
+        chunk, frames = bytearray(), 0
+        try:
+            while pending:
+                recv_ns, frame = pending.popleft()
+                if isinstance(frame, str):
+                    frame = frame.encode()
+                if self._file is None or self._size + len(chunk) >= self.max_bytes:
+                    self._write(chunk)
+                    chunk = bytearray()
+                    self._rotate(recv_ns)
+                chunk += RECORD_STRUCT.pack(recv_ns, len(frame))
+                chunk += frame
+                frames += 1
+            self._write(chunk)
+            self.stats["frames"] += frames
+        except OSError as e:
+            self.stats["errors"] += 1
+            logging.error(f"[TickRecorder] ❌ Journal write failed: {e}")
+
+    def _write(self, chunk):
+        if chunk:
+            self._file.write(chunk)
+            self._file.flush()
+            self._size += len(chunk)
+            self.stats["bytes"] += len(chunk)
+            self.stats["writes"] += 1
+
+    def _rotate(self, first_ns):
+        if self._file is not None:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(first_ns / 1e9))
+        seq = len(self.files)
+        while os.path.exists(path := os.path.join(self.directory, f"{self.prefix}-{stamp}-{seq:04d}{SUFFIX}")):
+            seq += 1
+        self._file = open(path, "wb")
+        self._file.write(HEADER_STRUCT.pack(MAGIC, first_ns))
+        self._size = HEADER_STRUCT.size
+        self.files.append(path)
+
+    def describe(self):
+        return {
+            "module": "TickRecorder",
+            "directory": self.directory,
+            "running": self._thread is not None,
+            "pending": len(self._pending),
+            "files": len(self.files),
+            "stats": dict(self.stats)
+        }
+
+
+def journal_files(path: str):
+    """A journal file, or every journal in a directory in recording order."""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(SUFFIX))
+    return [path]
+
+
+def read_journal(path: str):
+    """
+    Yield (recv_ns, frame) from one memory-mapped journal file. A record cut
+    short by a crash mid-write ends the file.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER_STRUCT.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, _ = HEADER_STRUCT.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a tick journal")
+            offset, end = HEADER_STRUCT.size, len(mm)
+            while offset + RECORD_STRUCT.size <= end:
+                recv_ns, length = RECORD_STRUCT.unpack_from(mm, offset)
+                offset += RECORD_STRUCT.size
+                if offset + length > end:
+                    break
+                yield recv_ns, mm[offset:offset + length]
+                offset += length
+
+
+class TickReplayer:
+    def __init__(self, path: str, feed=None):
+        """
+        Args:
+            path (str): Journal file or directory of journals
+            feed: MarketFeed whose parsers / decoder / snapshot receive the frames;
+                  a detached MarketFeed is used when omitted
+        """
+        if feed is None:
+            from brokers.market_feed import MarketFeed
+            feed = MarketFeed(SimpleNamespace(dhan_client_id="", dhan_access_token=""))
+        self.path = path
+        self.feed = feed
+        self.files = journal_files(path)
+        self.stats = {"frames": 0, "batches": 0}
+
+    def frames(self):
+        """Every recorded (recv_ns, frame), unpaced."""
+        for path in self.files:
+            yield from read_journal(path)
+
+    def _batches(self, max_frames, max_wait):
+        # regroup as get_instrument_batch() would have: frames within max_wait of the first
+        window = int(max_wait * 1e9)
+        batch, first = [], None
+        for recv_ns, frame in self.frames():
+            if batch and (len(batch) >= max_frames or recv_ns - first > window):
+                yield first, batch
+                batch = []
+            if not batch:
+                first = recv_ns
+            batch.append(frame)
+        if batch:
+            yield first, batch
+
+    async def replay(self, handler=None, batch: bool = False, speed: float = None,
+                     max_frames: int = 512, max_wait: float = 0.005):
+        """
+        Push every frame through the feed's parsers.
+
+        Args:
+            handler: called with each parsed dict (or DecodedBatch with batch=True); may be async
+            batch (bool): Decode with the columnar FeedDecoder in recorded batches
+            speed (float): None = as fast as possible; 1.0 = recorded wall-clock pace; 10.0 = 10x
+
+        Returns:
+            dict: {"frames", "batches", "seconds"}
+        """
+        feed, loop = self.feed, asyncio.get_running_loop()
+        if batch:
+            units = self._batches(max_frames, max_wait)
+        else:
+            units = ((recv_ns, [frame]) for recv_ns, frame in self.frames())
+        start, origin, frames, batches = loop.time(), None, 0, 0
+        for recv_ns, chunk in units:
+            if speed:
+                origin = recv_ns if origin is None else origin
+                delay = (recv_ns - origin) / 1e9 / speed - (loop.time() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if batch:
+                result = feed._get_decoder().decode(chunk)
+                feed._apply(result)
+            else:
+                if feed.snapshot is not None or feed.bars is not None:
+                    feed._apply(feed._get_decoder().decode(chunk))
+                result = feed._parse_response(chunk[0])
+            frames += len(chunk)
+            batches += 1
+            if handler is not None:
+                out = handler(result)
+                if asyncio.iscoroutine(out):
+                    await out
+        self.stats["frames"] += frames
+        self.stats["batches"] += batches
+        return {"frames": frames, "batches": batches, "seconds": loop.time() - start}
+
+    def replay_sync(self, handler=None, **kwargs):
+        return asyncio.run(self.replay(handler, **kwargs))
+
+    def describe(self):
+        return {
+            "module": "TickReplayer",
+            "path": self.path,
+            "files": len(self.files),
+            "stats": dict(self.stats)
+        }
@@ -6,6 +6,10 @@ from brokers.dhan_http import DhanHTTP
 
 
 class TraderControl:
+    TOOLS = {
+        "kill_switch": "write"
+    }
+
     def __init__(self, dhan: DhanHTTP):
         self.dhan = dhan
 
@@ -25,3 +29,9 @@ class TraderControl:
 
         endpoint = f"/killswitch?killSwitchStatus={action.upper()}"
         return self.dhan.post(endpoint)
+
+    def describe(self):
+        return {
+            "module": "TraderControl",
+            "tools": dict(self.TOOLS)
+        }
@@ -0,0 +1,127 @@
+"""
+Pre-market connection warm-up.
+
+Opens the REST keep-alive connections (sync and async), the market feed
+websocket (authorised and subscribed) and the order-update stream (logged in,
+left running under its supervisor) before the session starts, so the first
+real order or quote request goes out on a hot connection.
+
+    warmup = PreMarketWarmup.from_client(dhan)
+    report = await warmup.run_at("09:00")   # IST; runs immediately if already past
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from brokers.candle_store import IST_OFFSET
+
+IST = timezone(timedelta(seconds=IST_OFFSET))
+
+
+def seconds_until(at: str, now: float = None):
+    """Seconds from now (epoch) until HH:MM IST today; 0 once that time has passed."""
+    now = time.time() if now is None else now
+    current = datetime.fromtimestamp(now, IST)
+    hour, minute = map(int, at.split(":"))
+    target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return max((target - current).total_seconds(), 0.0)
+
+
+class PreMarketWarmup:
+    def __init__(self, http=None, async_http=None, market_feed=None, order_update=None, timeout: float = 10.0):
+        """
+        Args:
+            http: DhanHTTP; async_http: AsyncDhanHTTP
+            market_feed: MarketFeed, connected and subscribed to its current instruments
+            order_update: OrderUpdate, started under its ConnectionSupervisor and left running
+            timeout (float): Per-target limit in seconds
+        """
+        self.http = http
+        self.async_http = async_http
+        self.market_feed = market_feed
+        self.order_update = order_update
+        self.timeout = timeout
+        self.order_task = None  # the running OrderUpdate supervisor, once started
+        self.last_report = None
+
+    @classmethod
+    def from_client(cls, dhan, market_feed: bool = True, order_update: bool = True, **kwargs):
+        """Warm-up for a DhanClient's shared clients (streams included unless disabled)."""
+        return cls(
+            http=dhan.http,
+            async_http=dhan.context.get_async_dhan_http() if hasattr(dhan.context, "get_async_dhan_http") else None,
+            market_feed=dhan.market_feed if market_feed else None,
+            order_update=dhan.order_update if order_update else None,
+            **kwargs
+        )
+
+    async def _timed(self, name, warm):
+        start = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(warm(), self.timeout)
+            error = None if ok is not False else "warm-up request failed"
+        except Exception as e:
+            ok, error = False, str(e) or e.__class__.__name__
+            logging.error(f"[PreMarketWarmup] ❌ {name}: {error}")
+        return name, {"ok": ok is not False, "ms": round((time.perf_counter() - start) * 1e3, 3), "error": error}
+
+    async def _http(self):
+        return await asyncio.to_thread(self.http.warm)
+
+    async def _market_feed(self):
+        await self.market_feed.connect()
+        return True
+
+    async def _order_update(self):
+        supervisor = self.order_update.supervisor
+        if supervisor is None or supervisor.state in ("idle", "stopped"):
+            supervisor = self.order_update.supervised()
+            self.order_task = asyncio.ensure_future(supervisor.run())
+        while supervisor.state != "connected":
+            if self.order_task is not None and self.order_task.done():
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    async def run(self):
+        """
+        Warm every configured target concurrently.
+
+        Returns:
+            dict: target -> {"ok", "ms", "error"}
+        """
+        targets = [(name, warm) for name, client, warm in (
+            ("http", self.http, self._http),
+            ("async_http", self.async_http, lambda: self.async_http.warm()),
+            ("market_feed", self.market_feed, self._market_feed),
+            ("order_update", self.order_update, self._order_update),
+        ) if client is not None]
+        self.last_report = dict(await asyncio.gather(*(self._timed(name, warm) for name, warm in targets)))
+        return self.last_report
+
+    async def run_at(self, at: str = "09:00"):
+        """Sleep until `at` (HH:MM IST), then run()."""
+        delay = seconds_until(at)
+        if delay:
+            logging.info(f"[PreMarketWarmup] Warm-up scheduled in {delay:.0f}s ({at} IST)")
+            await asyncio.sleep(delay)
+        return await self.run()
+
+    async def stop(self):
+        """Stop the order-update stream started by run()."""
+        if self.order_task is not None:
+            await self.order_update.supervisor.stop()
+            await asyncio.gather(self.order_task, return_exceptions=True)
+            self.order_task = None
+
+    def describe(self):
+        return {
+            "module": "PreMarketWarmup",
+            "targets": [name for name, client in (
+                ("http", self.http), ("async_http", self.async_http),
+                ("market_feed", self.market_feed), ("order_update", self.order_update)) if client is not None],
+            "timeout": self.timeout,
+            "last_report": self.last_report
+        }
@@ -0,0 +1,23 @@
+"""
+Full-jitter exponential backoff, shared by the feed supervisors, the
+historical backfill and the GPT client.
+"""
+
+import random
+
+
+class Backoff:
+    def __init__(self, base: float = 0.5, cap: float = 30.0, rng: random.Random = None):
+        self.base = base
+        self.cap = cap
+        self.rng = rng or random.Random()
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        """Full jitter: uniform(0, min(cap, base * 2**attempt))."""
+        delay = self.rng.uniform(0, min(self.cap, self.base * (2 ** self.attempt)))
+        self.attempt += 1
+        return delay
+
+    def reset(self):
+        self.attempt = 0
@@ -1,5 +1,4 @@
 import os
-from brokers.dhan_http import DhanHTTP
 
 class Context:
     def __init__(
@@ -12,13 +11,54 @@ class Context:
         self.dhan_client_id = dhan_client_id or os.getenv("DHAN_CLIENT_ID")
         self.dhan_access_token = dhan_access_token or os.getenv("DHAN_ACCESS_TOKEN")
         self._dhan_http = None  # Lazy-loaded
+        self._async_dhan_http = None  # Lazy-loaded
+        self._scheduler = None  # Shared rate-limit budget for sync + async clients
+        self._http_metrics = None  # Shared latency histograms for sync + async clients
+
+    def _has_credentials(self):
+        return bool(self.dhan_client_id and self.dhan_access_token)
+
+    def get_connection_pool(self):
+        """Process-wide registry; every Context for the same account shares its clients."""
+        from brokers.connection_pool import connection_pool
+        return connection_pool()
+
+    def get_request_scheduler(self):
+        if not self._scheduler:
+            if self._has_credentials():
+                self._scheduler = self.get_connection_pool().scheduler(self.dhan_client_id, self.dhan_access_token)
+            else:
+                from brokers.rate_limiter import RequestScheduler
+                self._scheduler = RequestScheduler()
+        return self._scheduler
+
+    def get_http_metrics(self):
+        if not self._http_metrics:
+            if self._has_credentials():
+                self._http_metrics = self.get_connection_pool().metrics(self.dhan_client_id, self.dhan_access_token)
+            else:
+                from brokers.http_metrics import HttpMetrics
+                self._http_metrics = HttpMetrics()
+        return self._http_metrics
 
     def get_dhan_http(self):
         if not self._dhan_http:
-            if not self.dhan_client_id or not self.dhan_access_token:
+            if not self._has_credentials():
                 raise ValueError("❌ Missing Dhan credentials.")
-            self._dhan_http = DhanHTTP(
-                client_id=self.dhan_client_id,
-                access_token=self.dhan_access_token
+            self._dhan_http = self.get_connection_pool().get_http(
+                self.dhan_client_id, self.dhan_access_token,
+                scheduler=self.get_request_scheduler(),
+                metrics=self.get_http_metrics()
             )
         return self._dhan_http
+
+    def get_async_dhan_http(self):
+        if not self._async_dhan_http:
+            if not self._has_credentials():
+                raise ValueError("❌ Missing Dhan credentials.")
+            self._async_dhan_http = self.get_connection_pool().get_async_http(
+                self.dhan_client_id, self.dhan_access_token,
+                scheduler=self.get_request_scheduler(),
+                metrics=self.get_http_metrics()
+            )
+        return self._async_dhan_http
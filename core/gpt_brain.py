@@ -1,31 +1,207 @@
+import asyncio
 import openai
 import logging
 import time
 
+from core.latency import LatencyRecorder
+from core.backoff import Backoff
+from core.response_cache import ResponseCache
+
+# errors a retry cannot fix
+FATAL_ERRORS = (openai.BadRequestError, openai.AuthenticationError,
+                openai.PermissionDeniedError, openai.NotFoundError)
+
+
+def retry_after(error):
+    """Seconds requested by the server's Retry-After / retry-after-ms header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header, divisor in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        try:
+            return float(headers[header]) / divisor
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
 class GPTBrain:
-    def __init__(self, api_key, model="gpt-4o", timeout=30, max_retries=3):
-        """Initialize GPTBrain for making requests to OpenAI."""
-        self.client = openai.OpenAI(api_key=api_key)
+    def __init__(self, api_key, model="gpt-4o", timeout=30, max_retries=3, temperature=0.3,
+                 cache=None, cache_ttl=0, cache_size=256, cache_path=None,
+                 backoff_base=0.5, backoff_cap=20.0):
+        """
+        Initialize GPTBrain for making requests to OpenAI.
+
+        Caching is off by default, since a repeated prompt may need a fresh answer.
+        Pass cache_ttl > 0 to cache responses per (model, prompt, temperature) for
+        that many seconds, or a ResponseCache to share one between brains.
+        Failed calls are retried with full-jitter exponential backoff, waiting at
+        least as long as the server's Retry-After.
+        """
+        self.api_key = api_key
+        # retries are handled here so the SDK's own retry loop is switched off
+        self.client = openai.OpenAI(api_key=api_key, max_retries=0)
+        self._async_client = None  # Lazy-loaded
         self.model = model
         self.timeout = timeout
         self.max_retries = max_retries
+        self.temperature = temperature
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        if cache is None and cache_ttl > 0:
+            cache = ResponseCache(max_entries=cache_size, ttl=cache_ttl, path=cache_path)
+        self.cache = cache
+        self.first_token = LatencyRecorder()  # time to first streamed token
+        self.total = LatencyRecorder()  # full call, including retries
+        self.last_call = None
         logging.basicConfig(level=logging.INFO)
 
-    def get_response(self, prompt):
-        """Send a prompt to OpenAI and return the response."""
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = openai.AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        return self._async_client
+
+    def _delay(self, backoff, error):
+        return max(backoff.next_delay(), retry_after(error) or 0.0)
+
+    def _record(self, prompt, start, first=None, chunks=None):
+        end = time.perf_counter_ns()
+        self.total.record(end - start)
+        if first is not None:
+            self.first_token.record(first - start)
+        self.last_call = {
+            "prompt_chars": len(prompt),
+            "first_token_ms": (first - start) / 1e6 if first is not None else None,
+            "total_ms": (end - start) / 1e6,
+            "chunks": chunks
+        }
+
+    # --- sync ---
+
+    def get_response(self, prompt, temperature=None, use_cache=True):
+        """Send a prompt to OpenAI and return the response (served from cache while fresh)."""
+        temperature = self.temperature if temperature is None else temperature
+        if self.cache is None or not use_cache:
+            return self._request(prompt, temperature)
+        key = ResponseCache.key(self.model, prompt, temperature)
+        return self.cache.get_or_call(key, lambda: self._request(prompt, temperature))
+
+    def _request(self, prompt, temperature):
+        backoff = Backoff(self.backoff_base, self.backoff_cap)
+        start = time.perf_counter_ns()
         retries = 0
         while retries < self.max_retries:
             try:
                 response = self.client.chat.completions.create(
                     model=self.model,
                     messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3,
+                    temperature=temperature,
                     timeout=self.timeout
                 )
+                self._record(prompt, start)
                 return response.choices[0].message.content.strip()
+            except FATAL_ERRORS:
+                raise
             except Exception as e:
                 retries += 1
                 logging.error(f"GPT error: {e}, retrying {retries}/{self.max_retries}")
-                time.sleep(2)
+                if retries < self.max_retries:
+                    time.sleep(self._delay(backoff, e))
 
         raise Exception("Max retries exceeded for GPT request.")
+
+    # --- async ---
+
+    async def _create_async(self, **kwargs):
+        """chat.completions.create with backoff retries."""
+        backoff = Backoff(self.backoff_base, self.backoff_cap)
+        retries = 0
+        while True:
+            try:
+                return await self.async_client.chat.completions.create(
+                    model=self.model, timeout=self.timeout, **kwargs)
+            except FATAL_ERRORS:
+                raise
+            except Exception as e:
+                retries += 1
+                logging.error(f"GPT error: {e}, retrying {retries}/{self.max_retries}")
+                if retries >= self.max_retries:
+                    raise Exception("Max retries exceeded for GPT request.") from e
+                await asyncio.sleep(self._delay(backoff, e))
+
+    async def complete(self, messages, tools=None, temperature=None):
+        """
+        One non-streaming chat turn (used for tool calling; not cached).
+
+        Returns:
+            The assistant message (content and/or tool_calls)
+        """
+        kwargs = {"tools": tools} if tools else {}
+        start = time.perf_counter_ns()
+        response = await self._create_async(
+            messages=messages, temperature=self.temperature if temperature is None else temperature, **kwargs)
+        self._record(str(messages[-1].get("content") or ""), start)
+        return response.choices[0].message
+
+    async def stream(self, prompt, temperature=None):
+        """
+        Async generator yielding content deltas as they arrive.
+
+        Retries (with backoff) only happen before the first token is yielded;
+        a stream that breaks midway raises to the caller.
+        """
+        temperature = self.temperature if temperature is None else temperature
+        start = time.perf_counter_ns()
+        stream = await self._create_async(
+            messages=[{"role": "user", "content": prompt}], temperature=temperature, stream=True)
+        first, chunks = None, 0
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first is None:
+                    first = time.perf_counter_ns()
+                chunks += 1
+                yield delta
+        finally:
+            self._record(prompt, start, first, chunks)
+
+    async def get_response_async(self, prompt, temperature=None, use_cache=True):
+        """Streams the answer and returns it whole; shares the cache with get_response."""
+        temperature = self.temperature if temperature is None else temperature
+
+        async def load():
+            return "".join([delta async for delta in self.stream(prompt, temperature)]).strip()
+
+        if self.cache is None or not use_cache:
+            return await load()
+        return await self.cache.get_or_call_async(ResponseCache.key(self.model, prompt, temperature), load)
+
+    async def batch(self, prompts, concurrency=8, temperature=None, use_cache=True):
+        """
+        Run many prompts with at most `concurrency` in flight.
+
+        Returns:
+            list: Answers in prompt order; a prompt that failed holds its exception
+        """
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(prompt):
+            async with limit:
+                return await self.get_response_async(prompt, temperature, use_cache)
+
+        return await asyncio.gather(*(one(p) for p in prompts), return_exceptions=True)
+
+    def cache_stats(self):
+        return self.cache.describe() if self.cache else None
+
+    def latency_report(self):
+        """
+        Returns:
+            dict: Time-to-first-token and total call latency summaries (microseconds)
+        """
+        return {
+            "first_token": self.first_token.summary(),
+            "total": self.total.summary(),
+            "last_call": self.last_call
+        }
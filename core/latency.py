@@ -0,0 +1,101 @@
+"""
+Low-overhead latency recording.
+
+LatencyRecorder keeps the last `window` samples (nanoseconds) in a fixed ring
+buffer plus running count/min/max/total, so recording is a couple of integer
+operations; percentiles are only computed when summary() is called.
+
+LatencyHistogram trades exact percentiles for fixed buckets that aggregate and
+export (Prometheus) cleanly.
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+class LatencyRecorder:
+    def __init__(self, window: int = 4096):
+        self.window = window
+        self._samples = array('q', [0]) * window
+        self._next = 0
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        self._samples[self._next] = ns
+        self._next = (self._next + 1) % self.window
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def summary(self):
+        """
+        Returns:
+            dict: count, min/mean/max and p50/p90/p99 over the recent window, in microseconds
+        """
+        recent = sorted(self._samples[:min(self.count, self.window)])
+        if not recent:
+            return {"count": 0}
+
+        def pct(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] / 1e3
+
+        return {
+            "count": self.count,
+            "min_us": self.min_ns / 1e3,
+            "mean_us": self.total_ns / self.count / 1e3,
+            "max_us": self.max_ns / 1e3,
+            "p50_us": pct(0.50),
+            "p90_us": pct(0.90),
+            "p99_us": pct(0.99),
+        }
+
+
+# Upper bounds in microseconds; roughly 1-2.5-5 steps from 50us to 10s
+HISTOGRAM_BOUNDS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000,
+                       100000, 250000, 500000, 1000000, 2500000, 5000000, 10000000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram: observe() is a bisect and two additions, and
+    histograms from different processes can be summed bucket by bucket.
+    """
+    __slots__ = ("bounds", "counts", "count", "sum_ns")
+
+    def __init__(self, bounds=HISTOGRAM_BOUNDS_US):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, ns: int):
+        self.counts[bisect_left(self.bounds, ns / 1e3)] += 1
+        self.count += 1
+        self.sum_ns += ns
+
+    def quantile(self, q: float):
+        """Upper bound (us) of the bucket holding the q-th observation; None if empty."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_us": self.sum_ns / self.count / 1e3 if self.count else None,
+            "p50_us": self.quantile(0.50),
+            "p90_us": self.quantile(0.90),
+            "p99_us": self.quantile(0.99),
+            "buckets": {str(b): n for b, n in zip(self.bounds + ("+Inf",), self.counts) if n}
+        }
@@ -0,0 +1,212 @@
+"""
+LRU + TTL cache for GPTBrain responses.
+
+Keyed on (model, prompt, temperature). Concurrent misses for the same key share
+one upstream request; with a path set, live entries are written to a JSON file
+and reloaded on start so warm answers survive restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # leader's exception, re-raised in every waiter
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, path: str = None, clock=time.time):
+        """
+        Args:
+            max_entries (int): Least recently used entries are evicted beyond this
+            ttl (float): Seconds an answer stays fresh
+            path (str): Optional JSON file for persistence across restarts
+            clock: Wall clock (entries persisted to disk carry absolute expiry times)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _Flight
+        self._inflight_async = {}  # key -> asyncio.Future
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0, "errors": 0}
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(model, prompt, temperature):
+        raw = json.dumps([model, prompt, temperature], ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self._entries[key]
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        """Cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._lookup(key)
+            self.stats["hits" if entry else "misses"] += 1
+            return entry[1] if entry else None
+
+    def set(self, key, value, ttl: float = None):
+        with self._lock:
+            self._put(key, value, ttl)
+            snapshot = self._snapshot() if self.path else None
+        if snapshot is not None:
+            self._write(snapshot)
+
+    def _put(self, key, value, ttl=None):
+        self._entries[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_or_call(self, key, loader):
+        """
+        Cached value for key, otherwise loader() once for all concurrent callers.
+        A loader exception is raised in every caller waiting on it and nothing is cached.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        else:
+            self.set(key, flight.result)
+            return flight.result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    async def get_or_call_async(self, key, loader):
+        """Coroutine form of get_or_call; loader is a zero-argument coroutine function."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry[1]
+            pending = self._inflight_async.get(key)
+            if pending is not None:
+                self.stats["coalesced"] += 1
+            else:
+                self.stats["misses"] += 1
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = self._inflight_async[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await loader()
+            self.set(key, result)
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved for callers that never awaited
+            raise
+        finally:
+            del self._inflight_async[key]
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            snapshot = self._snapshot() if self.path else None
+        if snapshot is not None:
+            self._write(snapshot)
+
+    # --- persistence ---
+
+    def _snapshot(self):
+        now = self.clock()
+        return [[key, expires, value] for key, (expires, value) in self._entries.items() if expires > now]
+
+    def _write(self, entries):
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.error(f"[ResponseCache] ❌ Could not write {self.path}: {e}")
+
+    def load(self):
+        """Reload unexpired entries from path (oldest first, so LRU order is kept)."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"[ResponseCache] ❌ Could not read {self.path}: {e}")
+            return 0
+        now, loaded = self.clock(), 0
+        with self._lock:
+            for key, expires, value in entries:
+                if expires > now:
+                    self._entries[key] = (expires, value)
+                    self._entries.move_to_end(key)
+                    loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return loaded
+
+    def describe(self):
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            "module": "ResponseCache",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "path": self.path,
+            "stats": dict(self.stats),
+            "hit_rate": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        }
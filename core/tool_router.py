@@ -0,0 +1,242 @@
+"""
+Structured tool calling from GPTBrain to DhanClient.
+
+Tool schemas are generated from the REST modules listed by
+DhanClient.describe_all() (each module's TOOLS map) and their method
+signatures/docstrings, so one model turn can request several calls. Read
+tools in a turn run concurrently on the pooled async client and all results
+go back to the model in one batched turn. Write tools (orders, position
+conversion, kill switch) are refused unless writes are allowed or a confirm
+callback approves each call.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import re
+
+from brokers.dhan_http import DhanHTTP
+
+READ, WRITE = "read", "write"
+SEPARATOR = "__"  # tool name = <module>__<method>; dots are not allowed in tool names
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+_ARG_LINE = re.compile(r"^\s*(\w+)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$")
+
+
+def _parse_doc(func):
+    """Summary paragraph and per-argument descriptions from a Google-style docstring."""
+    doc = inspect.getdoc(func) or ""
+    summary, args, section = [], {}, None
+    for line in doc.splitlines():
+        header = line.strip().rstrip(":")
+        if header in ("Args", "Returns", "Example") and line.strip().endswith(":"):
+            section = header
+            continue
+        if section is None:
+            if line.strip():
+                summary.append(line.strip())
+            elif summary:
+                section = "body"
+        elif section == "Args":
+            match = _ARG_LINE.match(line)
+            if match and match.group(3):
+                args[match.group(1)] = match.group(3).strip()
+            elif match:
+                args[match.group(1)] = match.group(2) or ""
+    return " ".join(summary), args
+
+
+def tool_schema(name, func, access=READ):
+    """OpenAI function-tool schema for a bound broker method."""
+    summary, arg_docs = _parse_doc(func)
+    properties, required = {}, []
+    for param in inspect.signature(func).parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        spec = {}
+        kind = param.annotation if param.annotation is not param.empty else (
+            type(param.default) if param.default not in (param.empty, None) else None)
+        if kind in JSON_TYPES:
+            spec["type"] = JSON_TYPES[kind]
+        if arg_docs.get(param.name):
+            spec["description"] = arg_docs[param.name]
+        if param.default is param.empty:
+            required.append(param.name)
+        elif param.default is not None:
+            spec["default"] = param.default
+        properties[param.name] = spec
+    module, method = name.split(SEPARATOR)
+    description = summary or f"{module}.{method}"
+    if access == WRITE:
+        description += " (write: requires approval)"
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {"type": "object", "properties": properties, "required": required}
+        }
+    }
+
+
+def build_tools(dhan):
+    """
+    Returns:
+        dict: tool name -> (module attribute, method name, 'read'/'write', schema)
+    """
+    tools = {}
+    for module, info in dhan.describe_all().items():
+        if not isinstance(info, dict) or not info.get("tools"):
+            continue
+        for method, access in info["tools"].items():
+            name = f"{module}{SEPARATOR}{method}"
+            func = getattr(getattr(dhan, module), method)
+            tools[name] = (module, method, access, tool_schema(name, func, access))
+    return tools
+
+
+class ToolRouter:
+    def __init__(self, brain, dhan, allow_writes: bool = False, confirm=None,
+                 max_turns: int = 4, max_parallel: int = 8, max_result_chars: int = 20000):
+        """
+        Args:
+            brain: GPTBrain (its complete() drives the tool-calling turns)
+            dhan: DhanClient; calls run on dhan.aio
+            allow_writes (bool): Run write tools without asking
+            confirm: Optional callable(tool_name, arguments) -> bool (or awaitable) that
+                approves individual write calls; without it writes are refused
+            max_result_chars (int): Tool results are truncated to this many characters
+        """
+        self.brain = brain
+        self.dhan = dhan
+        self.allow_writes = allow_writes
+        self.confirm = confirm
+        self.max_turns = max_turns
+        self.max_parallel = max_parallel
+        self.max_result_chars = max_result_chars
+        self.tools = build_tools(dhan)
+        self.schemas = [spec for _, _, _, spec in self.tools.values()]
+        self.stats = {"turns": 0, "reads": 0, "writes": 0, "blocked": 0, "errors": 0}
+
+    def system_prompt(self):
+        writes = sorted(name for name, (_, _, access, _) in self.tools.items() if access == WRITE)
+        return (
+            "You operate a Dhan trading account through the provided tools. "
+            "Request every independent tool call you need in the same turn; they run in parallel. "
+            f"Write tools need approval and may be refused: {', '.join(writes)}. "
+            "Tool results are Dhan envelopes with status, remarks and data."
+        )
+
+    async def run(self, prompt: str):
+        """
+        Answer a prompt, letting the model call broker tools for up to max_turns turns.
+
+        Returns:
+            dict: DhanHTTP-style envelope; data holds the answer, every call made and the turn count
+        """
+        messages = [{"role": "system", "content": self.system_prompt()},
+                    {"role": "user", "content": prompt}]
+        calls = []
+        for turn in range(1, self.max_turns + 1):
+            self.stats["turns"] += 1
+            message = await self.brain.complete(messages, tools=self.schemas)
+            tool_calls = message.tool_calls or []
+            if not tool_calls:
+                return {
+                    "status": DhanHTTP.HttpResponseStatus.SUCCESS.value,
+                    "remarks": "",
+                    "data": {"answer": (message.content or "").strip(), "calls": calls, "turns": turn}
+                }
+            messages.append({
+                "role": "assistant",
+                "content": message.content,
+                "tool_calls": [{"id": c.id, "type": "function",
+                                "function": {"name": c.function.name, "arguments": c.function.arguments}}
+                               for c in tool_calls]
+            })
+            results = await self.execute(tool_calls)
+            for call, result in zip(tool_calls, results):
+                calls.append({"tool": call.function.name, "arguments": call.function.arguments,
+                              "status": result.get("status")})
+                messages.append({"role": "tool", "tool_call_id": call.id, "content": self._encode(result)})
+        logging.error(f"[ToolRouter] ❌ No answer after {self.max_turns} turns")
+        return {"status": "failure", "remarks": f"No answer after {self.max_turns} turns", "data": {"calls": calls}}
+
+    async def execute(self, tool_calls):
+        """
+        Run one turn's tool calls: reads concurrently (bounded by max_parallel),
+        then writes one at a time in the order requested.
+
+        Returns:
+            list: One envelope per tool call, in call order
+        """
+        results = [None] * len(tool_calls)
+        limit = asyncio.Semaphore(self.max_parallel)
+
+        async def read(i, call):
+            async with limit:
+                results[i] = await self._call(call)
+
+        reads = [(i, c) for i, c in enumerate(tool_calls) if self._access(c) != WRITE]
+        await asyncio.gather(*(read(i, c) for i, c in reads))
+        for i, call in enumerate(tool_calls):
+            if results[i] is None:
+                results[i] = await self._call(call)
+        return results
+
+    def _access(self, call):
+        tool = self.tools.get(call.function.name)
+        return tool[2] if tool else None
+
+    async def _call(self, call):
+        name = call.function.name
+        tool = self.tools.get(name)
+        if tool is None:
+            return DhanHTTP._failure(f"Unknown tool '{name}'")
+        module, method, access, _ = tool
+        try:
+            arguments = json.loads(call.function.arguments or "{}")
+        except ValueError as e:
+            return DhanHTTP._failure(f"Invalid arguments for '{name}': {e}")
+
+        if access == WRITE:
+            if not await self._approved(name, arguments):
+                self.stats["blocked"] += 1
+                logging.error(f"[ToolRouter] ❌ Write tool '{name}' blocked (not approved)")
+                return DhanHTTP._failure(f"Write tool '{name}' was not approved and did not run")
+            self.stats["writes"] += 1
+        else:
+            self.stats["reads"] += 1
+
+        try:
+            return await getattr(getattr(self.dhan.aio, module), method)(**arguments)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"[ToolRouter] ❌ {name} failed: {e}")
+            return DhanHTTP._failure(str(e))
+
+    async def _approved(self, name, arguments):
+        if self.allow_writes:
+            return True
+        if self.confirm is None:
+            return False
+        answer = self.confirm(name, arguments)
+        if inspect.isawaitable(answer):
+            answer = await answer
+        return bool(answer)
+
+    def _encode(self, result):
+        text = json.dumps(result, default=str, ensure_ascii=False)
+        if len(text) > self.max_result_chars:
+            text = text[:self.max_result_chars] + "...(truncated)"
+        return text
+
+    def describe(self):
+        return {
+            "module": "ToolRouter",
+            "tools": {name: access for name, (_, _, access, _) in self.tools.items()},
+            "allow_writes": self.allow_writes,
+            "confirm": self.confirm is not None,
+            "stats": dict(self.stats)
+        }
@@ -0,0 +1,3 @@
+from .market import SimMarket
+from .server import DhanSimulator, SimulatorClients
+from .process import SimulatorProcess
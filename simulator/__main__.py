@@ -0,0 +1,46 @@
+"""
+Run the Dhan simulator as a standalone process.
+
+    python -m simulator --latency 0.002 --error-rate 0.01
+
+Prints one JSON line with the client id, token and REST/feed/order URLs, then
+serves until interrupted or until stdin is closed.
+"""
+
+import argparse
+import json
+import sys
+
+from simulator.server import DhanSimulator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulator")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--fill-delay", type=float, default=0.0)
+    parser.add_argument("--feed-interval", type=float, default=0.0)
+    parser.add_argument("--feed-drop-after", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    sim = DhanSimulator(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        error_status=args.error_status, fill_delay=args.fill_delay,
+                        feed_interval=args.feed_interval, feed_drop_after=args.feed_drop_after,
+                        seed=args.seed).start()
+    print(json.dumps({
+        "client_id": sim.client_id, "access_token": sim.access_token,
+        "rest_url": sim.rest_url, "feed_url": sim.feed_url, "order_url": sim.order_url
+    }), flush=True)
+    try:
+        sys.stdin.read()  # parent closes the pipe to stop us
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Deterministic synthetic market used by DhanSimulator.
+
+Prices follow a seeded random walk per instrument. Candles, option chains and
+feed packets are generated from the same seed so repeated runs (and repeated
+benchmark rounds) see identical data.
+"""
+
+import math
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from brokers.candle_store import IST_OFFSET
+from brokers.feed_decoder import (
+    TICKER_STRUCT, DEPTH_STRUCT, QUOTE_STRUCT, OI_STRUCT, FULL_STRUCT, DEPTH_LEVEL_STRUCT
+)
+
+SESSION_OPEN = 9 * 3600 + 15 * 60  # 09:15 IST, seconds into the day
+SESSION_MINUTES = 375  # 09:15 - 15:30
+
+SEGMENT_NAMES = {
+    "IDX_I": 0, "NSE_EQ": 1, "NSE_FNO": 2, "NSE_CURRENCY": 3,
+    "BSE_EQ": 4, "MCX_COMM": 5, "BSE_CURRENCY": 7, "BSE_FNO": 8
+}
+
+# subscription request code -> response packet code
+RESPONSE_FOR_REQUEST = {15: 2, 17: 4, 19: 3, 21: 8}
+
+
+def _norm_cdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def _norm_pdf(x):
+    return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def session_days(first: date, last: date):
+    """Weekdays in first..last inclusive (exchange holidays are not modelled)."""
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)
+            if (first + timedelta(days=i)).weekday() < 5]
+
+
+class SimMarket:
+    def __init__(self, seed: int = 7):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.prices = {}
+        self.volumes = {}
+
+    def base_price(self, security_id) -> float:
+        sid = int(security_id) if str(security_id).isdigit() else sum(map(ord, str(security_id)))
+        return round(50.0 + (sid * 7919) % 5000 + (sid % 100) / 100.0, 2)
+
+    def price(self, security_id) -> float:
+        key = str(security_id)
+        if key not in self.prices:
+            self.prices[key] = self.base_price(key)
+        return self.prices[key]
+
+    def tick(self, security_id) -> float:
+        """Advance the instrument one step (+/- a few bps, rounded to 0.05)."""
+        key = str(security_id)
+        ltp = self.price(key) * (1.0 + self.rng.gauss(0.0, 0.0005))
+        self.prices[key] = max(round(round(ltp / 0.05) * 0.05, 2), 0.05)
+        self.volumes[key] = self.volumes.get(key, 0) + self.rng.randrange(1, 500)
+        return self.prices[key]
+
+    # --- feed packets ---
+
+    def packet(self, segment: int, security_id, request_code: int = 15, ltt: int = None) -> bytes:
+        sid = int(security_id)
+        ltp = self.tick(sid)
+        ltt = int(time.time()) if ltt is None else ltt
+        volume = self.volumes[str(sid)]
+        code = RESPONSE_FOR_REQUEST.get(request_code, 2)
+        if code == 2:
+            return TICKER_STRUCT.pack(2, TICKER_STRUCT.size, segment, sid, ltp, ltt)
+        depth = self._depth(ltp)
+        if code == 3:
+            return DEPTH_STRUCT.pack(3, DEPTH_STRUCT.size, segment, sid, ltp, depth)
+        day_open = self.base_price(sid)
+        high, low = max(day_open, ltp), min(day_open, ltp)
+        if code == 4:
+            return QUOTE_STRUCT.pack(4, QUOTE_STRUCT.size, segment, sid, ltp, 25, ltt, (high + low) / 2,
+                                     volume, 5000, 6000, day_open, day_open, high, low)
+        oi = 250000 + sid % 10000
+        return FULL_STRUCT.pack(8, FULL_STRUCT.size, segment, sid, ltp, 25, ltt, (high + low) / 2, volume,
+                                5000, 6000, oi, oi + 1000, oi - 1000, day_open, day_open, high, low, depth)
+
+    def oi_packet(self, segment: int, security_id) -> bytes:
+        sid = int(security_id)
+        return OI_STRUCT.pack(5, OI_STRUCT.size, segment, sid, 250000 + sid % 10000)
+
+    def _depth(self, ltp):
+        return b''.join(
+            DEPTH_LEVEL_STRUCT.pack(100 * (i + 1), 120 * (i + 1), i + 1, i + 2,
+                                    ltp - 0.05 * (i + 1), ltp + 0.05 * (i + 1))
+            for i in range(5)
+        )
+
+    # --- candles ---
+
+    def _day_rng(self, security_id, day: date, interval):
+        return random.Random(f"{self.seed}:{security_id}:{day.isoformat()}:{interval}")
+
+    def intraday(self, security_id, first: date, last: date, interval: int = 1):
+        """Dhan intraday payload (dict of lists) for weekdays first..last inclusive."""
+        out = {"open": [], "high": [], "low": [], "close": [], "volume": [], "timestamp": []}
+        for day in session_days(first, last):
+            rng = self._day_rng(security_id, day, interval)
+            midnight = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()) - IST_OFFSET
+            price = self.base_price(security_id) * (1.0 + rng.gauss(0.0, 0.01))
+            for minute in range(0, SESSION_MINUTES, interval):
+                open_ = high = low = price
+                for _ in range(interval):
+                    price *= 1.0 + rng.gauss(0.0, 0.0008)
+                    high, low = max(high, price), min(low, price)
+                out["timestamp"].append(midnight + SESSION_OPEN + minute * 60)
+                out["open"].append(round(open_, 2))
+                out["high"].append(round(high, 2))
+                out["low"].append(round(low, 2))
+                out["close"].append(round(price, 2))
+                out["volume"].append(rng.randrange(1000, 50000) * interval)
+        return out
+
+    def daily(self, security_id, first: date, last: date):
+        out = {"open": [], "high": [], "low": [], "close": [], "volume": [], "timestamp": []}
+        for day in session_days(first, last):
+            rng = self._day_rng(security_id, day, "D")
+            midnight = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()) - IST_OFFSET
+            open_ = self.base_price(security_id) * (1.0 + rng.gauss(0.0, 0.02))
+            close = open_ * (1.0 + rng.gauss(0.0, 0.01))
+            out["timestamp"].append(midnight)
+            out["open"].append(round(open_, 2))
+            out["high"].append(round(max(open_, close) * (1.0 + abs(rng.gauss(0.0, 0.004))), 2))
+            out["low"].append(round(min(open_, close) * (1.0 - abs(rng.gauss(0.0, 0.004))), 2))
+            out["close"].append(round(close, 2))
+            out["volume"].append(rng.randrange(100000, 5000000))
+        return out
+
+    # --- option chain ---
+
+    def expiries(self, underlying, count: int = 4, today: date = None):
+        today = today or date.today()
+        thursday = today + timedelta(days=(3 - today.weekday()) % 7)
+        return [(thursday + timedelta(weeks=i)).isoformat() for i in range(count)]
+
+    def option_chain(self, underlying, expiry: str, strikes: int = 41, step: float = None, rate: float = 0.065):
+        """Dhan /optionchain 'data' block: last_price plus per-strike ce/pe legs with Greeks."""
+        spot = self.price(underlying)
+        step = step or max(round(spot * 0.005 / 5) * 5, 0.5)
+        atm = round(spot / step) * step
+        days = max((date.fromisoformat(expiry) - date.today()).days, 0) + 0.5
+        t = days / 365.0
+        chain = {}
+        for i in range(-(strikes // 2), strikes // 2 + 1):
+            strike = round(atm + i * step, 2)
+            if strike <= 0:
+                continue
+            iv = 0.14 + 0.02 * abs(i) / max(strikes // 2, 1)  # mild smile
+            chain[f"{strike:.6f}"] = {
+                "ce": self._leg(spot, strike, t, rate, iv, True),
+                "pe": self._leg(spot, strike, t, rate, iv, False),
+            }
+        return {"last_price": spot, "oc": chain}
+
+    def _leg(self, spot, strike, t, rate, iv, call):
+        sqrt_t = math.sqrt(t)
+        d1 = (math.log(spot / strike) + (rate + 0.5 * iv * iv) * t) / (iv * sqrt_t)
+        d2 = d1 - iv * sqrt_t
+        discount = math.exp(-rate * t)
+        if call:
+            price = spot * _norm_cdf(d1) - strike * discount * _norm_cdf(d2)
+            delta = _norm_cdf(d1)
+            theta = (-spot * _norm_pdf(d1) * iv / (2 * sqrt_t) - rate * strike * discount * _norm_cdf(d2)) / 365
+        else:
+            price = strike * discount * _norm_cdf(-d2) - spot * _norm_cdf(-d1)
+            delta = _norm_cdf(d1) - 1.0
+            theta = (-spot * _norm_pdf(d1) * iv / (2 * sqrt_t) + rate * strike * discount * _norm_cdf(-d2)) / 365
+        price = max(round(price, 2), 0.05)
+        oi = self.rng.randrange(1000, 500000)
+        return {
+            "greeks": {
+                "delta": round(delta, 5),
+                "theta": round(theta, 5),
+                "gamma": round(_norm_pdf(d1) / (spot * iv * sqrt_t), 5),
+                "vega": round(spot * _norm_pdf(d1) * sqrt_t / 100, 5),
+            },
+            "implied_volatility": round(iv * 100, 2),
+            "last_price": price,
+            "oi": oi,
+            "previous_close_price": price,
+            "previous_oi": oi - self.rng.randrange(0, 1000),
+            "previous_volume": self.rng.randrange(1000, 100000),
+            "top_ask_price": round(price + 0.05, 2),
+            "top_ask_quantity": self.rng.randrange(25, 2500, 25),
+            "top_bid_price": max(round(price - 0.05, 2), 0.05),
+            "top_bid_quantity": self.rng.randrange(25, 2500, 25),
+            "volume": self.rng.randrange(1000, 1000000),
+        }
@@ -0,0 +1,53 @@
+"""
+DhanSimulator in a child process, so the server does not share the GIL with
+the client code being measured.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from simulator.server import SimulatorClients
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SimulatorProcess(SimulatorClients):
+    def __init__(self, **options):
+        """options: DhanSimulator keyword arguments exposed by `python -m simulator` (latency=..., error_rate=...)."""
+        self.options = options
+        self.proc = None
+        self.client_id = self.access_token = None
+        self.rest_url = self.feed_url = self.order_url = None
+
+    def start(self):
+        args = [sys.executable, "-m", "simulator"]
+        for name, value in self.options.items():
+            if value is not None:
+                args += [f"--{name.replace('_', '-')}", str(value)]
+        self.proc = subprocess.Popen(args, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        line = self.proc.stdout.readline()
+        if not line:
+            self.proc.wait(5)
+            raise RuntimeError(f"Simulator process exited with code {self.proc.returncode}.")
+        info = json.loads(line)
+        self.client_id, self.access_token = info["client_id"], info["access_token"]
+        self.rest_url, self.feed_url, self.order_url = info["rest_url"], info["feed_url"], info["order_url"]
+        return self
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.proc = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,703 @@
+"""
+Offline stand-in for the Dhan APIs.
+
+DhanSimulator serves, on localhost and from a background thread:
+  - the v2 REST endpoints used by Order, SuperOrder, Portfolio, Funds,
+    OptionChain, Historical and TraderControl (aiohttp.web)
+  - the binary MarketFeed websocket (v1 auth packet or v2 query auth)
+  - the JSON OrderUpdate websocket
+
+Latency (global, per route, jitter) and errors (random rate or queued with
+inject_error) can be injected so clients and benchmarks can be exercised
+without network access or credentials.
+
+Example:
+    with DhanSimulator(latency=0.002) as sim:
+        order = Order(sim.http())
+        order.place("1333", "NSE_EQ", "BUY", 10, "MARKET", "INTRADAY", 0)
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import random
+import struct
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import websockets
+from aiohttp import web
+
+from brokers.async_dhan_http import AsyncDhanHTTP
+from brokers.dhan_http import DhanHTTP
+from brokers.http_metrics import endpoint_label
+from brokers.market_feed import MarketFeed
+from brokers.order_update import OrderUpdate
+from simulator.market import SimMarket, SEGMENT_NAMES
+
+SUBSCRIBE_CODES = (15, 17, 19, 21)
+UNSUBSCRIBE_CODES = (16, 18, 20, 22)
+DISCONNECT_CODE = 12
+MARGIN_RATE = {"INTRADAY": 0.2, "MARGIN": 0.25, "CO": 0.1, "BO": 0.1}
+
+ERRORS = {
+    401: ("Invalid_Authentication", "DH-901", "Client ID or user generated access token is invalid or expired."),
+    400: ("Input_Exception", "DH-905", "Missing required fields, bad values for parameters etc."),
+    429: ("Rate_Limit", "DH-904", "Too many requests on server from single user breaching rate limits."),
+    500: ("Internal_Server_Error", "DH-908", "Server was not able to process API request."),
+    503: ("Network_Error", "DH-910", "Network error while processing the request."),
+}
+
+
+def _day(value) -> date:
+    return date.fromisoformat(str(value)[:10])
+
+
+class SimulatorClients:
+    """
+    Builds broker clients pointed at a simulator. Needs client_id, access_token,
+    rest_url, feed_url and order_url on the instance.
+    """
+
+    def context(self, instruments=None):
+        """Minimal context accepted by MarketFeed / OrderUpdate / ShardedMarketFeed."""
+        return SimpleNamespace(dhan_client_id=self.client_id, dhan_access_token=self.access_token,
+                               market_instruments=list(instruments or []))
+
+    def http(self, **kwargs):
+        dhan = DhanHTTP(self.client_id, self.access_token, **kwargs)
+        dhan.base_url = self.rest_url
+        return dhan
+
+    def async_http(self, **kwargs):
+        dhan = AsyncDhanHTTP(self.client_id, self.access_token, **kwargs)
+        dhan.base_url = self.rest_url
+        return dhan
+
+    def market_feed(self, instruments=None):
+        feed = MarketFeed(self.context(instruments))
+        feed.market_feed_wss = self.feed_url
+        return feed
+
+    def order_update(self, index=None):
+        updates = OrderUpdate(self.context(), index=index)
+        updates.order_feed_wss = self.order_url
+        return updates
+
+
+class DhanSimulator(SimulatorClients):
+    def __init__(self, client_id: str = "1000000001", access_token: str = "sim-access-token",
+                 latency: float = 0.0, jitter: float = 0.0, route_latency: dict = None,
+                 error_rate: float = 0.0, error_status: int = 500, fill_delay: float = 0.0,
+                 feed_interval: float = 0.0, feed_drop_after: int = None,
+                 freeze_quantity: int = 1800, balance: float = 1_000_000.0,
+                 seed: int = 7, host: str = "127.0.0.1"):
+        """
+        Args:
+            latency (float): Seconds added to every REST response
+            jitter (float): Extra uniform 0..jitter seconds per response
+            route_latency (dict): "POST /orders" or "/orders" -> seconds, overrides latency
+            error_rate (float): Probability that a REST call fails with error_status
+            fill_delay (float): Seconds between the PENDING and TRADED order updates
+            feed_interval (float): Pause between feed rounds (one packet per instrument); 0 streams flat out
+            feed_drop_after (int): Close each feed connection after this many packets
+        """
+        self.client_id = client_id
+        self.access_token = access_token
+        self.latency = latency
+        self.jitter = jitter
+        self.route_latency = dict(route_latency or {})
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fill_delay = fill_delay
+        self.feed_interval = feed_interval
+        self.feed_drop_after = feed_drop_after
+        self.freeze_quantity = freeze_quantity
+        self.host = host
+
+        self.market = SimMarket(seed)
+        self.rng = random.Random(seed)
+        self._injected = deque()  # (route or None, status)
+        self._order_ids = itertools.count(52000000001)
+
+        self.orders = {}
+        self.super_orders = {}
+        self.positions = {}
+        self.holdings = [
+            {"exchange": "NSE", "tradingSymbol": "HDFCBANK", "securityId": "1333", "isin": "INE040A01034",
+             "totalQty": 10, "dpQty": 10, "t1Qty": 0, "availableQty": 10, "collateralQty": 0,
+             "avgCostPrice": 1500.0},
+        ]
+        self.balance = balance
+        self.utilized = 0.0
+        self.position_margin = {}  # positions key -> margin blocked by its open quantity
+        self.kill_switch = False
+
+        self.stats = {"requests": 0, "errors_injected": 0, "feed_frames": 0,
+                      "feed_connections": 0, "order_connections": 0, "routes": {}}
+        self._order_clients = set()
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._runner = None
+        self._servers = []
+        self.rest_port = self.feed_port = self.order_port = None
+
+    # --- lifecycle ---
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="DhanSimulator", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(10):
+            raise RuntimeError("DhanSimulator failed to start.")
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._thread = None
+        self._ready.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+            self._ready.set()
+            self._loop.run_forever()
+        except Exception as e:
+            logging.error(f"[DhanSimulator] ❌ {e}")
+        finally:
+            self._loop.close()
+
+    async def _serve(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes(self._routes())
+        self._runner = web.AppRunner(app, access_log=None, shutdown_timeout=1.0)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.rest_port = self._runner.addresses[0][1]
+
+        # short close timeout: abandoned client sockets must not stall stop()
+        feed = await websockets.serve(self._feed_handler, self.host, 0, max_size=None, close_timeout=0.5)
+        orders = await websockets.serve(self._order_handler, self.host, 0, close_timeout=0.5)
+        self._servers = [feed, orders]
+        self.feed_port = feed.sockets[0].getsockname()[1]
+        self.order_port = orders.sockets[0].getsockname()[1]
+
+    async def _shutdown(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        await self._runner.cleanup()
+
+    @property
+    def rest_url(self):
+        return f"http://{self.host}:{self.rest_port}/v2"
+
+    @property
+    def feed_url(self):
+        return f"ws://{self.host}:{self.feed_port}"
+
+    @property
+    def order_url(self):
+        return f"ws://{self.host}:{self.order_port}"
+
+    # --- fault injection ---
+
+    def inject_error(self, status: int = 500, count: int = 1, route: str = None):
+        """Fail the next `count` REST calls (optionally only for route, e.g. "POST /orders")."""
+        for _ in range(count):
+            self._injected.append((route, status))
+
+    def _pick_error(self, method, label):
+        for i, (route, status) in enumerate(self._injected):
+            if route is None or route in (label, f"{method} {label}"):
+                del self._injected[i]
+                return status
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.error_status
+        return None
+
+    def _error(self, status, message=None):
+        error_type, code, default = ERRORS.get(status, ERRORS[500])
+        return web.json_response({"errorType": error_type, "errorCode": code,
+                                  "errorMessage": message or default}, status=status)
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        method = request.method
+        label = endpoint_label(request.path[3:] if request.path.startswith("/v2") else request.path)
+        route = f"{method} {label}"
+        self.stats["requests"] += 1
+        self.stats["routes"][route] = self.stats["routes"].get(route, 0) + 1
+
+        delay = self.route_latency.get(route, self.route_latency.get(label, self.latency))
+        if self.jitter:
+            delay += self.rng.uniform(0.0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if request.headers.get("access-token") != self.access_token:
+            return self._error(401)
+        status = self._pick_error(method, label)
+        if status is not None:
+            self.stats["errors_injected"] += 1
+            return self._error(status)
+        try:
+            return await handler(request)
+        except web.HTTPException:
+            raise
+        except (KeyError, TypeError, ValueError) as e:
+            return self._error(400, f"Input exception: {e}")
+
+    # --- REST ---
+
+    def _routes(self):
+        r = web
+        return [
+            r.get("/v2/orders", self._list_orders),
+            r.post("/v2/orders", self._place_order),
+            r.post("/v2/orders/slicing", self._place_slices),
+            r.get("/v2/orders/external/{correlation_id}", self._order_by_correlation),
+            r.get("/v2/orders/{order_id}", self._order_by_id),
+            r.put("/v2/orders/{order_id}", self._modify_order),
+            r.delete("/v2/orders/{order_id}", self._cancel_order),
+            r.get("/v2/super/orders", self._list_super_orders),
+            r.post("/v2/super/orders", self._place_super_order),
+            r.put("/v2/super/orders/{order_id}", self._modify_super_order),
+            r.delete("/v2/super/orders/{order_id}/{leg}", self._cancel_super_order),
+            r.get("/v2/holdings", self._holdings),
+            r.get("/v2/positions", self._positions),
+            r.post("/v2/positions/convert", self._convert_position),
+            r.get("/v2/fundlimit", self._fund_limits),
+            r.post("/v2/margincalculator", self._margin),
+            r.post("/v2/optionchain", self._option_chain),
+            r.post("/v2/optionchain/expirylist", self._expiry_list),
+            r.post("/v2/charts/intraday", self._intraday),
+            r.post("/v2/charts/historical", self._daily),
+            r.post("/v2/killswitch", self._kill_switch),
+        ]
+
+    @staticmethod
+    def _json(data, status=200):
+        return web.json_response(data, status=status)
+
+    # orders
+
+    def _new_order(self, body, quantity=None):
+        if self.kill_switch:
+            raise ValueError("Kill switch is active.")
+        quantity = int(body["quantity"] if quantity is None else quantity)
+        if quantity <= 0:
+            raise ValueError("quantity must be > 0")
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        order = {
+            "dhanClientId": self.client_id,
+            "orderId": str(next(self._order_ids)),
+            "correlationId": body.get("correlationId"),
+            "orderStatus": "PENDING",
+            "transactionType": body["transactionType"],
+            "exchangeSegment": body["exchangeSegment"],
+            "productType": body["productType"],
+            "orderType": body["orderType"],
+            "validity": body.get("validity", "DAY"),
+            "securityId": str(body["securityId"]),
+            "quantity": quantity,
+            "disclosedQuantity": int(body.get("disclosedQuantity") or 0),
+            "price": float(body.get("price") or 0.0),
+            "triggerPrice": float(body.get("triggerPrice") or 0.0),
+            "afterMarketOrder": bool(body.get("afterMarketOrder")),
+            "filledQty": 0,
+            "remainingQuantity": quantity,
+            "averageTradedPrice": 0.0,
+            "createTime": now,
+            "updateTime": now,
+        }
+        self.orders[order["orderId"]] = order
+        self._publish(order)
+        self._try_fill(order)
+        return order
+
+    def _marketable(self, order):
+        ltp = self.market.price(order["securityId"])
+        if order["orderType"] == "MARKET":
+            return ltp
+        if order["orderType"] == "LIMIT":
+            buy = order["transactionType"] == "BUY"
+            if (buy and order["price"] >= ltp) or (not buy and order["price"] <= ltp):
+                return ltp
+        return None  # SL / SL-M and resting limits stay pending
+
+    def _try_fill(self, order):
+        price = self._marketable(order)
+        if price is None:
+            return
+        if self.fill_delay:
+            self._loop.call_later(self.fill_delay, self._fill, order, price)
+        else:
+            self._fill(order, price)
+
+    def _fill(self, order, price):
+        if order["orderStatus"] != "PENDING":
+            return
+        qty = order["remainingQuantity"]
+        order.update(orderStatus="TRADED", filledQty=order["quantity"], remainingQuantity=0,
+                     averageTradedPrice=price, updateTime=time.strftime("%Y-%m-%d %H:%M:%S"))
+        self._book_trade(order, qty, price)
+        self._publish(order, qty, price)
+
+    def _book_trade(self, order, qty, price):
+        key = (order["securityId"], order["exchangeSegment"], order["productType"])
+        pos = self.positions.setdefault(key, {
+            "dhanClientId": self.client_id, "securityId": key[0], "exchangeSegment": key[1],
+            "productType": key[2], "buyQty": 0, "sellQty": 0, "dayBuyValue": 0.0, "daySellValue": 0.0,
+        })
+        net = pos["buyQty"] - pos["sellQty"]
+        if order["transactionType"] == "BUY":
+            pos["buyQty"] += qty
+            pos["dayBuyValue"] += qty * price
+            closing = min(qty, max(-net, 0))
+        else:
+            pos["sellQty"] += qty
+            pos["daySellValue"] += qty * price
+            closing = min(qty, max(net, 0))
+        # closing quantity releases its share of the blocked margin; the rest opens
+        margin = self.position_margin.get(key, 0.0)
+        released = margin * closing / abs(net) if closing else 0.0
+        blocked = (qty - closing) * price * MARGIN_RATE.get(order["productType"], 1.0)
+        self.position_margin[key] = margin - released + blocked
+        self.utilized += blocked - released
+
+    def _publish(self, order, traded_qty=0, traded_price=0.0):
+        if not self._order_clients:
+            return
+        message = json.dumps({"Type": "order_alert", "Data": {
+            "OrderNo": order["orderId"],
+            "CorrelationId": order.get("correlationId") or "",
+            "Status": order["orderStatus"].capitalize(),
+            "SecurityId": order["securityId"],
+            "Exchange": order["exchangeSegment"].split("_")[0],
+            "Segment": order["exchangeSegment"],
+            "Product": order["productType"],
+            "OrderType": order["orderType"],
+            "TxnType": "B" if order["transactionType"] == "BUY" else "S",
+            "Quantity": order["quantity"],
+            "TradedQty": order["filledQty"],
+            "RemainingQuantity": order["remainingQuantity"],
+            "Price": order["price"],
+            "TradedPrice": traded_price,
+            "AvgTradedPrice": order["averageTradedPrice"],
+            "LastUpdatedTime": order["updateTime"],
+        }})
+        websockets.broadcast(self._order_clients, message)
+
+    async def _list_orders(self, request):
+        return self._json(list(self.orders.values()))
+
+    async def _place_order(self, request):
+        order = self._new_order(await request.json())
+        return self._json({"orderId": order["orderId"], "orderStatus": order["orderStatus"]})
+
+    async def _place_slices(self, request):
+        body = await request.json()
+        remaining, placed = int(body["quantity"]), []
+        while remaining > 0:
+            qty = min(remaining, self.freeze_quantity)
+            order = self._new_order(body, qty)
+            placed.append({"orderId": order["orderId"], "orderStatus": order["orderStatus"]})
+            remaining -= qty
+        return self._json(placed)
+
+    async def _order_by_id(self, request):
+        order = self.orders.get(request.match_info["order_id"])
+        return self._json(order) if order else self._error(400, "Order not found.")
+
+    async def _order_by_correlation(self, request):
+        cid = request.match_info["correlation_id"]
+        for order in self.orders.values():
+            if order.get("correlationId") == cid:
+                return self._json(order)
+        return self._error(400, "Order not found.")
+
+    async def _modify_order(self, request):
+        order = self.orders.get(request.match_info["order_id"])
+        if order is None or order["orderStatus"] != "PENDING":
+            return self._error(400, "Order not found or not modifiable.")
+        body = await request.json()
+        for field in ("orderType", "quantity", "price", "triggerPrice", "disclosedQuantity", "validity"):
+            if body.get(field) is not None:
+                order[field] = body[field]
+        order["remainingQuantity"] = int(order["quantity"]) - order["filledQty"]
+        order["updateTime"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._publish(order)
+        self._try_fill(order)
+        return self._json({"orderId": order["orderId"], "orderStatus": order["orderStatus"]})
+
+    async def _cancel_order(self, request):
+        order = self.orders.get(request.match_info["order_id"])
+        if order is None or order["orderStatus"] != "PENDING":
+            return self._error(400, "Order not found or not cancellable.")
+        order["orderStatus"] = "CANCELLED"
+        self._publish(order)
+        return self._json({"orderId": order["orderId"], "orderStatus": "CANCELLED"})
+
+    # super orders
+
+    async def _list_super_orders(self, request):
+        return self._json(list(self.super_orders.values()))
+
+    async def _place_super_order(self, request):
+        body = await request.json()
+        entry = self._new_order({**body, "orderType": body["orderType"]})
+        legs = {
+            "ENTRY_LEG": entry["orderStatus"],
+            "TARGET_LEG": "PENDING", "STOP_LOSS_LEG": "PENDING",
+        }
+        self.super_orders[entry["orderId"]] = {
+            **entry, "targetPrice": float(body["targetPrice"]),
+            "stopLossPrice": float(body["stopLossPrice"]),
+            "trailingJump": float(body.get("trailingJump") or 0.0),
+            "legDetails": [{"legName": name, "orderStatus": status} for name, status in legs.items()],
+        }
+        return self._json({"orderId": entry["orderId"], "orderStatus": entry["orderStatus"]})
+
+    async def _modify_super_order(self, request):
+        order = self.super_orders.get(request.match_info["order_id"])
+        if order is None:
+            return self._error(400, "Super order not found.")
+        body = await request.json()
+        for field in ("orderType", "quantity", "price", "targetPrice", "stopLossPrice", "trailingJump"):
+            if body.get(field) not in (None, 0, 0.0):
+                order[field] = body[field]
+        return self._json({"orderId": order["orderId"], "orderStatus": order["orderStatus"]})
+
+    async def _cancel_super_order(self, request):
+        order = self.super_orders.get(request.match_info["order_id"])
+        leg = request.match_info["leg"]
+        if order is None:
+            return self._error(400, "Super order not found.")
+        for detail in order["legDetails"]:
+            if detail["legName"] == leg or leg == "ENTRY_LEG":
+                detail["orderStatus"] = "CANCELLED"
+        if leg == "ENTRY_LEG":
+            order["orderStatus"] = "CANCELLED"
+        return self._json({"orderId": order["orderId"], "orderStatus": "CANCELLED"})
+
+    # portfolio / funds
+
+    async def _holdings(self, request):
+        return self._json(self.holdings)
+
+    async def _positions(self, request):
+        out = []
+        for pos in self.positions.values():
+            net = pos["buyQty"] - pos["sellQty"]
+            buy_avg = pos["dayBuyValue"] / pos["buyQty"] if pos["buyQty"] else 0.0
+            sell_avg = pos["daySellValue"] / pos["sellQty"] if pos["sellQty"] else 0.0
+            ltp = self.market.price(pos["securityId"])
+            closed = min(pos["buyQty"], pos["sellQty"])
+            cost = buy_avg if net > 0 else sell_avg
+            out.append({
+                **pos,
+                "positionType": "LONG" if net > 0 else "SHORT" if net < 0 else "CLOSED",
+                "netQty": net,
+                "buyAvg": round(buy_avg, 2),
+                "sellAvg": round(sell_avg, 2),
+                "costPrice": round(cost, 2),
+                "realizedProfit": round(closed * (sell_avg - buy_avg), 2),
+                "unrealizedProfit": round(net * (ltp - cost), 2),
+            })
+        return self._json(out)
+
+    async def _convert_position(self, request):
+        body = await request.json()
+        key = (str(body["securityId"]), body["exchangeSegment"], body["fromProductType"])
+        pos = self.positions.pop(key, None)
+        if pos is None:
+            return self._error(400, "Position not found.")
+        pos["productType"] = body["toProductType"]
+        self.positions[(key[0], key[1], body["toProductType"])] = pos
+        self.position_margin[(key[0], key[1], body["toProductType"])] = self.position_margin.pop(key, 0.0)
+        return self._json({"status": "success"})
+
+    async def _fund_limits(self, request):
+        available = self.balance - self.utilized
+        return self._json({
+            "dhanClientId": self.client_id,
+            "availabelBalance": round(available, 2),
+            "sodLimit": self.balance,
+            "collateralAmount": 0.0,
+            "receiveableAmount": 0.0,
+            "utilizedAmount": round(self.utilized, 2),
+            "blockedPayoutAmount": 0.0,
+            "withdrawableBalance": round(available, 2),
+        })
+
+    async def _margin(self, request):
+        body = await request.json()
+        price = float(body.get("price") or 0.0) or self.market.price(body["securityId"])
+        value = int(body["quantity"]) * price
+        total = value * MARGIN_RATE.get(body["productType"], 1.0)
+        available = self.balance - self.utilized
+        return self._json({
+            "totalMargin": round(total, 2),
+            "spanMargin": round(total * 0.7, 2),
+            "exposureMargin": round(total * 0.3, 2),
+            "availableBalance": round(available, 2),
+            "variableMargin": 0.0,
+            "insufficientBalance": round(max(total - available, 0.0), 2),
+            "brokerage": 20.0,
+            "leverage": f"{value / total if total else 1:.2f}",
+        })
+
+    # market data
+
+    async def _option_chain(self, request):
+        body = await request.json()
+        return self._json({"data": self.market.option_chain(body["UnderlyingScrip"], body["Expiry"]),
+                           "status": "success"})
+
+    async def _expiry_list(self, request):
+        body = await request.json()
+        return self._json({"data": self.market.expiries(body["UnderlyingScrip"]), "status": "success"})
+
+    def _range(self, body):
+        first, end = _day(body["fromDate"]), _day(body["toDate"])
+        return first, max(first, end - timedelta(days=1))  # toDate is exclusive
+
+    async def _intraday(self, request):
+        body = await request.json()
+        first, last = self._range(body)
+        return self._json(self.market.intraday(body["securityId"], first, last, int(body.get("interval", 1))))
+
+    async def _daily(self, request):
+        body = await request.json()
+        first, last = self._range(body)
+        return self._json(self.market.daily(body["securityId"], first, last))
+
+    async def _kill_switch(self, request):
+        status = request.query.get("killSwitchStatus", "").upper()
+        if status not in ("ACTIVATE", "DEACTIVATE"):
+            return self._error(400, "killSwitchStatus must be ACTIVATE or DEACTIVATE.")
+        self.kill_switch = status == "ACTIVATE"
+        return self._json({"dhanClientId": self.client_id,
+                           "killSwitchStatus": f"Kill Switch has been successfully {status.lower()}d"})
+
+    # --- websockets ---
+
+    async def _order_handler(self, ws):
+        try:
+            login = json.loads(await ws.recv()).get("LoginReq", {})
+        except Exception:
+            return
+        if login.get("Token") != self.access_token:
+            await ws.close(code=4001, reason="Invalid token")
+            return
+        self.stats["order_connections"] += 1
+        self._order_clients.add(ws)
+        try:
+            await ws.wait_closed()
+        finally:
+            self._order_clients.discard(ws)
+
+    def _feed_authorized(self, ws, first_message):
+        path = ws.request.path if ws.request is not None else ""
+        if "token=" in path:
+            return f"token={self.access_token}" in path
+        if isinstance(first_message, bytes) and first_message[:1] == b"\x0b":
+            return first_message[83:583].rstrip(b"\0").decode(errors="ignore") == self.access_token
+        return False
+
+    def _apply_subscription(self, subscriptions, message):
+        """Update {(segment, security_id): request_code} from a v1 binary or v2 JSON message."""
+        if isinstance(message, bytes):
+            code = message[0]
+            if code == DISCONNECT_CODE:
+                return False
+            count = struct.unpack_from('<I', message, 83)[0]
+            items = [struct.unpack_from('<B20s', message, 87 + 21 * i) for i in range(count)]
+            items = [(ex, int(token.rstrip(b"\0"))) for ex, token in items]
+        else:
+            msg = json.loads(message)
+            code = int(msg.get("RequestCode", 0))
+            if code == DISCONNECT_CODE:
+                return False
+            items = [(SEGMENT_NAMES.get(i["ExchangeSegment"], 0), int(i["SecurityId"]))
+                     for i in msg.get("InstrumentList", [])]
+        for item in items:
+            if code in SUBSCRIBE_CODES:
+                subscriptions[item] = code
+            elif code in UNSUBSCRIBE_CODES:
+                subscriptions.pop(item, None)
+        return True
+
+    async def _feed_handler(self, ws):
+        first = None
+        if "token=" not in (ws.request.path if ws.request is not None else ""):
+            first = await ws.recv()
+        if not self._feed_authorized(ws, first):
+            await ws.close(code=4001, reason="Invalid token")
+            return
+        self.stats["feed_connections"] += 1
+        subscriptions = {}
+        changed = asyncio.Event()
+        sender = asyncio.ensure_future(self._stream(ws, subscriptions, changed))
+        try:
+            async for message in ws:
+                if not self._apply_subscription(subscriptions, message):
+                    break
+                changed.set()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            sender.cancel()
+            await ws.close()
+
+    async def _stream(self, ws, subscriptions, changed):
+        sent = 0
+        try:
+            while True:
+                if not subscriptions:
+                    changed.clear()
+                    await changed.wait()
+                ltt = int(time.time())
+                for (segment, sid), code in list(subscriptions.items()):
+                    await ws.send(self.market.packet(segment, sid, code, ltt))
+                    sent += 1
+                    self.stats["feed_frames"] += 1
+                    if self.feed_drop_after and sent >= self.feed_drop_after:
+                        await ws.close()
+                        return
+                await asyncio.sleep(self.feed_interval)
+        except websockets.ConnectionClosed:
+            pass
+
+    def describe(self):
+        return {
+            "module": "DhanSimulator",
+            "running": self._thread is not None,
+            "rest_url": self.rest_url if self.rest_port else None,
+            "feed_url": self.feed_url if self.feed_port else None,
+            "order_url": self.order_url if self.order_port else None,
+            "orders": len(self.orders),
+            "positions": len(self.positions),
+            "kill_switch": self.kill_switch,
+            "stats": dict(self.stats, routes=dict(self.stats["routes"]))
+        }
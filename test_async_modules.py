@@ -0,0 +1,82 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from brokers.async_modules import AsyncDhanModules, AsyncFunds, AsyncHistorical, AsyncOrder
+from brokers.candle_store import CandleStore
+from brokers.dhan_client import DhanClient
+from brokers.historical import Historical
+from simulator import DhanSimulator
+
+
+def test_async_http_and_awaitable_modules_run_concurrently():
+    async def scenario(sim):
+        async with sim.async_http() as http:
+            order = AsyncOrder(http)
+            placed = await order.place("1333", "NSE_EQ", "BUY", 10, "MARKET", "INTRADAY", 0, tag="aio-1")
+            start = time.perf_counter()
+            limits = await asyncio.gather(*(AsyncFunds(http).get_fund_limits() for _ in range(4)))
+            elapsed = time.perf_counter() - start
+            by_tag = await order.get_by_correlation("aio-1")
+            missing = await http.get("/nope")
+            return placed, limits, elapsed, by_tag, missing
+
+    with DhanSimulator(route_latency={"GET /fundlimit": 0.1}) as sim:
+        placed, limits, elapsed, by_tag, missing = asyncio.run(scenario(sim))
+    assert asyncio.iscoroutinefunction(AsyncOrder.place) and asyncio.iscoroutinefunction(AsyncOrder.place_slice)
+    assert asyncio.iscoroutinefunction(AsyncHistorical.intraday_columns)
+    assert not any(asyncio.iscoroutinefunction(m) for m in (AsyncFunds.describe, AsyncOrder.template,
+                                                             AsyncOrder.latency_report, AsyncHistorical.describe))
+    assert placed["status"] == "success" and by_tag["data"]["orderId"] == placed["data"]["orderId"]
+    assert [r["status"] for r in limits] == ["success"] * 4
+    assert elapsed < 0.3  # four 100 ms calls overlapped on the pool
+    assert missing["status"] == "failure"
+
+
+def test_client_gather_and_account_snapshot():
+    with DhanSimulator() as sim:
+        context = SimpleNamespace(get_async_dhan_http=sim.async_http)
+        dhan = DhanClient(context)
+        snapshot = dhan.run_async(dhan.fetch_account_snapshot())
+        assert isinstance(dhan.aio, AsyncDhanModules)
+
+        async def gathered():
+            try:
+                return await dhan.gather(dhan.aio.funds.get_fund_limits(), asyncio.sleep(0, result="x"),
+                                         asyncio.wait_for(asyncio.sleep(1), 0.01), return_exceptions=True)
+            finally:
+                await dhan.aio.close()
+
+        funds, plain, failed = asyncio.run(gathered())
+    assert set(snapshot) == {"funds", "holdings", "positions", "orders"}
+    assert all(envelope["status"] == "success" for envelope in snapshot.values())
+    assert snapshot["holdings"]["data"][0]["securityId"] == "1333"
+    assert funds["status"] == "success" and plain == "x" and isinstance(failed, asyncio.TimeoutError)
+    assert dhan.aio.http.session is None
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_async_historical_matches_sync(tmp_path, stored):
+    args = ("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04")
+
+    async def scenario(sim):
+        async with sim.async_http() as http:
+            historical = AsyncHistorical(http, CandleStore(str(tmp_path / "async")) if stored else None)
+            return (await historical.get_intraday(*args, 5), await historical.intraday_columns(*args, 1),
+                    await historical.resample(*args, 10), await historical.resample(*args, "2m"),
+                    await historical.intraday_columns(*args, 3))
+
+    with DhanSimulator() as sim:
+        raw, columns, bars, bad_interval, bad_minutes = asyncio.run(scenario(sim))
+        sync = Historical(sim.http(), CandleStore(str(tmp_path / "sync")) if stored else None)
+        expected_raw, expected_bars = sync.get_intraday(*args, 5), sync.resample(*args, 10)
+
+    candles = len(raw["data"]["timestamp"])
+    assert raw == expected_raw and candles and candles % 75 == 0
+    assert columns["data"]["close"].dtype == np.float64 and len(columns["data"]["timestamp"]) == 5 * candles
+    assert bars["status"] == "success" and len(bars["data"]["timestamp"]) == len(expected_bars["data"]["timestamp"])
+    assert all(np.array_equal(bars["data"][f], expected_bars["data"][f]) for f in expected_bars["data"])
+    assert bad_interval["status"] == bad_minutes["status"] == "failure"
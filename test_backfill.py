@@ -0,0 +1,76 @@
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+from brokers.backfill import Backfill, stitch, trading_windows
+
+
+class _Historical:
+    """Historical stand-in: one candle per requested window, failures on demand."""
+    store = None
+
+    def __init__(self, fail=(), delay=0.0):
+        self.fail = dict(fail)  # fromDate -> failures before success (a large number: always)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_intraday(self, security_id, exchange_segment, instrument, from_date, to_date, interval):
+        with self.lock:
+            self.calls.append((security_id, from_date))
+            remaining = self.fail.get(from_date, 0)
+            self.fail[from_date] = remaining - 1
+        if self.delay:
+            time.sleep(self.delay)
+        if remaining > 0:
+            return {"status": "failure", "remarks": "boom", "data": ""}
+        ts = int(time.mktime(date.fromisoformat(from_date).timetuple()))
+        return {"status": "success", "remarks": "", "data": {
+            "timestamp": [ts], "open": [1.0], "high": [1.0], "low": [1.0], "close": [1.0], "volume": [int(security_id)]}}
+
+
+def test_trading_windows_and_stitch():
+    assert trading_windows("2024-06-01", "2024-06-02") == []
+    assert trading_windows("2024-06-01", "2024-06-19", 5) == [
+        (date(2024, 6, 3), date(2024, 6, 7)), (date(2024, 6, 10), date(2024, 6, 14)),
+        (date(2024, 6, 17), date(2024, 6, 19))]
+
+    a = np.array([[3.0, 1.0], [30, 10], [30, 10], [30, 10], [30, 10], [3, 1], [0, 0]])
+    b = np.array([[2.0, 3.0], [20, 99], [20, 99], [20, 99], [20, 99], [2, 99], [0, 0]])
+    candles = stitch([a, np.zeros((7, 0)), b])
+    assert candles["timestamp"].tolist() == [1.0, 2.0, 3.0]
+    assert candles["open"].tolist() == [10, 20, 30]  # the first copy of a duplicate bar wins
+    assert stitch([])["timestamp"].shape == (0,)
+
+
+def test_failed_windows_retry_with_backoff_and_are_reported(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("brokers.backfill.time.sleep", sleeps.append)
+    historical = _Historical(fail={"2024-06-03": 1, "2024-06-10": 99})
+    backfill = Backfill(historical, max_workers=2, retries=2, retry_base=0.01, retry_cap=0.02)
+    progress = []
+    results = {r.security[0]: r for r in backfill.intraday(
+        [("1", "NSE_EQ", "EQUITY"), ("2", "NSE_EQ", "EQUITY")], "2024-06-03", "2024-06-14",
+        on_progress=lambda done, total: progress.append((done, total)))}
+
+    assert progress[-1] == (4, 4)
+    assert all(not r.ok and r.failed_windows == [(date(2024, 6, 10), date(2024, 6, 14))] for r in results.values())
+    assert len(results["1"]) == 1 and results["1"].candles["volume"].tolist() == [1]
+    # one security's 06-03 window retried once after a failure; 06-10 tried 1 + retries times per security
+    calls = [c for c in historical.calls if c[1] == "2024-06-10"]
+    assert len(calls) == 6 and len([c for c in historical.calls if c[1] == "2024-06-03"]) == 3
+    assert len(sleeps) == 5 and all(0 <= delay <= 0.02 for delay in sleeps)
+
+
+def test_closing_early_cancels_queued_windows():
+    historical = _Historical(delay=0.05)
+    backfill = Backfill(historical, max_workers=2)
+    securities = [(str(i), "NSE_EQ", "EQUITY") for i in range(20)]
+    start = time.monotonic()
+    for result in backfill.intraday(securities, "2024-06-03", "2024-06-28"):
+        break
+    elapsed = time.monotonic() - start
+    time.sleep(0.1)  # let the workers finish the windows already running
+    assert elapsed < 1.0 and len(historical.calls) < 20 * 4 // 2
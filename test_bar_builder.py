@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+
+from brokers.bar_builder import BarBuilder
+from brokers.feed_decoder import FeedDecoder, TICKER_STRUCT, QUOTE_STRUCT
+from brokers.historical import Historical
+from simulator import DhanSimulator
+
+OPEN = 1717386300  # 2024-06-03 09:15 IST
+
+
+def _ticks(count=3000, seed=3):
+    rng, volume, ticks = random.Random(seed), {}, []
+    for i in range(count):
+        sid, ltt = rng.choice((1333, 1334, 1335)), OPEN + i // 4
+        ltp = round(rng.uniform(90, 110), 2)
+        if rng.random() < 0.5:
+            ticks.append((sid, ltp, ltt, None))
+        else:
+            volume[sid] = volume.get(sid, 0) + rng.randrange(1, 50)
+            ticks.append((sid, ltp, ltt, volume[sid]))
+    return ticks
+
+
+def _frame(sid, ltp, ltt, volume):
+    if volume is None:
+        return TICKER_STRUCT.pack(2, 16, 1, sid, ltp, ltt)
+    return QUOTE_STRUCT.pack(4, 50, 1, sid, ltp, 1, ltt, ltp, volume, 0, 0, ltp, ltp, ltp, ltp)
+
+
+def _reference(ticks, minutes):
+    bars, last_volume = {}, {}
+    for sid, ltp, ltt, volume in ticks:
+        ltp = float(np.float32(ltp))  # LTP travels as float32
+        traded = volume - last_volume[sid] if volume is not None and sid in last_volume else 0
+        if volume is not None:
+            last_volume[sid] = volume
+        key = (OPEN + (ltt - OPEN) // (minutes * 60) * minutes * 60, sid)
+        bar = bars.setdefault(key, [ltp, ltp, ltp, ltp, 0])
+        bar[1], bar[2], bar[3], bar[4] = max(bar[1], ltp), min(bar[2], ltp), ltp, bar[4] + traded
+    return sorted((t, sid, *bar) for (t, sid), bar in bars.items())
+
+
+def test_streamed_bars_match_reference():
+    ticks = _ticks()
+    emitted = {1: [], 3: []}
+    builder = BarBuilder([(1, 1333), (1, 1334), (1, 1335)], intervals=(1, 3),
+                         on_bar=lambda interval, bars: emitted[interval].extend(bars.tolist()))
+    decoder = FeedDecoder()
+    for i in range(0, len(ticks), 97):  # batch edges fall inside bars
+        builder.apply(decoder.decode([_frame(*tick) for tick in ticks[i:i + 97]]))
+    builder.close_due(OPEN + 86400)
+
+    for minutes in (1, 3):
+        got = sorted((b[2], b[1], b[3], b[4], b[5], b[6], b[7]) for b in emitted[minutes])
+        assert got == _reference(ticks, minutes)
+    assert builder.stats["late"] == 0 and builder.forming(1, 1333) is None
+
+
+def test_seed_then_continue_live():
+    after_close = OPEN + 390 * 60  # 15:45 IST
+    with DhanSimulator() as sim:
+        historical = Historical(sim.http())
+        builder = BarBuilder([(1, 1333)], intervals=(5, "D"), clock=lambda: after_close)
+        report = builder.seed_from(historical, [(1, 1333, "EQUITY")], "2024-06-03", "2024-06-04")
+        minute = historical.intraday_columns("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04")["data"]
+    assert report == {(1, 1333): 375}
+    assert len(builder.bars(1, 1333, 5)) == 75 and len(builder.bars(1, 1333, "D")) == 0
+
+    # today's daily bar is still forming: a late print extends it, volume continues from the seeded total
+    day_volume = int(minute["volume"].sum())
+    builder.apply(FeedDecoder().decode([_frame(1333, 9999.0, after_close - 60, day_volume + 500)]))
+    daily = builder.forming(1, 1333, "D")
+    assert daily["open"] == minute["open"][0] and daily["high"] == 9999.0
+    assert daily["volume"] == day_volume + 500
+    assert builder.forming(1, 1333, 5)["volume"] == 500
@@ -0,0 +1,84 @@
+from datetime import date
+
+from brokers.candle_store import CANDLE_FIELDS, CandleKey, CandleStore
+from brokers.historical import Historical
+from simulator import DhanSimulator
+
+IST_0915 = 1717386300  # 2024-06-03 09:15 IST
+
+
+def test_store_missing_ranges_write_range_and_invalidate(tmp_path):
+    store = CandleStore(str(tmp_path))
+    key = CandleKey("1333", "nse_eq", "equity", 1)
+    first, last = date(2024, 6, 3), date(2024, 6, 9)
+    assert store.missing_ranges(key, first, last) == [(first, last)]
+
+    day = 86400
+    data = {"timestamp": [IST_0915, IST_0915 + 60, IST_0915 + 2 * day], "open": [1, 2, 3], "high": [1, 2, 3],
+            "low": [1, 2, 3], "close": [1, 2, 3], "volume": [10, 20, 30]}
+    store.write_range(key, date(2024, 6, 3), date(2024, 6, 5), data)
+    assert store.missing_ranges(key, first, last) == [(date(2024, 6, 6), last)]
+    assert store.has(key, date(2024, 6, 4))  # no candles that day: stored empty, not refetched
+
+    columns = store.read(key, first, last)
+    assert list(columns) == list(CANDLE_FIELDS)
+    assert columns["timestamp"].tolist() == data["timestamp"] and columns["volume"].tolist() == [10, 20, 30]
+    assert not columns["open_interest"].any()
+
+    assert store.invalidate(key, date(2024, 6, 3)) == 1
+    assert store.invalidate(day=date(2024, 6, 5)) == 1
+    assert store.missing_ranges(key, first, last) == [(date(2024, 6, 3), date(2024, 6, 3)),
+                                                      (date(2024, 6, 5), last)]
+    assert store.read(key, first, last)["timestamp"].tolist() == []
+
+
+def test_read_through_fetches_missing_trading_windows_once(tmp_path):
+    with DhanSimulator() as sim:
+        http = sim.http()
+        posts = []
+        post = http.post
+        http.post = lambda endpoint, payload=None: posts.append(payload) or post(endpoint, payload)
+        historical = Historical(http, CandleStore(str(tmp_path)))
+        raw = Historical(sim.http()).get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-01", "2024-07-01", 5)
+
+        cold = historical.get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-01", "2024-06-30", 5)
+        windows = [(p["fromDate"], p["toDate"]) for p in posts]
+        warm = historical.get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-01", "2024-06-30", 5)
+        calls_warm = len(posts)
+        historical.store.invalidate(day=date(2024, 6, 12))
+        historical.get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-10", "2024-06-14", 5)
+        weekend = historical.get_intraday("1333", "NSE_EQ", "EQUITY", "2024-07-06", "2024-07-07", 5)
+
+    # toDate is exclusive: five weekdays per call, weekends folded into a neighbouring call
+    assert windows == [("2024-06-01", "2024-06-08"), ("2024-06-08", "2024-06-15"),
+                       ("2024-06-15", "2024-06-22"), ("2024-06-22", "2024-07-01")]
+    assert cold == warm == raw  # same keys, int timestamps / volumes, no open_interest
+    assert isinstance(cold["data"]["timestamp"][0], int) and len(cold["data"]["timestamp"]) == 20 * 75
+    assert calls_warm == 4 and len(posts) == 5 and posts[-1]["fromDate"] == "2024-06-12"
+    assert weekend["data"]["timestamp"] == []  # no weekdays: stored empty without a call
+
+
+def test_todays_open_session_is_served_live_and_never_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr("brokers.candle_store.ist_today", lambda: date(2024, 6, 5))
+    store = CandleStore(str(tmp_path / "unit"))
+    key = CandleKey("1333", "NSE_EQ", "EQUITY", 1)
+    day = 86400
+    data = {"timestamp": [IST_0915, IST_0915 + 2 * day, IST_0915 + 2 * day + 60], "open": [1, 2, 3],
+            "high": [1, 2, 3], "low": [1, 2, 3], "close": [1, 2, 3], "volume": [10, 20, 30]}
+    live = store.write_range(key, date(2024, 6, 3), date(2024, 6, 5), data)
+    assert live[0].tolist() == data["timestamp"][1:] and not store.has(key, date(2024, 6, 5))
+    assert store.missing_ranges(key, date(2024, 6, 3), date(2024, 6, 5)) == [(date(2024, 6, 5), date(2024, 6, 5))]
+
+    with DhanSimulator() as sim:
+        http = sim.http()
+        posts = []
+        post = http.post
+        http.post = lambda endpoint, payload=None: posts.append(payload) or post(endpoint, payload)
+        historical = Historical(http, CandleStore(str(tmp_path / "read_through")))
+        raw = Historical(sim.http()).get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-06", 5)
+        first = historical.get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-05", 5)
+        again = historical.intraday_columns("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-05", 5)
+
+    assert first == raw and len(first["data"]["timestamp"]) == 3 * 75
+    assert again["data"]["timestamp"].tolist() == first["data"]["timestamp"]
+    assert [(p["fromDate"], p["toDate"]) for p in posts] == [("2024-06-03", "2024-06-06"), ("2024-06-05", "2024-06-06")]
@@ -0,0 +1,46 @@
+import asyncio
+
+from brokers.connection_pool import ConnectionPool
+from brokers.dhan_context import DhanContext
+from brokers.warmup import PreMarketWarmup, seconds_until
+from simulator import DhanSimulator
+
+
+def test_registry_shares_clients_per_account():
+    pool = ConnectionPool(pool_maxsize=4)
+    http = pool.get_http("1", "token-a")
+    assert pool.get_http("1", "token-a") is http
+    assert pool.get_http("1", "token-b") is not http
+    assert pool.get_async_http("1", "token-a").scheduler is http.scheduler
+    assert http.session.get_adapter("https://").poolmanager.connection_pool_kw["maxsize"] == 4
+    assert DhanContext("9", "t").get_dhan_http() is DhanContext("9", "t").get_dhan_http()
+    assert pool.describe()["stats"]["created"] == 3
+
+
+def test_warmup_leaves_hot_connections_and_live_streams():
+    async def scenario(sim, http, async_http):
+        feed = sim.market_feed([(1, 1333, 15)])
+        updates = sim.order_update()
+        warmup = PreMarketWarmup(http, async_http, feed, updates, timeout=5)
+        report = await warmup.run()
+        assert all(target["ok"] for target in report.values()), report
+        assert feed.ws is not None and updates.supervisor.state == "connected"
+        assert (await async_http.get("/fundlimit"))["status"] == "success"
+        await warmup.stop()
+        feed.ws.transport.abort()
+        await async_http.close()
+
+    with DhanSimulator() as sim:
+        pool = ConnectionPool(clock=lambda: 1e9)
+        http = pool.get_http(sim.client_id, sim.access_token, base_url=sim.rest_url)
+        async_http = pool.get_async_http(sim.client_id, sim.access_token, base_url=sim.rest_url)
+        asyncio.run(scenario(sim, http, async_http))
+        assert sim.stats["feed_connections"] == 1 and sim.stats["order_connections"] == 1
+
+        assert http.get("/fundlimit")["status"] == "success"
+        phases = http.metrics.as_dict()["GET /fundlimit"]["phases"]
+        assert "connect" not in phases  # the sync request reused the warmed connection
+        assert list(pool.health_check(max_idle=0)) == [f"{sim.rest_url}:{sim.client_id}"]
+
+    assert seconds_until("09:00", now=1718594100) == 900.0  # 2024-06-17 08:45 IST
+    assert seconds_until("09:00", now=1718594100 + 3600) == 0.0
@@ -0,0 +1,48 @@
+import numpy as np
+
+from brokers.decoding import DhanResponse
+from brokers.historical import Historical
+from simulator import DhanSimulator
+
+
+def test_lazy_response_matches_envelope():
+    body = b'{"open": [1.5, 2.0], "close": [1.75, 2.25], "timestamp": [1717386300, 1717386360], "note": "x"}'
+    response = DhanResponse(True, body, 200)
+    assert np.array_equal(response.array("close"), [1.75, 2.25])
+    assert response.array("missing") is None and not response._decoded  # arrays come from the raw bytes
+    assert response["status"] == "success" and response.get("remarks") == ""
+    assert response.get("data")["note"] == "x"
+    assert set(response.candles()) == {"open", "close", "timestamp"}
+    assert dict(response) == response.as_dict()
+
+    failed = DhanResponse(False, b'{"errorType": "Input_Exception", "errorMessage": "bad security"}', 400)
+    assert (failed["status"], failed["remarks"], failed["data"]) == ("failure", "bad security", None)
+    assert failed.candles() is None
+
+
+def test_malformed_bodies_fail_and_arrays_only_slice_flat_top_level_lists():
+    truncated = DhanResponse(True, b'{"close": [1.5, 2.0], "open": [1.', 200)
+    assert truncated["status"] == "failure" and truncated["remarks"] and truncated["data"] is None
+    assert truncated.array("close") is None and truncated.candles() is None
+
+    flat = DhanResponse(True, b'{"note": "\\"close\\": [9] }", "n": -1.5e3, "ok": true, "close": [1.0, 2.0]}', 200)
+    assert np.array_equal(flat.array("close"), [1.0, 2.0]) and flat.array("note") is None
+    assert flat.array("n") is None and not flat._decoded  # sliced: only top-level lists are seen
+
+    nested = DhanResponse(True, b'{"meta": {"close": [7.0]}, "grid": [[1, 2], [3, 4]], "close": [1.0, 2.0]}', 200)
+    assert np.array_equal(nested.array("close"), [1.0, 2.0]) and nested._decoded  # not sliceable: decoded whole
+    assert nested.array("grid", dtype="int64").tolist() == [[1, 2], [3, 4]] and nested.array("meta") is None
+
+    garbled = DhanResponse(True, b'{"close": [1.0, oops], "open": [2.0]}', 200)
+    assert garbled.array("close") is None and garbled["status"] == "failure"
+    trailing = DhanResponse(True, b'{"close": [1.0]} <html>', 200)
+    assert trailing.array("close") is None and trailing["status"] == "failure"
+
+
+def test_lazy_mode_on_the_wire():
+    with DhanSimulator() as sim:
+        historical = Historical(sim.http(decode="lazy"))
+        response = historical.get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04", 5)
+        assert isinstance(response, DhanResponse) and response["status"] == "success"
+        candles = response.candles(("close", "timestamp"))
+        assert candles["close"].dtype == np.float64 and len(candles["timestamp"]) == 75
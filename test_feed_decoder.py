@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+import pytest
+
+from brokers.feed_decoder import FeedDecoder, TICKER_STRUCT, OI_STRUCT, FULL_STRUCT, DEPTH_LEVEL_STRUCT
+from brokers.market_feed import MarketFeed
+
+
+def _frames():
+    depth = b''.join(DEPTH_LEVEL_STRUCT.pack(10 + i, 20 + i, 1, 2, 99.5, 100.5) for i in range(5))
+    return [
+        TICKER_STRUCT.pack(2, 16, 1, 1333, 1620.35, 1718006400),
+        OI_STRUCT.pack(5, 12, 2, 35001, 125000),
+        FULL_STRUCT.pack(8, 162, 2, 35001, 101.25, 50, 1718006401, 100.8, 9000, 400, 500,
+                         125000, 130000, 120000, 99.0, 98.0, 102.0, 97.5, depth),
+        b'\x06' + bytes(15),  # prev-close packet, not decoded
+        TICKER_STRUCT.pack(2, 16, 1, 1334, 410.0, 1718006402),
+    ]
+
+
+def test_columnar_decode_matches_dict_parsers():
+    feed = MarketFeed(SimpleNamespace(dhan_client_id="c", dhan_access_token="t"))
+    frames = _frames()
+    batch = FeedDecoder(capacity=1).decode(frames)
+
+    assert batch.count == 4 and batch.skipped == 1
+    assert batch["Ticker"]["security_id"].tolist() == [1333, 1334]
+    assert batch["Ticker"]["LTT"].tolist() == [1718006400, 1718006402]
+    assert batch.positions["Ticker"].tolist() == [0, 4]
+    assert batch["Full"]["depth"]["bid_qty"][0].tolist() == [10, 11, 12, 13, 14]
+    assert batch.as_dicts() == [d for d in map(feed._parse_response, frames) if d]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError, match="capacity"):
+        FeedDecoder(capacity=0)
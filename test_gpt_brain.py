@@ -0,0 +1,74 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from core.gpt_brain import GPTBrain, retry_after
+
+
+class _RateLimited(Exception):
+    response = SimpleNamespace(headers={"retry-after-ms": "50"})
+
+
+class _Stream:
+    def __init__(self, text):
+        self.parts = [text[i:i + 3] for i in range(0, len(text), 3)]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.parts:
+            raise StopAsyncIteration
+        await asyncio.sleep(0.005)
+        delta = SimpleNamespace(content=self.parts.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class _AsyncCompletions:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.active = self.peak = self.calls = 0
+
+    async def create(self, model, messages, temperature, timeout, stream):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise _RateLimited("429")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return _Stream(f"answer to {messages[0]['content']}")
+
+
+def _brain(failures=0, **kwargs):
+    gpt = GPTBrain(api_key="test", backoff_base=0.001, **kwargs)
+    completions = _AsyncCompletions(failures)
+    gpt._async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return gpt, completions
+
+
+def test_stream_retries_after_server_delay():
+    gpt, api = _brain(failures=1)
+    assert retry_after(_RateLimited()) == 0.05
+
+    async def run():
+        start = time.perf_counter()
+        parts = [delta async for delta in gpt.stream("funds")]
+        return parts, time.perf_counter() - start
+
+    parts, elapsed = asyncio.run(run())
+    assert "".join(parts) == "answer to funds" and len(parts) > 1
+    assert api.calls == 2 and elapsed >= 0.05  # Retry-After outranks the 1 ms backoff
+    report = gpt.latency_report()
+    assert report["first_token"]["count"] == 1
+    assert report["last_call"]["first_token_ms"] < report["last_call"]["total_ms"]
+
+
+def test_batch_limits_concurrency_and_shares_cache():
+    gpt, api = _brain(cache_ttl=30)
+    prompts = [f"q{i % 6}" for i in range(12)]
+    answers = asyncio.run(gpt.batch(prompts, concurrency=3))
+    assert answers == [f"answer to {p}" for p in prompts]
+    assert api.peak <= 3 and api.calls == 6  # repeats are coalesced or served from cache
+    assert gpt.get_response("q0") == "answer to q0"  # sync path hits the same cache
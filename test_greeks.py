@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from brokers.greeks import GreeksEngine, EXPIRY_CUTOFF, YEAR_SECONDS, chain_greeks, greeks, implied_vol, price
+from brokers.option_chain_cache import ChainSnapshot
+from brokers.snapshot_table import SnapshotTable
+from simulator.market import SimMarket
+
+
+def test_iv_round_trip_and_parity():
+    strikes = np.linspace(90, 110, 41)
+    sigma = np.linspace(0.1, 0.6, 41)
+    for is_call in (True, False):
+        target = price(100.0, strikes, 0.25, sigma, is_call, 0.06, 0.06)
+        assert np.allclose(implied_vol(target, 100.0, strikes, 0.25, is_call, 0.06, 0.06), sigma, atol=1e-6)
+    parity = price(100.0, strikes, 0.25, 0.3, True, 0.06, 0.06) - price(100.0, strikes, 0.25, 0.3, False, 0.06, 0.06)
+    assert np.allclose(parity, 100.0 - strikes * np.exp(-0.06 * 0.25))
+    # below intrinsic has no implied vol
+    assert np.isnan(implied_vol(np.array([1.0]), 100.0, 80.0, 0.25, True, 0.06, 0.06))[0]
+
+    g = greeks(100.0, 105.0, 0.25, 0.3, True, 0.06, 0.0)  # Black-76
+    bump = price(100.01, 105.0, 0.25, 0.3, True, 0.06, 0.0) - price(99.99, 105.0, 0.25, 0.3, True, 0.06, 0.0)
+    assert abs(g["delta"] - bump / 0.02) < 1e-5
+
+
+def test_engine_matches_simulator_chain():
+    market = SimMarket()
+    expiry = (date.today() + timedelta(days=10)).isoformat()
+    snapshot = ChainSnapshot.from_response("13:IDX_I:" + expiry, market.option_chain("13", expiry))
+    # the simulator prices with (days + 0.5) / 365 from midnight
+    t = ((date.fromisoformat(expiry) - date.today()).days + 0.5) / 365
+    now = (date.fromisoformat(expiry) - date(1970, 1, 1)).days * 86400 + EXPIRY_CUTOFF - t * YEAR_SECONDS
+
+    result = chain_greeks(snapshot, expiry, now=now)
+    n, atm = len(snapshot.strikes), len(snapshot.strikes) // 2
+    near = slice(atm - 3, atm + 4)
+    for field, tol in (("iv", 0.05), ("delta", 1e-3), ("vega", 1e-3), ("theta", 1e-3)):
+        assert np.allclose(getattr(result, field)[:n][near], snapshot.columns[field][near, 0], atol=tol), field
+        assert np.allclose(getattr(result, field)[n:][near], snapshot.columns[field][near, 1], atol=tol), field
+
+    # same contracts driven from a SnapshotTable as MarketFeed would keep it
+    contracts = [(2, 70000 + i, k, expiry, side) for i, (k, side) in enumerate(
+        [(k, "CE") for k in snapshot.strikes] + [(k, "PE") for k in snapshot.strikes])]
+    engine = GreeksEngine(contracts, (0, 13))
+    table = SnapshotTable(engine.instruments())
+    table.rows['LTP'][[table.row_of(2, c[1]) for c in contracts]] = result.price
+    table.rows['LTP'][table.row_of(0, 13)] = snapshot.underlying_ltp
+    live = engine.update(table, now=now)
+    assert np.allclose(live.iv, result.iv, equal_nan=True)
+    assert live.records(~np.isnan(live.iv))[0]["side"] == "CE"
+    assert engine.describe()["refreshes"] == 1
@@ -0,0 +1,34 @@
+from brokers.http_metrics import HttpMetrics, endpoint_label
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("/orders/112233") == "/orders/{id}"
+    assert endpoint_label("/orders/external/my-tag") == "/orders/external/{id}"
+    assert endpoint_label("/super/orders/52/ENTRY_LEG") == "/super/orders/{id}/ENTRY_LEG"
+    assert endpoint_label("/fundlimit?x=1") == "/fundlimit"
+
+
+def test_histograms_and_prometheus_export():
+    metrics = HttpMetrics()
+    calls = []
+    metrics.add_hooks(pre=lambda info: calls.append("pre"), post=lambda info, result, timings: calls.append("post"))
+
+    for ns in (300_000, 700_000, 40_000_000):
+        info = metrics.before("GET", "/orders/1")
+        timings = {"connect": None, "ttfb": ns, "total": ns + 1000, "parse": 20_000}
+        metrics.observe(info, 200, timings)
+        metrics.after(info, {}, timings)
+    metrics.error(metrics.before("POST", "/orders"), TimeoutError())
+
+    data = metrics.as_dict()
+    ttfb = data["GET /orders/{id}"]["phases"]["ttfb"]
+    assert ttfb["count"] == 3 and ttfb["p50_us"] == 1000 and ttfb["p99_us"] == 50000
+    assert "connect" not in data["GET /orders/{id}"]["phases"]
+    assert data["GET /orders/{id}"]["statuses"] == {"200": 3}
+    assert data["POST /orders"]["errors"] == {"TimeoutError": 1}
+    assert calls == ["pre", "post"] * 3 + ["pre"]
+
+    text = metrics.prometheus()
+    assert 'dhan_http_duration_seconds_bucket{method="GET",endpoint="/orders/{id}",phase="ttfb",le="+Inf"} 3' in text
+    assert 'dhan_http_responses_total{method="GET",endpoint="/orders/{id}",status="200"} 3' in text
+    assert 'dhan_http_errors_total{method="POST",endpoint="/orders",error="TimeoutError"} 1' in text
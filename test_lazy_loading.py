@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+from brokers.dhan_client import DhanClient
+from core.context import Context
+
+
+def test_import_brokers_loads_no_network_stack():
+    code = ("import sys, brokers\n"
+            "print(','.join(m for m in ('requests', 'aiohttp', 'websockets', 'numpy') if m in sys.modules))\n"
+            "from brokers import Funds\n"
+            "print(','.join(m for m in ('aiohttp', 'websockets') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.splitlines() == ["", ""]
+
+
+def test_client_builds_modules_on_first_access():
+    context = Context("key", "1000000001", "token")
+    dhan = DhanClient(context)
+    assert dhan.loaded() == []
+    assert dhan.funds.dhan is dhan.order.dhan is context.get_dhan_http()
+    assert dhan.order.index is dhan.order_update.index
+    assert dhan.loaded() == ["order", "funds", "order_update"]
+    assert dhan.describe_all()["market_feed"] is None
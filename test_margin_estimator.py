@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from brokers.funds import Funds
+from brokers.margin_estimator import FundsLedger, MarginEstimator
+from brokers.order import Order
+from brokers.order_index import OrderIndex
+from simulator import DhanSimulator
+
+
+def _leg(security_id, quantity, price, product="INTRADAY"):
+    return {"security_id": security_id, "exchange_segment": "NSE_EQ", "transaction_type": "BUY",
+            "quantity": quantity, "product_type": product, "price": price}
+
+
+def test_basket_is_fetched_concurrently_then_served_from_cache():
+    now = [0.0]
+    with DhanSimulator(route_latency={"POST /margincalculator": 0.05}) as sim:
+        funds = Funds(sim.http())
+        basket = [_leg(str(1000 + i), 10, 100.0 + i) for i in range(8)]
+        margins = funds.calculate_margins(basket)
+        assert [m["data"]["totalMargin"] for m in margins] == [round(10 * (100.0 + i) * 0.2, 2) for i in range(8)]
+
+        estimator = MarginEstimator(funds, ttl=5.0, clock=lambda: now[0])
+        first = estimator.check(basket + [_leg("1000", 11, 99.5)])  # same bands as leg 0: one request
+        routes = sim.stats["routes"]["POST /margincalculator"]
+        nearby = estimator.check([_leg("1000", 11, 99.8), _leg("1003", 10, 102.5)])
+        assert sim.stats["routes"]["POST /margincalculator"] == routes
+        now[0] = 6.0  # past the ttl
+        estimator.check([_leg("1000", 11, 99.8)])
+        bad = estimator.check([{"security_id": "1000"}])
+        after = sim.stats["routes"]["POST /margincalculator"]
+
+    assert first["ok"] and first["network_calls"] == 8 and first["available"] > first["required"]
+    assert first["legs"][-1]["data"]["totalMargin"] == pytest.approx(11 * 99.5 * 0.2, abs=0.01)
+    assert nearby["network_calls"] == 0 and {leg["source"] for leg in nearby["legs"]} == {"cache"}
+    assert nearby["required"] == pytest.approx(11 * 99.8 * 0.2 + 10 * 102.5 * 0.2, abs=0.02)
+    assert after == routes + 1 and not bad["ok"] and bad["errors"]
+    assert estimator.describe()["stats"]["hits"] == 2
+
+
+def test_ledger_nets_fills_per_position():
+    ledger = FundsLedger(funds=None)
+    ledger.available = 10000.0
+    ledger.rates[("1333", "INTRADAY")] = 0.2
+    ledger.on_fill("1333", "INTRADAY", 10, 100.0, "B")  # opens long 10: blocks 200
+    ledger.on_fill("1333", "INTRADAY", 4, 110.0, "S")  # closes 4 of 10: releases 80
+    assert ledger.positions == {("1333", "INTRADAY"): [6, pytest.approx(120.0)]}
+    ledger.on_fill("1333", "INTRADAY", 8, 105.0, "SELL")  # closes 6 (releases 120), opens short 2 (blocks 42)
+    assert ledger.positions == {("1333", "INTRADAY"): [-2, pytest.approx(42.0)]}
+    assert ledger.utilized == pytest.approx(42.0) and ledger.available == pytest.approx(10000.0 - 42.0)
+    ledger.on_fill("1333", "INTRADAY", 2, 90.0, "BUY")  # covers the short
+    ledger.on_fill("500", "CNC", 3, 10.0)  # no cached rate: full notional
+    assert ledger.positions == {("500", "CNC"): [3, 30.0]} and ledger.utilized == pytest.approx(30.0)
+
+
+def test_ledger_seeded_from_fund_limits_and_moved_by_fills():
+    async def scenario(sim):
+        index = OrderIndex()
+        updates = sim.order_update(index)
+        funds = Funds(sim.http())
+        ledger = FundsLedger(funds)
+        await asyncio.to_thread(ledger.refresh)
+        estimator = MarginEstimator(funds, ledger=ledger)
+        ledger.attach(index)
+        seeded = ledger.available
+        check = await asyncio.to_thread(estimator.check, [_leg("1333", 5, 1500.0)])
+        stream = asyncio.ensure_future(updates.supervised().run())
+        while updates.supervisor.state != "connected":
+            await asyncio.sleep(0.01)
+        order = Order(sim.http())
+        placed = await asyncio.to_thread(order.place, "1333", "NSE_EQ", "BUY", 5, "MARKET", "INTRADAY", 0)
+        filled = await index.wait_until_filled(placed["data"]["orderId"], timeout=5)
+        await asyncio.sleep(0.05)  # OrderIndex callbacks run on its dispatcher task
+        local = ledger.available
+        await asyncio.to_thread(ledger.refresh)
+        broker = ledger.available
+        sold = await asyncio.to_thread(order.place, "1333", "NSE_EQ", "SELL", 5, "MARKET", "INTRADAY", 0)
+        await index.wait_until_filled(sold["data"]["orderId"], timeout=5)
+        await asyncio.sleep(0.05)
+        closed = ledger.available
+        await asyncio.to_thread(ledger.refresh)
+        await updates.supervisor.stop()
+        stream.cancel()
+        return seeded, check, filled, local, broker, closed, ledger
+
+    with DhanSimulator(fill_delay=0.01) as sim:
+        seeded, check, filled, local, broker, closed, ledger = asyncio.run(asyncio.wait_for(scenario(sim), 10))
+    assert check["ok"] and check["network_calls"] == 1 and check["available"] == seeded
+    assert seeded - local == pytest.approx(filled.filled_qty * filled.avg_price * 0.2, abs=0.01)
+    assert broker == pytest.approx(local, abs=0.01)  # broker agrees with the local booking
+    assert closed == pytest.approx(seeded, abs=0.01)  # the closing sell released the margin
+    assert ledger.available == pytest.approx(closed, abs=0.01) and not ledger.positions
+    assert ledger.describe()["stats"] == {"refreshes": 3, "fills": 2, "errors": 0}
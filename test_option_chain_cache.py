@@ -0,0 +1,68 @@
+import threading
+import time
+
+from brokers.option_chain_cache import OptionChainCache
+
+
+def _leg(ltp, oi, iv):
+    return {"last_price": ltp, "oi": oi, "implied_volatility": iv, "greeks": {"delta": 0.5}}
+
+
+class _Chain:
+    def __init__(self):
+        self.calls = {"chain": 0, "expiry": 0}
+        self.oc = {
+            "100.000000": {"ce": _leg(5.0, 1000, 12.0), "pe": _leg(4.0, 900, 13.0)},
+            "110.000000": {"ce": _leg(1.0, 500, 14.0), "pe": _leg(9.0, 700, 15.0)},
+        }
+
+    def get_chain(self, under_security_id, under_exchange_segment, expiry):
+        self.calls["chain"] += 1
+        time.sleep(0.05)
+        return {"status": "success", "remarks": "",
+                "data": {"data": {"last_price": 104.0, "oc": {k: dict(v) for k, v in self.oc.items()}},
+                         "status": "success"}}
+
+    def get_expiry_dates(self, under_security_id, under_exchange_segment):
+        self.calls["expiry"] += 1
+        return {"status": "success", "remarks": "", "data": {"data": ["2025-06-26"], "status": "success"}}
+
+
+def test_ttl_coalescing_and_columnar_diff():
+    source, now = _Chain(), [0.0]
+    cache = OptionChainCache(source, chain_ttl=5, clock=lambda: now[0])
+
+    for _ in range(3):
+        assert cache.get_expiry_dates("13", "IDX_I")["data"]["data"] == ["2025-06-26"]
+    assert source.calls["expiry"] == 1
+
+    threads = [threading.Thread(target=cache.get_chain, args=("13", "IDX_I", "2025-06-26")) for _ in range(6)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert source.calls["chain"] == 1
+    assert cache.stats["coalesced"] == 5
+
+    snapshot, diff = cache.changes("13", "IDX_I", "2025-06-26")
+    assert list(snapshot.strikes) == [100.0, 110.0]
+    assert list(snapshot.field("oi", "PE")) == [900.0, 700.0]
+    assert snapshot.get(110, "CE")["iv"] == 14.0 and snapshot.atm_strike() == 100.0
+    assert len(diff) == 4  # first snapshot: every leg is new
+
+    source.oc["110.000000"] = {"ce": _leg(1.5, 500, 14.0), "pe": _leg(9.0, 700, 15.0)}
+    source.oc["120.000000"] = {"ce": _leg(0.5, 100, 16.0)}
+    now[0] = 6.0
+    snapshot, diff = cache.changes("13", "IDX_I", "2025-06-26")
+    assert source.calls["chain"] == 2
+    assert list(diff.changed_strikes()) == [110.0, 120.0]
+    assert [(r["strike"], r["side"], r["d_ltp"]) for r in diff.records()] == [(110.0, "CE", 0.5), (120.0, "CE", 0.0)]
+
+
+def test_explicit_max_age_zero_forces_a_refetch():
+    source, now = _Chain(), [0.0]
+    cache = OptionChainCache(source, chain_ttl=5, clock=lambda: now[0])
+    cache.get_chain("13", "IDX_I", "2025-06-26")
+    cache.get_chain("13", "IDX_I", "2025-06-26")
+    now[0] = 1.0
+    cache.get_chain("13", "IDX_I", "2025-06-26", max_age=0)
+    assert cache.get_chain("13", "IDX_I", "2025-06-26", max_age=0.5)["status"] == "success"
+    assert source.calls["chain"] == 2 and cache.stats["hits"] == 2
@@ -0,0 +1,51 @@
+import json
+
+from brokers.dhan_http import DhanHTTP
+from brokers.order import Order
+
+
+class _Response:
+    ok = True
+    status_code = 200
+    content = b'{"orderId": "1", "orderStatus": "TRANSIT"}'
+
+
+def _order():
+    dhan = DhanHTTP("cid", "token")
+    sent = []
+    dhan.session.send = lambda request, **kwargs: sent.append(request) or _Response()
+    return Order(dhan), sent
+
+
+def test_template_body_matches_place_payload():
+    order, sent = _order()
+    template = order.template("1333", "nse_eq", "buy", "limit", "intraday")
+    assert order.template("1333", "NSE_EQ", "BUY", "LIMIT", "INTRADAY") is template
+
+    result = template.send(25, 1612.35, tag="strat-1")
+    assert result["status"] == "success"
+    assert sent[0].url == DhanHTTP.API_BASE_URL + "/orders"
+    assert sent[0].headers["access-token"] == "token"
+    assert sent[0].headers["Content-Length"] == str(len(sent[0].body))
+
+    expected = order._place_payload("1333", "nse_eq", "buy", 25, "limit", "intraday", 1612.35, tag="strat-1")
+    assert json.loads(sent[0].body) == expected
+    assert json.loads(template.render(3, 99.5)) == order._place_payload(
+        "1333", "nse_eq", "buy", 3, "limit", "intraday", 99.5)
+    assert order.latency_report()["round_trip"]["count"] == 1
+
+
+def test_template_sends_are_timed_hooked_and_validated():
+    order, sent = _order()
+    seen = []
+    order.dhan.metrics.add_hooks(pre=lambda info: seen.append(info["payload"]),
+                                 post=lambda info, result, timings: seen.append(sorted(timings)))
+    template = order.template("1333", "NSE_EQ", "BUY", "LIMIT", "INTRADAY")
+    template.send(5, 1600.0)
+    for quantity, price in ((5, float("nan")), (5, float("inf")), (float("nan"), 1600.0), (0, 1600.0)):
+        rejected = template.send(quantity, price)
+        assert rejected["status"] == "failure" and rejected["data"] is None
+
+    assert len(sent) == 1 and seen == [sent[0].body, ["connect", "parse", "total", "ttfb"]]
+    stats = order.dhan.metrics.as_dict()["POST /orders"]
+    assert stats["statuses"] == {"200": 1} and stats["phases"]["ttfb"]["count"] == 1
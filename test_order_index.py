@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from brokers.order import Order
+from brokers.order_index import OrderIndex
+from simulator import DhanSimulator
+
+
+def test_updates_fills_and_fresh_lookups_with_http_fallback():
+    now = [0.0]
+    index = OrderIndex(max_age=5.0, clock=lambda: now[0])
+    index.apply({"OrderNo": "1", "CorrelationId": "tag-1", "Status": "Pending", "SecurityId": "1333",
+                 "TxnType": "B", "Quantity": 10})
+    index.apply({"OrderNo": "1", "Status": "Part_Traded", "TradedQty": 4, "TradedPrice": 100.0})
+    state = index.apply({"OrderNo": "1", "Status": "Part_Traded", "TradedQty": 10, "TradedPrice": 101.0,
+                         "AvgTradedPrice": 100.6})
+    assert state.fills == [(4, 100.0), (6, 101.0)] and state.remaining_qty == 0
+    assert state.avg_price == 100.6 and index.get_by_correlation("tag-1") is state
+    assert index.apply({"Status": "Traded"}) is None  # no order number
+
+    calls = []
+    http = SimpleNamespace(get=lambda endpoint: calls.append(endpoint) or {"status": "success", "data": {}})
+    order = Order(http, index=index)
+    assert order.get_by_id("1")["data"]["source"] == "order_update" and calls == []
+    now[0] = 6.0  # open order older than max_age: ask the API
+    order.get_by_id("1")
+    order.get_by_correlation("tag-1")
+    assert order.get_by_id("1", max_age=10)["data"]["filledQty"] == 10
+    index.apply({"OrderNo": "1", "Status": "Traded"})
+    now[0] = 100.0  # terminal states never go stale
+    assert order.get_by_id("1")["data"]["orderStatus"] == "TRADED"
+    assert calls == ["/orders/1", "/orders/external/tag-1"]
+
+
+def test_wait_for_cleans_up_timed_out_and_cancelled_waiters():
+    async def scenario():
+        index = OrderIndex()
+        with pytest.raises(asyncio.TimeoutError):
+            await index.wait_for("unknown", timeout=0.01)
+        cancelled = asyncio.ensure_future(index.wait_until_filled("2"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        leaked = index.describe()["open_waiters"]
+
+        waiting = asyncio.ensure_future(index.wait_for("3", ("TRADED", "REJECTED"), timeout=1))
+        await asyncio.sleep(0)
+        index.apply({"OrderNo": "3", "Status": "Pending"})
+        index.apply({"OrderNo": "3", "Status": "Rejected"})
+        settled = await waiting
+        already = await index.wait_for("3", ("REJECTED",), timeout=1)  # resolves immediately
+        return leaked, settled, already, index.describe()["open_waiters"]
+
+    leaked, settled, already, remaining = asyncio.run(scenario())
+    assert leaked == 0 and remaining == 0
+    assert settled.status == already.status == "REJECTED"
+
+
+def test_wait_until_filled_resolves_on_rejection_and_cancellation():
+    async def scenario():
+        index = OrderIndex()
+        rejected = asyncio.ensure_future(index.wait_until_filled("4"))
+        cancelled = asyncio.ensure_future(index.wait_until_filled("5", timeout=1))
+        await asyncio.sleep(0)
+        index.apply({"OrderNo": "4", "Status": "Rejected", "ReasonDescription": "RMS: margin exceeds"})
+        index.apply({"OrderNo": "5", "Status": "Part_Traded", "TradedQty": 2, "TradedPrice": 100.0, "Quantity": 5})
+        index.apply({"OrderNo": "5", "Status": "Cancelled"})
+        done = await asyncio.wait_for(asyncio.gather(rejected, cancelled), 1)
+        return done, index.describe()["open_waiters"]
+
+    (rejected, cancelled), remaining = asyncio.run(scenario())
+    assert rejected.status == "REJECTED" and rejected.filled_qty == 0
+    assert cancelled.status == "CANCELLED" and cancelled.filled_qty == 2 and remaining == 0
+
+
+def test_callbacks_follow_the_order_update_stream():
+    async def scenario(sim):
+        index = OrderIndex()
+        seen, async_seen = [], []
+
+        async def on_async(state):
+            async_seen.append(state.status)
+
+        index.subscribe(lambda state: seen.append((state.status, state.filled_qty)))
+        index.subscribe(on_async)
+        index.subscribe(lambda state: 1 / 0)  # a failing callback does not stop the others
+        updates = sim.order_update(index)
+        stream = asyncio.ensure_future(updates.supervised().run())
+        while updates.supervisor.state != "connected":
+            await asyncio.sleep(0.01)
+        placed = await asyncio.to_thread(Order(sim.http()).place, "1333", "NSE_EQ", "BUY", 5, "MARKET", "INTRADAY", 0)
+        filled = await index.wait_until_filled(placed["data"]["orderId"], timeout=5)
+        await asyncio.sleep(0.05)
+        await updates.supervisor.stop()
+        stream.cancel()
+        return filled, seen, async_seen
+
+    with DhanSimulator(fill_delay=0.01) as sim:
+        filled, seen, async_seen = asyncio.run(asyncio.wait_for(scenario(sim), 10))
+    assert filled.fills == [(5, filled.avg_price)]
+    assert seen == [("PENDING", 0), ("TRADED", 5)] and async_seen == ["PENDING", "TRADED"]
@@ -0,0 +1,93 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from brokers.feed_decoder import FeedDecoder, TICKER_STRUCT
+from brokers.order import Order
+from brokers.order_index import OrderIndex
+from brokers.pnl_engine import PnLEngine
+from brokers.portfolio import Portfolio
+from simulator import DhanSimulator
+
+
+def test_fills_and_incremental_repricing_match_full_recompute():
+    pnl = PnLEngine(underlyings={(2, 35001): "NIFTY", (2, 35002): "NIFTY"})
+    pnl.apply_fill("NSE_FNO", 35001, "MARGIN", "BUY", 100, 10.0)
+    pnl.apply_fill("NSE_FNO", 35001, "MARGIN", "BUY", 100, 20.0)
+    pnl.apply_fill("NSE_FNO", 35001, "MARGIN", "SELL", 250, 30.0)  # closes 200 at avg 15, flips 50 short at 30
+    assert pnl.position("NSE_FNO", 35001, "MARGIN") == pytest.approx(
+        {"qty": -50, "avg": 30.0, "ltp": 10.0, "unrealized": 1000.0, "realized": 3000.0, "net_exposure": -500.0})
+
+    rng = random.Random(5)
+    for sid in range(1000, 1100):
+        pnl.apply_fill("NSE_EQ", sid, "CNC", rng.choice("BS"), rng.randrange(1, 50), rng.uniform(50, 150))
+    pnl.apply_fill("NSE_FNO", 35002, "MARGIN", "S", 75, 40.0)
+    decoder = FeedDecoder()
+    for _ in range(20):
+        frames = [TICKER_STRUCT.pack(2, 16, 1, rng.randrange(990, 1110), rng.uniform(50, 150), 1718000000)
+                  for _ in range(64)] + [TICKER_STRUCT.pack(2, 16, 2, 35002, rng.uniform(30, 50), 1718000000)]
+        pnl.update_prices(decoder.decode(frames))
+
+    totals, nifty = pnl.totals(), pnl.underlying("NIFTY")
+    pnl._recompute()
+    assert totals == pytest.approx(pnl.totals()) and nifty == pytest.approx(pnl.underlying("NIFTY"))
+    assert nifty["net_exposure"] == pytest.approx(-50 * 10.0 - 75 * pnl.position("NSE_FNO", 35002, "MARGIN")["ltp"])
+
+
+def test_live_fills_and_reconcile_against_rest():
+    async def scenario(sim):
+        index = OrderIndex()
+        updates = sim.order_update(index)
+        pnl = PnLEngine.from_portfolio(Portfolio(sim.http())).attach(index)
+        loaded = pnl.totals()
+        stream = asyncio.ensure_future(updates.supervised().run())
+        while updates.supervisor.state != "connected":
+            await asyncio.sleep(0.01)
+        placed = await asyncio.to_thread(Order(sim.http()).place, "1333", "NSE_EQ", "BUY", 5, "MARKET", "INTRADAY", 0)
+        filled = await index.wait_until_filled(placed["data"]["orderId"], timeout=5)
+        await asyncio.sleep(0.05)  # OrderIndex callbacks run on its dispatcher task
+        booked = pnl.position("NSE_EQ", 1333, "INTRADAY")
+        clean = await asyncio.to_thread(pnl.reconcile, Portfolio(sim.http()))
+        pnl.qty[pnl._row[(1, 1333, "INTRADAY")]] = 7  # simulate a missed fill
+        drifted = await asyncio.to_thread(pnl.reconcile, Portfolio(sim.http()))
+        await updates.supervisor.stop()
+        stream.cancel()
+        return loaded, filled, booked, clean, drifted, pnl
+
+    with DhanSimulator(fill_delay=0.01) as sim:
+        loaded, filled, booked, clean, drifted, pnl = asyncio.run(asyncio.wait_for(scenario(sim), 10))
+    assert loaded["gross_exposure"] == 10 * 1500.0  # the simulator's one holding, marked at cost
+    assert booked["qty"] == 5 and booked["avg"] == pytest.approx(filled.avg_price)
+    assert clean == {"ok": True, "drift": []}
+    assert drifted["drift"] == [{"key": (1, 1333, "INTRADAY"), "local_qty": 7, "broker_qty": 5}]
+    assert pnl.position("NSE_EQ", 1333, "INTRADAY")["qty"] == 5
+
+
+def test_reconcile_keeps_fills_booked_while_fetching():
+    pnl = PnLEngine()
+    pnl.apply_fill("NSE_EQ", 1333, "INTRADAY", "BUY", 10, 100.0)
+    pnl.apply_fill("NSE_EQ", 500, "CNC", "BUY", 5, 50.0)
+    racing = [(5, 106.0)]
+
+    def positions():  # the broker snapshot is taken before the next fill reaches the engine
+        snapshot = {"status": "success", "data": [
+            {"exchangeSegment": "NSE_EQ", "securityId": "1333", "productType": "INTRADAY", "netQty": 10,
+             "costPrice": 100.0, "unrealizedProfit": 0.0, "realizedProfit": 0.0},
+            {"exchangeSegment": "NSE_EQ", "securityId": "500", "productType": "CNC", "netQty": 7,
+             "costPrice": 50.0, "unrealizedProfit": 0.0, "realizedProfit": 0.0}]}
+        for qty, price in racing:
+            pnl.apply_fill("NSE_EQ", 1333, "INTRADAY", "BUY", qty, price)
+        racing.clear()
+        return snapshot
+
+    portfolio = SimpleNamespace(get_positions=positions, get_holdings=lambda: {"status": "success", "data": []})
+    report = pnl.reconcile(portfolio)
+    assert pnl.position("NSE_EQ", 1333, "INTRADAY") == pytest.approx(
+        {"qty": 15, "avg": 102.0, "ltp": 100.0, "unrealized": -30.0, "realized": 0.0, "net_exposure": 1500.0})
+    assert pnl.position("NSE_EQ", 500, "CNC")["qty"] == 7  # untouched rows adopt the broker's
+    assert report["drift"] == [{"key": (1, 500, "CNC"), "local_qty": 5, "broker_qty": 7}]
+    # the next reconcile compares the row again (here the broker never saw the fill)
+    assert pnl._touched == [] and pnl.reconcile(portfolio)["drift"] == [
+        {"key": (1, 1333, "INTRADAY"), "local_qty": 15, "broker_qty": 10}]
@@ -0,0 +1,48 @@
+from brokers.rate_limiter import RequestScheduler, Priority, classify, ORDER, DATA
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_spaces_requests_with_fake_clock():
+    clock = FakeClock()
+    scheduler = RequestScheduler(limits={DATA: [(2, 1)]}, clock=clock, sleep=clock.sleep)
+
+    waits = [scheduler.acquire("POST", "/charts/intraday") for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 0.5]
+    assert clock.now == 1.0
+    stats = scheduler.metrics()[DATA]
+    assert stats["granted"] == 4 and stats["wait_max"] == 0.5 and stats["queue_depth"] == 0
+
+
+def test_critical_lane_overtakes_queued_bulk_requests():
+    clock = FakeClock()
+    scheduler = RequestScheduler(limits={ORDER: [(1, 1)]}, clock=clock, sleep=clock.sleep)
+    scheduler.acquire("POST", "/orders")  # drain the only token
+
+    bulk = [scheduler.submit(ORDER, Priority.BULK) for _ in range(3)]
+    place = scheduler.submit(*classify("PUT", "/orders/123"))
+    assert scheduler.metrics()[ORDER]["queue_depth_by_priority"] == {
+        "CRITICAL": 1, "HIGH": 0, "NORMAL": 0, "BULK": 3
+    }
+
+    clock.sleep(1.0)
+    assert scheduler.poll(bulk[0]) > 0
+    assert scheduler.poll(place) == 0
+    clock.sleep(1.0)
+    assert scheduler.poll(bulk[0]) == 0
+    assert scheduler.metrics()[ORDER]["queue_depth"] == 2
+
+
+def test_unlimited_class_is_granted_immediately():
+    scheduler = RequestScheduler(limits={})
+    assert scheduler.acquire("GET", "/fundlimit") == 0.0
@@ -0,0 +1,35 @@
+import numpy as np
+
+from brokers.candle_store import CANDLE_FIELDS
+from brokers.historical import Historical
+from brokers.resample import resample
+from simulator import DhanSimulator
+
+
+def test_resample_matches_native_intervals():
+    with DhanSimulator() as sim:
+        historical = Historical(sim.http())
+        minute = historical.intraday_columns("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04", 1)["data"]
+        assert minute["close"].dtype == np.float64 and len(minute["timestamp"]) == 375  # toDate is exclusive: one session
+
+        five = historical.resample("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04", 5)["data"]
+        assert len(five["timestamp"]) == 75 and five["timestamp"][0] == minute["timestamp"][0]
+        assert five["open"][0] == minute["open"][0] and five["close"][0] == minute["close"][4]
+        assert five["high"][0] == minute["high"][:5].max() and five["low"][0] == minute["low"][:5].min()
+        assert five["volume"].sum() == minute["volume"].sum()
+
+        ten = historical.resample("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04", 10)["data"]
+        assert len(ten["timestamp"]) == 38  # 37 full bars + the 15:25 bar
+        assert historical.resample("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04", 0)["status"] == "failure"
+
+
+def test_daily_bars_are_session_aligned():
+    day = 1717353000  # 2024-06-03 00:00 IST
+    minutes = np.arange(375) * 60 + day + 9 * 3600 + 15 * 60
+    columns = np.zeros((len(CANDLE_FIELDS), 375 * 2))
+    columns[0] = np.r_[minutes, minutes + 86400]
+    columns[1:5] = np.arange(750)
+    columns[5] = 1.0
+    bars = resample(columns[:, ::-1], "D")  # unsorted input is sorted first
+    assert bars[0].tolist() == [day, day + 86400]
+    assert bars[1].tolist() == [0, 375] and bars[4].tolist() == [374, 749] and bars[5].tolist() == [375, 375]
@@ -0,0 +1,64 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from core.gpt_brain import GPTBrain
+from core.response_cache import ResponseCache
+
+
+class _Completions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, temperature, timeout):
+        self.calls += 1
+        time.sleep(0.05)
+        message = SimpleNamespace(content=f" {messages[0]['content']} @ {temperature} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _brain(**kwargs):
+    gpt = GPTBrain(api_key="test", **kwargs)
+    completions = _Completions()
+    gpt.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return gpt, completions
+
+
+def test_cache_is_opt_in():
+    gpt, api = _brain()
+    gpt.get_response("funds?")
+    gpt.get_response("funds?")
+    assert api.calls == 2 and gpt.cache_stats() is None
+
+
+def test_cache_dedup_and_stats():
+    gpt, api = _brain(cache_ttl=30)
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(gpt.get_response("funds?"))) for _ in range(5)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert answers == ["funds? @ 0.3"] * 5 and api.calls == 1
+
+    assert gpt.get_response("funds?") == "funds? @ 0.3" and api.calls == 1
+    gpt.get_response("funds?", temperature=0.0)  # different key
+    gpt.get_response("funds?", use_cache=False)
+    assert api.calls == 3
+    stats = gpt.cache_stats()["stats"]
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 2, 4)
+
+
+def test_ttl_lru_and_persistence(tmp_path):
+    now = [1000.0]
+    path = str(tmp_path / "gpt_cache.json")
+    cache = ResponseCache(max_entries=2, ttl=10, path=path, clock=lambda: now[0])
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")  # evicts b, the least recently used
+    assert cache.get("b") is None and cache.get("a") == "1"
+
+    restored = ResponseCache(max_entries=2, ttl=10, path=path, clock=lambda: now[0])
+    assert restored.get("a") == "1" and restored.get("c") == "3"
+    now[0] += 11
+    assert restored.get("a") is None and restored.stats["expired"] == 1
+    assert len(ResponseCache(path=path, clock=lambda: now[0])) == 0
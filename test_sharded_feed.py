@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from brokers.sharded_feed import ShardedMarketFeed, plan_shards
+from simulator import DhanSimulator
+
+
+def test_plan_shards_respects_connection_limits():
+    shards = plan_shards(range(12), shards=3, max_per_connection=5)
+    assert shards == [[0, 3, 6, 9], [1, 4, 7, 10], [2, 5, 8, 11]]
+    assert len(plan_shards(range(11), max_per_connection=5)) == 3
+    with pytest.raises(ValueError, match="limit is 5"):
+        plan_shards(range(30), max_per_connection=5)
+
+
+def test_shards_deliver_the_rows_each_worker_decoded():
+    instruments = [(1, sid, 15) for sid in range(1000, 1014)]
+    with DhanSimulator() as sim:  # streams every subscribed instrument, in order, flat out
+        feed = ShardedMarketFeed(sim.context(instruments), shards=2, max_frames=5, max_wait=0.001)
+        feed.url = sim.feed_url
+        streams = {0: [], 1: []}
+        feed.start()
+        try:
+            while min(len(s) for s in streams.values()) < 2000:
+                item = feed.get_batch(timeout=10)
+                assert item is not None, feed.metrics()
+                shard_id, batch = item
+                ticks = batch["Ticker"]
+                order = np.argsort(batch.positions["Ticker"])
+                streams[shard_id].extend(ticks["security_id"][order].tolist())
+        finally:
+            feed.stop()
+
+    # each connection receives its instruments round-robin; batches of 5 over 7
+    # instruments rotate, so rows from a reused decoder buffer would break the cycle
+    for shard_id, sids in streams.items():
+        cycle = [sid for _, sid, _ in feed.shards[shard_id]]
+        assert sids == (cycle * (len(sids) // len(cycle) + 1))[:len(sids)], shard_id
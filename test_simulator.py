@@ -0,0 +1,56 @@
+import asyncio
+
+from brokers.funds import Funds
+from brokers.historical import Historical
+from brokers.order import Order
+from brokers.order_index import OrderIndex
+from simulator import DhanSimulator
+
+
+def test_rest_endpoints_and_error_injection():
+    with DhanSimulator() as sim:
+        http = sim.http()
+        order = Order(http)
+        placed = order.place("1333", "NSE_EQ", "BUY", 10, "MARKET", "INTRADAY", 0, tag="sim-1")
+        assert placed["data"]["orderStatus"] == "TRADED"
+        assert order.get_by_correlation("sim-1")["data"]["filledQty"] == 10
+        assert Funds(http).get_fund_limits()["data"]["utilizedAmount"] > 0
+
+        candles = Historical(http).get_intraday("1333", "NSE_EQ", "EQUITY", "2024-06-03", "2024-06-04", 5)
+        assert len(candles["data"]["timestamp"]) == 75
+
+        sim.inject_error(429, route="POST /orders")
+        rejected = order.place("1333", "NSE_EQ", "BUY", 10, "MARKET", "INTRADAY", 0)
+        assert rejected["status"] == "failure" and "rate limits" in rejected["remarks"]
+        assert order.place("1333", "NSE_EQ", "BUY", 10, "MARKET", "INTRADAY", 0)["status"] == "success"
+
+
+def test_feed_and_order_update_websockets():
+    async def scenario(sim):
+        index = OrderIndex()
+        updates = sim.order_update(index)
+        stream = asyncio.ensure_future(updates.run_supervised())
+        while not sim.stats["order_connections"]:
+            await asyncio.sleep(0.01)
+        placed = await asyncio.to_thread(
+            Order(sim.http()).place, "1333", "NSE_EQ", "SELL", 5, "MARKET", "INTRADAY", 0)
+        filled = await index.wait_until_filled(placed["data"]["orderId"], timeout=5)
+        await updates.supervisor.stop()
+        stream.cancel()
+
+        feed = sim.market_feed([(1, 1333, 15), (2, 35001, 17), (2, 35002, 21)])
+        await feed.connect()
+        seen = {}
+        while len(seen) < 3:  # one subscribe message per request code; they land one by one
+            batch = await feed.get_instrument_batch(64, 0.05)
+            seen.update({name: batch[name] for name in ("Ticker", "Quote", "Full") if name in batch})
+        # a graceful close would first drain the frames still queued behind the close frame
+        feed.ws.transport.abort()
+        return filled, seen
+
+    with DhanSimulator(fill_delay=0.01) as sim:
+        filled, seen = asyncio.run(asyncio.wait_for(scenario(sim), 10))
+    assert filled.filled_qty == 5 and filled.status == "TRADED"
+    assert set(seen["Ticker"]["security_id"]) == {1333}
+    assert set(seen["Quote"]["security_id"]) == {35001}
+    assert set(seen["Full"]["security_id"]) == {35002}
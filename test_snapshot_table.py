@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from brokers.feed_decoder import FeedDecoder, TICKER_STRUCT, FULL_STRUCT, DEPTH_LEVEL_STRUCT
+from brokers.snapshot_table import SnapshotTable
+from simulator import DhanSimulator
+
+
+def test_batches_update_rows_in_place_and_later_packets_win():
+    table = SnapshotTable([(1, 1333, 15), (2, 35001, 21)])
+    depth = b''.join(DEPTH_LEVEL_STRUCT.pack(10 + i, 20 + i, 1, 2, 99.5 - i, 100.5 + i) for i in range(5))
+    table.apply(FeedDecoder().decode([
+        TICKER_STRUCT.pack(2, 16, 1, 1333, 1620.25, 1718006400),
+        FULL_STRUCT.pack(8, 162, 2, 35001, 101.25, 50, 1718006401, 100.8, 9000, 400, 500,
+                         125000, 130000, 120000, 99.0, 98.0, 102.0, 97.5, depth),
+        TICKER_STRUCT.pack(2, 16, 1, 9999, 1.0, 1718006402),
+        TICKER_STRUCT.pack(2, 16, 1, 1333, 1621.5, 1718006403),
+    ]))
+
+    equity, future = table.get(1, 1333), table.get(2, 35001)
+    assert equity["LTP"] == 1621.5 and equity["LTT"] == 1718006403 and equity["updates"] == 2
+    assert future["LTP"] == 101.25 and future["OI"] == 125000 and future["volume"] == 9000
+    assert (future["bid_price"], future["bid_qty"], future["ask_price"], future["ask_qty"]) == (99.5, 10, 100.5, 20)
+    assert table.get(9, 9) is None and table.packets_unknown == 1 and table.packets_applied == 3
+    assert table.snapshot([(2, 35001), (9, 9)])["security_id"].tolist() == [35001]
+    assert table.covers([(1, 1333)]) and not table.covers([(1, 1334)])
+
+
+def test_add_instruments_grows_the_table_in_place():
+    table = SnapshotTable([(2, 35001, 21)])
+    table.apply(FeedDecoder().decode([TICKER_STRUCT.pack(2, 16, 2, 35001, 101.25, 1718006400)]))
+    table.add_instruments([(1, 1333, 15), (2, 35001, 21)])  # new row sorts before the existing one
+    table.apply(FeedDecoder().decode([TICKER_STRUCT.pack(2, 16, 1, 1333, 1620.25, 1718006401)]))
+    assert len(table) == 2 and table.row_of(2, 35001) == 1
+    assert table.get(2, 35001)["LTP"] == 101.25 and table.get(2, 35001)["updates"] == 1
+    assert table.get(1, 1333)["LTP"] == 1620.25
+
+
+def test_subscribing_mid_stream_keeps_the_snapshot():
+    async def scenario(sim):
+        feed = sim.market_feed([(1, 1333, 15)])
+        table = feed.enable_snapshot()
+        await feed.connect()
+        while table.get(1, 1333)["updates"] == 0:
+            await feed.get_instrument_batch(64, 0.01)
+        before = table.get(1, 1333)
+        await feed.subscribe([(1, 11536, 15)])
+        while table.get(1, 11536)["updates"] == 0:
+            await feed.get_instrument_batch(64, 0.01)
+        after = table.get(1, 1333)
+        await feed.disconnect()
+        return feed, table, before, after
+
+    with DhanSimulator() as sim:
+        feed, table, before, after = asyncio.run(asyncio.wait_for(scenario(sim), 10))
+    assert feed.snapshot is table and len(table) == 2
+    assert before["LTP"] > 0 and after["LTP"] > 0 and after["updates"] >= before["updates"]
+    assert table.get(1, 11536)["LTP"] == pytest.approx(sim.market.base_price("11536"), rel=0.1)
+
+
+def test_stop_snapshot_returns_promptly_on_a_quiet_feed():
+    with DhanSimulator(feed_interval=60) as sim:  # one round of packets, then silence
+        feed = sim.market_feed([(1, 1333, 15)])
+        snapshot = feed.start_snapshot()
+        deadline = time.monotonic() + 5
+        while snapshot.get(1, 1333)["updates"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        thread = feed._snapshot_thread
+        start = time.monotonic()
+        feed.stop_snapshot(timeout=3)
+        elapsed = time.monotonic() - start
+
+    assert snapshot.get(1, 1333)["LTP"] == pytest.approx(sim.market.base_price("1333"), rel=0.1)
+    assert elapsed < 2 and not thread.is_alive()
+    assert feed.ws is None and feed._snapshot_loop is None
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import struct
+from types import SimpleNamespace
+
+import websockets
+
+from brokers.feed_decoder import TICKER_STRUCT
+from brokers.market_feed import MarketFeed
+from brokers.order_update import OrderUpdate
+from brokers.supervisor import Backoff
+
+CONTEXT = SimpleNamespace(dhan_client_id="1000", dhan_access_token="token",
+                          market_instruments=[(2, 35001), (2, 35002)])
+
+
+def _subscribed_ids(packet):
+    count = struct.unpack_from('<I', packet, 83)[0]
+    return [int(struct.unpack_from('<B20s', packet, 87 + 21 * i)[1].rstrip(b'\0'))
+            for i in range(count)]
+
+
+def test_market_feed_reconnects_and_replays_subscriptions():
+    async def scenario():
+        subscriptions = []
+
+        async def flaky_feed(ws):
+            await ws.recv()  # auth
+            subscriptions.append(_subscribed_ids(await ws.recv()))
+            for sid in subscriptions[-1]:
+                await ws.send(TICKER_STRUCT.pack(2, 16, 2, sid, 101.5, 1718006400))
+            await asyncio.sleep(0.02)
+            await ws.close()  # drop on purpose
+
+        async with websockets.serve(flaky_feed, "127.0.0.1", 0) as server:
+            feed = MarketFeed(CONTEXT)
+            feed.market_feed_wss = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            received = []
+
+            def on_batch(batch):
+                received.append(batch.count)
+                if len(subscriptions) >= 3:
+                    asyncio.ensure_future(feed.supervisor.stop())
+
+            await asyncio.wait_for(
+                feed.run_supervised(on_batch, backoff=Backoff(base=0.01)), timeout=10)
+        return feed.supervisor.metrics(), subscriptions, received
+
+    metrics, subscriptions, received = asyncio.run(scenario())
+    assert subscriptions[:3] == [[35001, 35002]] * 3
+    assert metrics["reconnects"] >= 2
+    assert metrics["last_reconnect_time"] is not None
+    assert metrics["last_lost_interval"] > 0
+    assert sum(received) >= 6
+
+
+def test_order_update_standby_takes_over_without_duplicate_logins():
+    async def scenario():
+        logins = []
+
+        async def flaky_orders(ws):
+            try:
+                logins.append(json.loads(await ws.recv()))
+            except websockets.ConnectionClosed:
+                return  # standby that was never promoted
+            await ws.send(json.dumps({"Type": "order_alert",
+                                      "Data": {"orderNo": str(len(logins)), "status": "TRADED"}}))
+            await asyncio.sleep(0.02)
+            await ws.close()
+
+        async with websockets.serve(flaky_orders, "127.0.0.1", 0) as server:
+            updates = OrderUpdate(CONTEXT)
+            updates.order_feed_wss = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            seen = []
+
+            async def on_update(message):
+                seen.append(message["Data"]["orderNo"])
+                if len(seen) >= 3:
+                    await supervisor.stop()
+
+            supervisor = updates.supervised(standby=True, backoff=Backoff(base=0.01))
+            supervisor.handler = on_update
+            await asyncio.wait_for(supervisor.run(), timeout=10)
+        return supervisor.metrics(), logins, seen
+
+    metrics, logins, seen = asyncio.run(scenario())
+    assert seen == ["1", "2", "3"]
+    assert len(logins) == 3
+    assert metrics["standby_takeovers"] >= 2
+    assert metrics["reconnects"] >= 2
@@ -0,0 +1,57 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from brokers.async_modules import AsyncDhanModules
+from brokers.dhan_client import DhanClient
+from core.context import Context
+from core.tool_router import ToolRouter
+from simulator import DhanSimulator
+
+
+def _call(i, name, **arguments):
+    return SimpleNamespace(id=f"call_{i}", function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+class _Brain:
+    """Asks for three reads and a kill switch in one turn, then answers from the tool results."""
+
+    def __init__(self):
+        self.turns = []
+
+    async def complete(self, messages, tools=None):
+        self.turns.append(messages)
+        if len(self.turns) == 1:
+            return SimpleNamespace(content=None, tool_calls=[
+                _call(1, "funds__get_fund_limits"),
+                _call(2, "portfolio__get_positions"),
+                _call(3, "trader_control__kill_switch", action="activate"),
+                _call(4, "order__list_orders"),
+            ])
+        results = [json.loads(m["content"]) for m in messages if m["role"] == "tool"]
+        return SimpleNamespace(content=" ".join(r["status"] for r in results), tool_calls=None)
+
+
+def test_schemas_parallel_reads_and_gated_writes():
+    with DhanSimulator() as sim:
+        dhan = DhanClient(Context("key", sim.client_id, sim.access_token))
+        dhan._aio = AsyncDhanModules(sim.async_http())
+        brain = _Brain()
+        router = ToolRouter(brain, dhan)
+
+        schema = {s["function"]["name"]: s["function"] for s in router.schemas}
+        assert schema["order__place"]["parameters"]["properties"]["quantity"]["type"] == "integer"
+        assert "quantity" in schema["order__place"]["parameters"]["required"]
+        assert "approval" in schema["trader_control__kill_switch"]["description"]
+        assert schema["option_chain__get_chain"]["parameters"]["properties"]["expiry"]["description"]
+
+        result = dhan.run_async(router.run("How much cash do I have and what is open?"))
+        assert result["data"]["answer"] == "success success failure success"
+        assert result["data"]["turns"] == 2 and len(brain.turns[1]) == 2 + 1 + 4  # one batched tool turn
+        assert router.stats["reads"] == 3 and router.stats["blocked"] == 1
+        assert not any("killswitch" in route for route in sim.stats["routes"])
+
+        approved = ToolRouter(_Brain(), dhan, confirm=lambda name, args: args["action"] == "activate")
+        dhan._aio = AsyncDhanModules(sim.async_http())
+        assert dhan.run_async(approved.run("halt"))["data"]["answer"].split()[2] == "success"
+        assert any("killswitch" in route for route in sim.stats["routes"])